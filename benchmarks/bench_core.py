@@ -0,0 +1,424 @@
+"""
+Benchmark suite for the DOMObject hot paths.
+
+Each benchmark runs at every requested tree size and records the best wall
+time over `--repeat` runs, plus the peak traced memory of one extra run.
+Results are written as JSON and compared against a stored baseline, a
+benchmark slower (or heavier) than the baseline by more than `--threshold`
+fails the run with exit code 1. So does a benchmark listed in `FASTER_THAN`
+that is not faster than its reference benchmark in the same run.
+
+    @example Usage
+        # Run and compare against the stored baseline
+        python benchmarks/bench_core.py --sizes 1000,10000
+
+        # Full size range, results saved to a file
+        python benchmarks/bench_core.py --sizes 1000,10000,100000,1000000 \
+            --output bench_results.json
+
+        # Refresh the stored baseline on the reference host
+        python benchmarks/bench_core.py --sizes 1000,10000 --save-baseline
+
+Baselines are host specific, refresh them when the reference host changes.
+A run with regressions is not saved as the baseline unless `--force` is
+given, fix the regression instead of moving the reference.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(_HERE), "src"))
+
+import DOMObjects  # noqa: E402
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+DEFAULT_BASELINE = os.path.join(_HERE, "baseline.json")
+
+# Operations with per-call cost linear in the tree size are only run this
+# many times per size, so large sizes stay tractable.
+LINEAR_OPS = 1000
+
+# Number of lookups timed by the get_context benchmarks
+LOOKUPS = 1000
+
+
+# Tree builders
+def flat_tree(size: int, props: int = 1) -> object:
+    """ @abstract Root with `size` children holding `props` properties each
+        @param size [int] Number of children
+        @param props [int] Properties per child
+        @returns [DOMRootObject] Tree
+    """
+    _root = DOMObjects.DOMRootObject()
+    _root.new_child_bulk(["n%d" % _i for _i in range(size)])
+    for _i in range(size):
+        _root.__store__["n%d" % _i].new_property_bulk(
+            [("p%d" % _p, _i) for _p in range(props)])
+    return _root
+
+
+def wide_tree(size: int) -> object:
+    """ @abstract Two level tree of `size` nodes, 100 branches of leaves
+        @param size [int] Number of nodes
+        @returns [DOMRootObject] Tree
+    """
+    _root = DOMObjects.DOMRootObject()
+    _branches = min(100, size)
+    _leaves = max(size // _branches - 1, 0)
+    for _b in range(_branches):
+        _root.new_child("b%d" % _b)
+        _branch = _root.__store__["b%d" % _b]
+        _branch.new_property("idx", _b)
+        for _l in range(_leaves):
+            _branch.new_child("l%d" % _l)
+            _branch.__store__["l%d" % _l].new_property("value", _l)
+    return _root
+
+
+def chain_tree(root: object, depth: int) -> str:
+    """ @abstract Add a linear chain of nested children to `root`
+        @param root [DOMObject] Node to grow the chain from
+        @param depth [int] Chain depth
+        @returns [str] Dotted path of the deepest node
+    """
+    _node = root
+    for _d in range(depth):
+        _node.new_child("c%d" % _d)
+        _node = _node.__store__["c%d" % _d]
+    return ".".join("c%d" % _d for _d in range(depth))
+
+
+# Benchmarks, each returns the callable to measure
+def bench_build_schema(size: int) -> object:
+    _schema = DOMObjects.DOMSchema()
+    _schema.children = {
+        "n%d" % _i: {"props": {"value": {"cast": int, "default": _i}}}
+        for _i in range(size)}
+
+    def _run():
+        DOMObjects.DOMRootObject().build_schema(_schema)
+    return _run
+
+
+def bench_new_child_bulk(size: int) -> object:
+    _names = ["n%d" % _i for _i in range(size)]
+
+    def _run():
+        DOMObjects.DOMRootObject().new_child_bulk(_names)
+    return _run
+
+
+def bench_new_property_bulk(size: int) -> object:
+    _props = [("p%d" % _i, _i) for _i in range(size)]
+
+    def _run():
+        DOMObjects.DOMRootObject().new_property_bulk(_props)
+    return _run
+
+
+def bench_setattr(size: int) -> object:
+    _root = DOMObjects.DOMRootObject()
+    # setattr() interns the names, growing the process wide interned
+    # table at run dependent points, intern them up front instead
+    _names = [sys.intern("p%d" % _i) for _i in range(size)]
+    _root.new_property_bulk(_names)
+
+    def _run():
+        for _name in _names:
+            setattr(_root, _name, 1)
+    return _run
+
+
+def bench_getattr(size: int) -> object:
+    _root = DOMObjects.DOMRootObject()
+    _names = ["p%d" % _i for _i in range(size)]
+    _root.new_property_bulk(_names)
+
+    def _run():
+        for _name in _names:
+            getattr(_root, _name)
+    return _run
+
+
+def _bench_get_context(depth: int) -> object:
+    def _bench(size: int) -> object:
+        _root = flat_tree(size, props=0)
+        _path = chain_tree(_root, depth)
+
+        def _run():
+            for _ in range(LOOKUPS):
+                _root.get_context(_path)
+        return _run
+    return _bench
+
+
+def bench_get_many(size: int) -> object:
+    _root = wide_tree(size)
+    _paths = ["%s.%s.value" % (_b, _l)
+              for _b in _root.children
+              for _l in _root.__store__[_b].children][:LINEAR_OPS]
+
+    def _run():
+        _root.get_many(_paths)
+    return _run
+
+
+def bench_get_property_loop(size: int) -> object:
+    """ Per path get_context/get_property loop, the `get_many` reference """
+    _root = wide_tree(size)
+    _paths = ["%s.%s.value" % (_b, _l)
+              for _b in _root.children
+              for _l in _root.__store__[_b].children][:LINEAR_OPS]
+
+    def _run():
+        _ret = {}
+        for _path in _paths:
+            _nodePath, _, _prop = _path.rpartition(".")
+            _ret[_path] = _root.get_context(_nodePath).get_property(_prop)
+    return _run
+
+
+def bench_siblings(size: int) -> object:
+    _root = flat_tree(size, props=0)
+    _nodes = [_root.__store__["n%d" % _i] for _i in range(min(size, LINEAR_OPS))]
+
+    def _run():
+        for _node in _nodes:
+            _node.siblings
+    return _run
+
+
+def bench_dict(size: int) -> object:
+    _root = wide_tree(size)
+
+    def _run():
+        _root.dict()
+    return _run
+
+
+def bench_json(size: int) -> object:
+    _root = wide_tree(size)
+
+    def _run():
+        _root.json()
+    return _run
+
+
+def bench_dictgroup_insert(size: int) -> object:
+    _nodes = [DOMObjects.DOMObject("m%d" % _i) for _i in range(size)]
+
+    def _run():
+        _root = DOMObjects.DOMRootObject()
+        _root.new_dictgroup("group")
+        _group = _root.group
+        for _node in _nodes:
+            _group[_node.name] = _node
+    return _run
+
+
+def bench_dictgroup_delete(size: int) -> object:
+    _root = DOMObjects.DOMRootObject()
+    _root.new_dictgroup("group")
+    _group = _root.group
+    _names = ["m%d" % _i for _i in range(size)]
+    _group.new_child_bulk(_names)
+    _victims = _names[:min(size, LINEAR_OPS)]
+
+    def _run():
+        for _name in _victims:
+            _group.detach(_name)
+    return _run
+
+
+# Benchmarks that must beat a reference benchmark at every size, checked
+# within the same run, independent of the stored baseline
+FASTER_THAN = {
+    "get_many": "get_property_loop"
+}
+
+BENCHMARKS = {
+    "build_schema": bench_build_schema,
+    "new_child_bulk": bench_new_child_bulk,
+    "new_property_bulk": bench_new_property_bulk,
+    "setattr": bench_setattr,
+    "getattr": bench_getattr,
+    "get_context_depth_1": _bench_get_context(1),
+    "get_context_depth_10": _bench_get_context(10),
+    "get_context_depth_100": _bench_get_context(100),
+    "get_many": bench_get_many,
+    "get_property_loop": bench_get_property_loop,
+    "siblings": bench_siblings,
+    "dict": bench_dict,
+    "json": bench_json,
+    "dictgroup_insert": bench_dictgroup_insert,
+    "dictgroup_delete": bench_dictgroup_delete
+}
+
+
+def measure(bench: object, size: int, repeat: int,
+            memory: bool = True) -> dict:
+    """ @abstract Time and trace the peak memory of one benchmark
+        @param bench [callable] Benchmark factory
+        @param size [int] Tree size
+        @param repeat [int] Number of timed runs
+        @param memory [bool] #optional Trace peak memory in an extra run
+        @returns [dict] {"time": best seconds, "peak": bytes or None}
+    """
+    _times = []
+    for _ in range(repeat):
+        _run = bench(size)
+        gc.collect()
+        _start = time.perf_counter()
+        _run()
+        _times.append(time.perf_counter() - _start)
+        del _run
+
+    if not memory:
+        return {"time": min(_times), "peak": None}
+    _run = bench(size)
+    gc.collect()
+    tracemalloc.start()
+    _run()
+    _peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"time": min(_times), "peak": _peak}
+
+
+def run(names: list, sizes: list, repeat: int, memory: bool = True) -> dict:
+    """ @abstract Run the selected benchmarks at all sizes
+        @param names [list] Benchmark names
+        @param sizes [list] Tree sizes
+        @param repeat [int] Number of timed runs
+        @param memory [bool] #optional Trace peak memory
+        @returns [dict] Results document
+    """
+    _results = {}
+    for _name in names:
+        _results[_name] = {}
+        for _size in sizes:
+            _result = measure(BENCHMARKS[_name], _size, repeat, memory)
+            _results[_name][str(_size)] = _result
+            print("%-24s %8d %12.6fs %12s B" % (_name, _size, _result["time"],
+                                                _result["peak"]))
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": repeat
+        },
+        "results": _results
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """ @abstract Find regressions against a baseline
+        @param results [dict] Results document
+        @param baseline [dict] Baseline document
+        @param threshold [float] Allowed relative slowdown, 0.25 = 25%
+        @returns [list] Regression descriptions
+    """
+    _regressions = []
+    for _name, _sizes in results["results"].items():
+        for _size, _result in _sizes.items():
+            _base = baseline["results"].get(_name, {}).get(_size)
+            if _base is None:
+                continue
+            for _metric in ("time", "peak"):
+                if not _base[_metric] or _result[_metric] is None:
+                    continue
+                _ratio = _result[_metric] / _base[_metric]
+                if _ratio > 1 + threshold:
+                    _regressions.append("%s[%s] %s %.2fx baseline" %
+                                        (_name, _size, _metric, _ratio))
+    return _regressions
+
+
+def compare_relative(results: dict) -> list:
+    """ @abstract Find benchmarks not faster than their `FASTER_THAN`
+            reference in the same run
+        @param results [dict] Results document
+        @returns [list] Failure descriptions
+    """
+    _failures = []
+    _results = results["results"]
+    for _name, _reference in FASTER_THAN.items():
+        if _name not in _results or _reference not in _results:
+            continue
+        for _size, _result in _results[_name].items():
+            _ratio = _result["time"] / _results[_reference][_size]["time"]
+            if _ratio >= 1:
+                _failures.append("%s[%s] time %.2fx %s" %
+                                 (_name, _size, _ratio, _reference))
+    return _failures
+
+
+def main(argv: list = None) -> int:
+    _parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    _parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                         help="comma separated tree sizes")
+    _parser.add_argument("--only", default=None,
+                         help="comma separated benchmark names")
+    _parser.add_argument("--repeat", type=int, default=3)
+    _parser.add_argument("--output", default=None,
+                         help="write results JSON to this file")
+    _parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    _parser.add_argument("--threshold", type=float, default=0.25,
+                         help="allowed relative regression, default 0.25")
+    _parser.add_argument("--no-memory", action="store_true",
+                         help="skip the traced peak memory run")
+    _parser.add_argument("--save-baseline", action="store_true",
+                         help="store the results as the new baseline")
+    _parser.add_argument("--force", action="store_true",
+                         help="save the baseline despite regressions")
+    _args = _parser.parse_args(argv)
+
+    _names = _args.only.split(",") if _args.only else list(BENCHMARKS)
+    for _name in _names:
+        if _name not in BENCHMARKS:
+            _parser.error("unknown benchmark `%s`" % _name)
+    _sizes = [int(float(_s)) for _s in _args.sizes.split(",")]
+
+    # references of the selected relative checks run as well
+    _names += [FASTER_THAN[_n] for _n in _names
+               if _n in FASTER_THAN and FASTER_THAN[_n] not in _names]
+    _results = run(_names, _sizes, _args.repeat, not _args.no_memory)
+    _failures = compare_relative(_results)
+    for _failure in _failures:
+        print("SLOWER " + _failure)
+    if _args.output:
+        with open(_args.output, "w") as _fp:
+            json.dump(_results, _fp, indent=2, sort_keys=True)
+
+    _regressions = []
+    if os.path.exists(_args.baseline):
+        with open(_args.baseline) as _fp:
+            _baseline = json.load(_fp)
+        _regressions = compare(_results, _baseline, _args.threshold)
+        for _regression in _regressions:
+            print("REGRESSION " + _regression)
+    elif not _args.save_baseline:
+        print("no baseline at %s, skipping comparison" % _args.baseline)
+
+    if _args.save_baseline:
+        # a regressing run must not become the new reference
+        if (_regressions or _failures) and not _args.force:
+            print("not saving the baseline, fix the regressions or rerun "
+                  "with --force on a new reference host")
+            return 1
+        with open(_args.baseline, "w") as _fp:
+            json.dump(_results, _fp, indent=2, sort_keys=True)
+        return 0
+    return 1 if _regressions or _failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -67,5 +67,7 @@ setup(
         ],
     extras_require={
         'testing': ['pytest'],
+        'numpy': ['numpy'],
+        'sorted': ['sortedcontainers'],
     }
 )
@@ -1,5 +1,6 @@
 from collections.abc import MutableMapping
 from warnings import warn
+from weakref import ref
 
 __author__ = "Rob MacKinnon <rome@villagertech.com>"
 __package__ = "DOMObjects"
@@ -27,15 +28,77 @@ from .schema import (
     DOMSchema
 )
 
-# INTERNAL DEBUGGING FLAG, not for production consumption.
+from .interning import (
+    ValuePool,
+    intern_name,
+    value_pool
+)
+
+from .validation import (
+    PropValidator,
+    compile_props,
+    compile_spec
+)
+
+from .aio import (
+    WATCHERS,
+    Change,
+    Watch,
+    is_internal
+)
+
+from .gcutil import (
+    InstanceStore,
+    WeakParent,
+    freeze_for_gc,
+    unfreeze_gc
+)
+
+from .index import (
+    MISSING,
+    HashIndex,
+    SortedIndex,
+    member_value
+)
+
+from .shared import (
+    SharedDOMExport,
+    SharedDOMView,
+    export_shared,
+    attach_shared
+)
+
+from .serialize import (
+    dump_json,
+    dumps_parallel
+)
+
+from .selector import (
+    Selector,
+    compile_selector
+)
+
+# Deprecated, has no effect. Kept for code setting the former debugging
+# flag, use `DOMObjects.instrument` instead.
 DEBUG = 0
 
+# Per node write hooks, see `DOMObject.__hooks__`
+_HOOK_VALIDATE = 1 << 0
+_HOOK_INDEX = 1 << 1
+
 
 class DOMObject(object):
     """ @abstract: This object is used to create new DOM object data
             structures allowing traversable objects trees similar to
             Javascript DOM objects.
     """
+    # Fallbacks for nodes of weak parent trees, see `DOMObjects.gcutil`
+    parent = WeakParent()
+    __store__ = InstanceStore()
+    # Write hooks the node needs, nodes without validators or an indexing
+    # parent group skip the validator and index lookups on every write
+    __hooks__ = 0
+
     def __init__(self, name: str):
         """ @abstract Base DOM object initializer
             @param name [str] DOM object name
@@ -58,6 +121,11 @@ class DOMObject(object):
             @param value [object] Callable/referenceable object
             @returns [None]
         """
+        _hooks = self.__hooks__
+        if _hooks & _HOOK_VALIDATE:
+            _validators = self.__dict__["__validators__"]
+            if name in _validators:
+                value = _validators[name].coerce(value)
         if ((name not in self.__store__ and not self.__protected__) or
            self.__flags__.is_writeable(name)):
             self.__store__[name] = value
@@ -68,6 +136,10 @@ class DOMObject(object):
             raise(KeyError("property `%s` not set" % name))
 
         self.__store__[name] = value
+        if _hooks & _HOOK_INDEX:
+            self.__notify_index__(name)
+        if WATCHERS and not is_internal(name):
+            self.__notify__(name, value, "set")
 
     # Private properties
     @property
@@ -107,19 +179,124 @@ class DOMObject(object):
             @param name [str] DOM object name
             @returns [bool] True on exists
         """
-        if DEBUG == 1:
-            print("name exists '%s' = %s" % (name, name in self.__store__))
         return name in self.__store__
 
+    def __before_output__(self) -> None:
+        """ @abstract Hook run before `dict()` and `adict()` serialize the
+                node, no-op by default
+            @returns [None]
+        """
+        return None
+
+    def __notify_index__(self, propName: str) -> None:
+        """ @abstract Update parent DictGroup indexes after a property change
+            @param propName [str] Changed property name
+            @returns [None]
+        """
+        if not self.__hooks__ & _HOOK_INDEX:
+            return
+        _parent = self.parent
+        if _parent is not None:
+            _indexes = _parent.__dict__.get("__indexes__")
+            if _indexes and propName in _indexes:
+                _parent.__reindex_member__(self, propName)
+
+    def __notify__(self, name: str, value: object, kind: str) -> None:
+        """ @abstract Hand a mutation to the registered watchers, callers
+                check `WATCHERS` first so unwatched trees skip the call
+            @param name [str] Changed property, child or member name
+            @param value [object] New value, None for deletions
+            @param kind [str] "new", "set" or "delete"
+            @returns [None]
+        """
+        from .aio import notify as NOTIFY
+        NOTIFY(self, name, value, kind)
+
+    def __assign__(self, propName: str, propValue: object,
+                   validate: bool = True) -> None:
+        """ @abstract Store the value of an existing property, running its
+                validator and the parent DictGroup index hooks. Flags are
+                checked by the callers.
+            @param propName [str] Property name
+            @param propValue [object] Value to store
+            @param validate [bool] #optional Run the property validator
+            @returns [None]
+        """
+        _hooks = self.__hooks__
+        if validate and _hooks & _HOOK_VALIDATE:
+            _validators = self.__dict__["__validators__"]
+            if propName in _validators:
+                propValue = _validators[propName].coerce(propValue)
+        self.__store__[propName] = propValue
+        if _hooks & _HOOK_INDEX:
+            self.__notify_index__(propName)
+        if WATCHERS:
+            self.__notify__(propName, propValue, "set")
+
+    def __bind_method__(self, method: object, margs: list,
+                        mkwargs: dict) -> object:
+        """ @abstract Bind the arguments of a method property, coroutine
+                functions stay awaitable, see `DOMObjects.aio`
+            @param method [callable] Method
+            @param margs [list] Method arguments
+            @param mkwargs [dict] Method keyword arguments
+            @returns [callable] Bound method property
+        """
+        from .aio import async_method as ASYNC_METHOD, is_async as IS_ASYNC
+        if IS_ASYNC(method):
+            return ASYNC_METHOD(method, margs, mkwargs)
+        return lambda: method(*margs, **mkwargs)
+
+    def __add_validators__(self, validators: dict) -> None:
+        """ @abstract Attach compiled property validators to this node
+            @param validators [dict] {<prop name>: PropValidator, ...}
+            @returns [None]
+        """
+        if not validators:
+            return
+        # maps are shared between nodes, merge into a new one
+        _validators = self.__dict__.get("__validators__")
+        if _validators is not None:
+            _validators = dict(_validators)
+            _validators.update(validators)
+            validators = _validators
+        object.__setattr__(self, "__validators__", validators)
+        self.__add_hook__(_HOOK_VALIDATE)
+
+    def __add_hook__(self, hook: int) -> None:
+        """ @abstract Enable a write hook on this node, see `__hooks__`
+            @param hook [int] Hook bit
+            @returns [None]
+        """
+        object.__setattr__(self, "__hooks__", self.__hooks__ | hook)
+
     def __update_parent__(self, instance: object, parent: object) -> None:
         """ @abstract Update the parent of an object
             @param instance [DOMObject] Instance of object to update
             @param parent [DOMObject] Parent instance to point to
         """
         instance.__flags__.unlock("parent")
-        instance.parent = parent
+        if parent is not None and parent.__dict__.get("__weakparents__"):
+            instance.__weaken__()
+            instance.__dict__.pop("parent", None)
+            instance.__dict__["__parentref__"] = ref(parent)
+        else:
+            instance.__dict__.pop("__parentref__", None)
+            instance.parent = parent
         instance.__flags__.lock("parent")
 
+    def __weaken__(self) -> None:
+        """ @abstract Switch this node to weak parent mode, children attached
+                later hold a weak reference to it and the node no longer
+                references its own `__store__`
+            @returns [None]
+        """
+        if self.__dict__.get("__weakparents__"):
+            return
+        object.__setattr__(self, "__weakparents__", True)
+        if self.__dict__.get("__store__") is self.__dict__:
+            del self.__dict__["__store__"]
+
     # Public Properties
     @property
     def children(self) -> list:
@@ -135,13 +312,14 @@ class DOMObject(object):
         """
         if ((self.parent is None) or
            (self.__flags__.test_bit("self", FLAG_NAMESPACE - 1) is not True)):
-            _siblings = list(self.parent.children)
-            _siblings.remove(self.name)
-            _siblings.sort()
-            if DEBUG == 1:
-                print("self.name='%s'" % self.name)
-                print("parent.children=%s" % self.parent.children)
-                print("siblings(%s)=%s" % (type(_siblings), _siblings))
+            if getattr(self.parent, "__sorted__", False):
+                # Children of sorted groups are kept in order already
+                _siblings = [_n for _n in self.parent.__children__
+                             if _n != self.name]
+            else:
+                _siblings = list(self.parent.children)
+                _siblings.remove(self.name)
+                _siblings.sort()
         else:
             _siblings = [self.name]
         return _siblings
@@ -166,13 +344,30 @@ class DOMObject(object):
         return self.parent.path + '.' + self.name
 
     # Public Methods
-    def dict(self, props: list = None, propsOnly: bool = False) -> dict:
+    def dict(self, props: list = None, propsOnly: bool = False,
+             offset: int = 0, limit: int = None, cursor: object = None,
+             depth: int = None, fields: dict = None) -> dict:
         """ @abstract Built-in override to provide a static dictionary as
                 output.
             @param props [list] #optional List of specific properties to return
             @param propsOnly [bool] #optional Should only properties be returned
+            @param offset [int] #optional Children to skip
+            @param limit [int] #optional Number of children to return
+            @param cursor [object] #optional Last child key of the previous
+                page, see `DOMObjects.paging`
+            @param depth [int] #optional Child levels to expand, deeper nodes
+                are replaced by {"__count__": <number of children>}
+            @param fields [dict] #optional Prop projection per relative path
+                pattern, {"devices.*": ["name"]}
             @returns [dict] Static dictionary object
         """
+        self.__before_output__()
+        if offset or limit is not None or cursor is not None or \
+           depth is not None or fields:
+            from .paging import partial_dict as PARTIAL_DICT
+            return PARTIAL_DICT(self, props=props, propsOnly=propsOnly,
+                                offset=offset, limit=limit, cursor=cursor,
+                                depth=depth, fields=fields)
         _children = self.__children__
         if props == None:
             _propNames = self.__properties__
@@ -187,6 +382,9 @@ class DOMObject(object):
             if self.has_property(_prop):
                 if callable(getattr(self, _prop)):
                     _ret = getattr(self, _prop)()
+                    if hasattr(_ret, "__await__"):
+                        from .aio import run_sync as RUN_SYNC
+                        _ret = RUN_SYNC(_ret)
                 else:
                     _ret = self.get_property(_prop)
             else:
@@ -197,26 +395,90 @@ class DOMObject(object):
             _dict.update({_prop: _ret})
 
         if not propsOnly:
+            _members = self.__dict__.get("__keystore__", self.__store__)
             for _child in _children:
-                _dict.update({_child: getattr(self, _child).dict()})
+                _dict.update({_child: _members[_child].dict()})
 
         return _dict
 
-    def json(self, props: list = None, propsOnly: bool = False) -> str:
+    def json(self, props: list = None, propsOnly: bool = False,
+             parallel: int = None, **partial) -> str:
         """ @abstract Built-in to provide JSON as output.
             @param None
             Optional:
             @param props [list] #optional list of specific properties to return
             @param propsOnly [bool] #optional Should only properties be returned
+            @param parallel [int] #optional Number of worker processes to
+                serialize subtrees with, see `serialize.dumps_parallel`
+            @param partial #optional `offset`, `limit`, `cursor`, `depth` and
+                `fields` options of `dict()`, partial output is not parallel
             @returns [str] JSON text object
         """
+        if parallel is not None and parallel > 1 and not propsOnly and \
+           not partial:
+            from .serialize import dumps_parallel
+            return dumps_parallel(self, workers=parallel, props=props)
+
         from json import dumps as JSON_DUMPS
 
-        _retDict = self.dict(props=props, propsOnly=propsOnly)
+        _retDict = self.dict(props=props, propsOnly=propsOnly, **partial)
         _ret = JSON_DUMPS(_retDict)
         del JSON_DUMPS
         return _ret
 
+    def page(self, limit: int, cursor: object = None, offset: int = 0,
+             depth: int = None, fields: dict = None) -> dict:
+        """ @abstract One page of the children, e.g. DictGroup members
+            @param limit [int] Page size
+            @param cursor [object] #optional `next` of the previous page
+            @param offset [int] #optional Children to skip, or with a cursor
+                the `offset` of the previous page as position hint
+            @param depth [int] #optional Child levels of the members to expand
+            @param fields [dict] #optional Prop projection per path pattern,
+                {"*": ["name"]} for the members
+            @returns [dict] {"items": {...}, "next": <cursor>,
+                "offset": <next offset>, "total": <number of children>}
+            @example Usage
+                _page = ROOT.devices.page(50)
+                ROOT.devices.page(50, cursor=_page["next"],
+                                  offset=_page["offset"])
+        """
+        from .paging import page as PAGE
+        return PAGE(self, limit, cursor=cursor, offset=offset, depth=depth,
+                    fields=fields)
+
+    async def adict(self, props: list = None, propsOnly: bool = False) -> dict:
+        """ @abstract `dict()` awaiting async method properties of the
+                subtree concurrently, see `DOMObjects.aio`
+            @param props [list] #optional List of specific properties to return
+            @param propsOnly [bool] #optional Should only properties be returned
+            @returns [dict] Static dictionary object
+        """
+        from .aio import adict as ADICT
+        return await ADICT(self, props=props, propsOnly=propsOnly)
+
+    async def ajson(self, props: list = None, propsOnly: bool = False) -> str:
+        """ @abstract `json()` awaiting async method properties of the
+                subtree concurrently, see `DOMObjects.aio`
+            @param props [list] #optional List of specific properties to return
+            @param propsOnly [bool] #optional Should only properties be returned
+            @returns [str] JSON text object
+        """
+        from .aio import ajson as AJSON
+        return await AJSON(self, props=props, propsOnly=propsOnly)
+
+    def watch(self, prefix: str = None, maxsize: int = 0) -> Watch:
+        """ @abstract Async iterator of changes below this node
+            @param prefix [str] #optional Dotted path below this node to
+                watch, defaults to the whole subtree
+            @param maxsize [int] #optional Queue bound, 0 for unbounded
+            @returns [Watch] Iterator of `Change(path, kind, value)` records
+            @example Usage
+                async for change in ROOT.watch("settings"):
+                    ...
+        """
+        return Watch(self, prefix=prefix, maxsize=maxsize)
+
     def has_child(self, name: str) -> bool:
         """ @abstract Checks if name exists in children list
             @param name [str] DOM object name
@@ -249,6 +511,8 @@ class DOMObject(object):
         self.__store__[name] = obj
         self.__children__.append(name)
         self.__flags__.set_flag(name, flags)
+        if WATCHERS:
+            self.__notify__(name, obj, "new")
 
     def detach(self, name: str) -> None:
         """ @abstract Remove a child object from tree structure
@@ -259,6 +523,8 @@ class DOMObject(object):
         assert self.__name_exists__(name)
         del self.__store__[name]
         self.__children__.remove(name)
+        if WATCHERS:
+            self.__notify__(name, None, "delete")
 
     def new_property(self, propName: str,
                      propValue: object,
@@ -275,6 +541,9 @@ class DOMObject(object):
         self.__store__.update({propName: propValue})
         self.__properties__.append(propName)
         self.__flags__.set_flag(propName, flags)
+        self.__notify_index__(propName)
+        if WATCHERS:
+            self.__notify__(propName, propValue, "new")
 
     def del_property(self, propName: str) -> None:
         """ @abstract Remove property from self
@@ -287,6 +556,9 @@ class DOMObject(object):
         del self.__store__[propName]
         self.__properties__.remove(propName)
         self.__flags__.del_flag(propName)
+        self.__notify_index__(propName)
+        if WATCHERS:
+            self.__notify__(propName, None, "delete")
 
     def set_property(self, propName: str, propValue: object) -> None:
         """ @abstract Set the value of a property by name
@@ -299,7 +571,7 @@ class DOMObject(object):
             self.new_property(propName, propValue)
         else:
             assert (self.__flags__.test_bit(propName, FLAG_WRITE) is True)
-            self.__store__[propName] = propValue
+            self.__assign__(propName, propValue)
 
     def new_method(self, name: str,
                      method: object,
@@ -316,9 +588,12 @@ class DOMObject(object):
         assert (not self.__flags__.protected)
         if self.__name_exists__(name):
             raise(AssertionError("property method '%s' exists" % name))
-        self.__store__.update({name: lambda: method(*margs, **mkwargs)})
+        self.__store__.update({name: self.__bind_method__(method, margs,
+                                                          mkwargs)})
         self.__properties__.append(name)
         self.__flags__.set_flag(name, flags)
+        if WATCHERS:
+            self.__notify__(name, method, "new")
 
     def set_method(self, name: str,
                    method: object,
@@ -339,8 +614,11 @@ class DOMObject(object):
             self.new_method(name, method, margs, mkwargs, flags)
         else:
             assert (self.__flags__.test_bit(name, FLAG_WRITE) is True)
-            self.__store__[name] = lambda: method(*margs, **mkwargs)
+            self.__store__[name] = self.__bind_method__(method, margs, mkwargs)
             self.__flags__.set_flag(name, flags)
+            self.__notify_index__(name)
+            if WATCHERS:
+                self.__notify__(name, method, "set")
 
     def get_property(self, propName: str) -> object:
         """ @abstract Retrieve a specific property by name.
@@ -352,9 +630,15 @@ class DOMObject(object):
         assert (self.__flags__.test_bit(propName, FLAG_READ) is True)
         return self.__store__[propName]
 
-    def new_property_bulk(self, props: list) -> None:
+    def new_property_bulk(self, props: list, dedupe: object = False,
+                          schema: dict = None) -> None:
         """ @abstract Add property to self in bulk
             @param props [list] List of property tuple name|value or name only
+            @param dedupe [bool|ValuePool] #optional Share equal immutable
+                values through a value pool and intern the names, see
+                `DOMObjects.interning`
+            @param schema [dict] #optional Prop specs, values are validated
+                and the validators kept, see `DOMObjects.validation`
             @example Bulk Props Definition
                 props = ["propName" | ("propName", value)]
 
@@ -363,6 +647,8 @@ class DOMObject(object):
             @returns [None]
         """
         assert not self.__flags__.protected
+        _pool = value_pool(dedupe)
+        _validators = compile_props(schema) if schema else {}
         _value = None
         for _n in props:
             if isinstance(_n, tuple):
@@ -373,7 +659,13 @@ class DOMObject(object):
                     raise KeyError(L10N_MESSAGES["DOM_ADD_PROP_EXCEPT_NAME_TUPLE_LEN"])
             else:
                 _name = _n
+            if _name in _validators and _value is not None:
+                _value = _validators[_name].coerce(_value)
+            if _pool is not None:
+                _name = intern_name(_name)
+                _value = _pool.get(_value)
             self.new_property(_name, _value)
+        self.__add_validators__(_validators)
 
     def new_child(self, name: str) -> None:
         """ @abstract Add child object to tree
@@ -416,8 +708,8 @@ class DOMObject(object):
         if self.__name_exists__(name):
             raise(AssertionError("child '%s' in path '%s' exists" % (name, self.path)))
         _instance = self.__new_child__(name)
-        self.__update_parent__(instance=_instance, parent=self)
-        _instance.__flags__.update_flag("self", FLAG_NAMESPACE)
+        _flags = _instance.__flags__
+        _flags.update_flag("self", _flags.get_flag("self") | FLAG_NAMESPACE)
         self.attach(name=name, obj=_instance)
 
     def new_child_bulk(self, nameList: list) -> None:
@@ -436,23 +728,118 @@ class DOMObject(object):
         """
         if name is None:
             return self
-        if "." in name:
-            _keys = name.split('.')
-            assert self.__name_exists__(_keys[0])
-            return self.__store__[_keys[0]].get_context('.'.join(_keys[1:]))
-        else:
-            assert self.__name_exists__(name)
-            return self.__store__[name]
+        # `__name_exists__` inlined, this runs once per path segment
+        _store = self.__store__
+        if "." not in name:
+            assert name in _store
+            return _store[name]
+        _key, _rest = name.split('.', 1)
+        assert _key in _store
+        return _store[_key].get_context(_rest)
+
+    def select(self, selector: str) -> object:
+        """ @abstract Query the tree below this node with a selector
+            @param selector [str|Selector] Selector text, see
+                `DOMObjects.selector` for the syntax
+            @returns [generator] Matched children, members or property values
+            @example Usage
+                ROOT.select("controls.*.value")
+                ROOT.select("devices[*]{status=='up'}")
+        """
+        from .selector import select as SELECT
+        return SELECT(self, selector)
+
+    def get_many(self, paths: list, default: object = MISSING) -> dict:
+        """ @abstract Read many properties by dotted path, resolving each
+                node once, see `DOMObjects.batch`
+            @param paths [list] Property paths relative to this node
+            @param default [object] #optional Value of missing paths, raises
+                KeyError on missing paths when not given
+            @returns [dict] {<path>: <value>, ...}
+        """
+        from .batch import get_many as GET_MANY
+        return GET_MANY(self, paths, default)
 
-    def new_dictgroup(self, name: str) -> None:
+    def set_many(self, values: dict) -> None:
+        """ @abstract Write many properties by dotted path, all paths are
+                checked before any value is written, see `DOMObjects.batch`
+            @param values [dict] {<path>: <value>, ...} relative to this node
+            @returns [None]
+        """
+        from .batch import set_many as SET_MANY
+        SET_MANY(self, values)
+
+    def validate(self) -> list:
+        """ @abstract Check all validated properties of this subtree in one
+                pass, see `DOMObjects.validation`
+            @returns [list] (<property path>, <message>) for each invalid
+                value, empty when valid
+        """
+        from .validation import validate as VALIDATE
+        return VALIDATE(self)
+
+    def memory_usage(self, deep: bool = True, top: int = None) -> dict:
+        """ @abstract Report the bytes held by this node or subtree, split
+                into node overhead, flag tables, name strings and property
+                values, see `DOMObjects.memory`
+            @param deep [bool] #optional Include all descendants
+            @param top [int] #optional Also return the `top` nodes holding the
+                most bytes themselves
+            @returns [dict] Report with category totals, per child subtree
+                totals, per DictGroup totals and optionally the top paths
+        """
+        from .memory import memory_usage as MEMORY_USAGE
+        return MEMORY_USAGE(self, deep=deep, top=top)
+
+    def new_dictgroup(self, name: str,
+                      columns: dict = None,
+                      maxlen: int = None,
+                      ttl: float = None,
+                      maxsize: int = None,
+                      sorted: bool = False,
+                      on_evict: object = None) -> None:
         """ @abstract Add child object to tree
             @param name [str] Child object name, name must conform to standard
                 python variable naming schemes.
+            @param columns [dict] #optional Column definitions, creates a
+                columnar group, see `columnar.ColumnGroup`
+            @param maxlen [int] #optional Member capacity, creates a ring
+                buffer group, see `groups.RingGroup`
+            @param ttl [float] #optional Member time to live in seconds,
+                creates an expiring group, see `groups.ExpiringGroup`
+            @param maxsize [int] #optional Least recently used member cap,
+                creates an expiring group, see `groups.ExpiringGroup`
+            @param sorted [bool] #optional Keep members in key order, creates
+                a sorted group, see `groups.SortedGroup`
+            @param on_evict [callable] #optional Eviction hook of an expiring
+                group, called as `on_evict(key, member, reason)`
             @returns [None]
+            @raises ValueError when options of different group kinds are
+                combined
         """
         if self.__name_exists__(name):
             raise(AssertionError("child '%s' exists" % name))
-        _instance = DictGroup(parent=self, name=name)
+        _kinds = [_kind for _kind, _set in (
+            ("columns", columns is not None),
+            ("maxlen", maxlen is not None),
+            ("ttl/maxsize", ttl is not None or maxsize is not None),
+            ("sorted", bool(sorted))) if _set]
+        if len(_kinds) > 1:
+            raise ValueError("dictgroup options %s can not be combined" %
+                             " and ".join(_kinds))
+        if on_evict is not None and _kinds != ["ttl/maxsize"]:
+            raise ValueError("on_evict requires ttl or maxsize")
+        if columns is not None:
+            _instance = ColumnGroup(parent=self, name=name, columns=columns)
+        elif maxlen is not None:
+            _instance = RingGroup(parent=self, name=name, maxlen=maxlen)
+        elif ttl is not None or maxsize is not None:
+            _instance = ExpiringGroup(parent=self, name=name, ttl=ttl,
+                                      maxsize=maxsize, on_evict=on_evict)
+        elif sorted:
+            _instance = SortedGroup(parent=self, name=name)
+        else:
+            _instance = DictGroup(parent=self, name=name)
         self.attach(name=name, obj=_instance)
 
     def new_dictgroup_bulk(self, nameList: list) -> None:
@@ -464,11 +851,14 @@ class DOMObject(object):
         for _n in nameList:
             self.new_dictgroup(_n)
 
-    def build_prop_map(self, schema_map: list = []) -> None:
+    def build_prop_map(self, schema_map: list = [],
+                       dedupe: object = False) -> None:
         """ @abstract Build a property tree from a defined schema and name map.
                 This is designed for properties values only.
             @param schema_map [list] List of tuples, defining dict, and child
                 name
+            @param dedupe [bool|ValuePool] #optional Share equal immutable
+                values through a value pool, see `DOMObjects.interning`
             @returns [None]
 
             @example Object Schema and Mapping [dict]
@@ -479,6 +869,7 @@ class DOMObject(object):
                         "default": <value>
                         "values": [<value>, ...]
                         "validate_callback": <callable>
+                        "flags": <int>
                     }
                 }
             }
@@ -487,11 +878,13 @@ class DOMObject(object):
                 (schema["<child_name>"], "<child_name>"), ...
             ]
         """
+        _pool = value_pool(dedupe)
         for _map, _sect in schema_map:
             _ctx = self
             if _sect is not None:
                 _ctx.new_child(_sect)
                 _ctx = _ctx.get_context(_sect)
+            _validators = compile_props(_map)
             for _key in _map:
                 if "cast" not in _map[_key]:
                     continue
@@ -499,24 +892,34 @@ class DOMObject(object):
                 _value = _map[_key]["cast"]()
                 if "default" in _map[_key]:
                     _value = _map[_key]["default"]
+                    if _key in _validators:
+                        _value = _validators[_key].coerce(_value)
 
                 if "flags" in _map[_key]:
                     _flags = _map[_key]["flags"]
                 else:
                     _flags = 0 | FLAG_READ | FLAG_WRITE
 
-                _ctx.new_property(_key, _value)
+                if _pool is not None:
+                    _value = _pool.get(_value)
+                # prop names repeat on every node built from the spec
+                _ctx.new_property(intern_name(_key), _value, _flags)
+            _ctx.__add_validators__(_validators)
 
-    def build_schema(self, schemaObj: DOMSchema) -> None:
+    def build_schema(self, schemaObj: DOMSchema,
+                     dedupe: object = False) -> None:
         """ @abstract Build an object based on the structure stated
                 by the schema object.
             @param schemaObj [DOMSchema] Structure to create.
+            @param dedupe [bool|ValuePool] #optional Share equal immutable
+                property values through a value pool, property names are
+                always interned, see `DOMObjects.interning`
             @returns [None]
         """
         def __build_props(propDict: dict,
                           ctx: object) -> None:
             """ @abstract Wrapper for contextual `build_prop_map`"""
-            ctx.build_prop_map([(propDict, None)])
+            ctx.build_prop_map([(propDict, None)], dedupe=dedupe)
 
         def __build_dictgroup(groupDict: list,
                               ctx: object) -> None:
@@ -576,8 +979,15 @@ class DOMObject(object):
 class DOMRootObject(DOMObject):
     """ @abstract Create a root DOM object, with a top-level namespace.
     """
-    def __init__(self):
+    def __init__(self, weak_parents: bool = False):
+        """ @abstract Root DOM object initializer
+            @param weak_parents [bool] #optional Nodes attached below the root
+                hold weak parent references, see `DOMObjects.gcutil`
+            @returns [None]
+        """
         super(DOMRootObject, self).__init__("root")
+        if weak_parents:
+            self.__weaken__()
 
 
 class DictGroup(MutableMapping, DOMObject):
@@ -592,6 +1002,9 @@ class DictGroup(MutableMapping, DOMObject):
             raise(AssertionError("child '%s' exists at parent." % name))
         object.__setattr__(self, "parent", parent)
         self.__keystore__ = dict()
+        self.__indexes__ = dict()
+        # id(member) -> key, kept while the group has indexes
+        self.__memberkeys__ = dict()
 
     def __getitem__(self, key: str) -> object:
         """ @abstract Parallel of dict.__getitem___ method
@@ -600,6 +1013,23 @@ class DictGroup(MutableMapping, DOMObject):
         """
         return self.__keystore__[key]
 
+    def get_context(self, name: str = None) -> object:
+        """ @abstract Get the context of a specific context, members are
+                resolved through the keystore before children
+            @param name [str] Named contexted and path to return from object
+            @returns [DOMObject] Node object of child
+        """
+        if name is None:
+            return self
+        if "." not in name:
+            if name in self.__keystore__:
+                return self.__keystore__[name]
+            return super(DictGroup, self).get_context(name)
+        _key, _rest = name.split('.', 1)
+        if _key in self.__keystore__:
+            return self.__keystore__[_key].get_context(_rest)
+        return super(DictGroup, self).get_context(name)
+
     def __setitem__(self, key: str, value: object) -> None:
         """ @abstract Parallel of dict.__setitem___ method
             @param key [str] Key name to add
@@ -608,14 +1038,24 @@ class DictGroup(MutableMapping, DOMObject):
         """
         if isinstance(value, DOMObject):
             self.__update_parent__(instance=value, parent=self)
+        if self.__indexes__ and key in self.__keystore__:
+            self.__index_remove__(key)
         self.__keystore__[key] = value
+        if self.__indexes__:
+            self.__index_add__(key, value)
+        if WATCHERS:
+            self.__notify__(key, value, "set")
 
     def __delitem__(self, key: str) -> None:
         """ @abstract Parallel of dict.__delitem___ method
             @param key [str] Key name to remove
             @returns None
         """
+        if self.__indexes__:
+            self.__index_remove__(key)
         del self.__keystore__[key]
+        if WATCHERS:
+            self.__notify__(key, None, "delete")
 
     def __iter__(self) -> MutableMapping:
         """ @abstract Parallel of dict.__iter___ method
@@ -652,15 +1092,20 @@ class DictGroup(MutableMapping, DOMObject):
             @returns [None]
         """
         assert not self.__flags__.protected
-        assert not self.__name_exists__(name)
+        # members set with `__setitem__` are held by the keystore only
+        assert not (self.__name_exists__(name) or name in self.__keystore__)
 
         if isinstance(obj, DOMObject):
             self.__update_parent__(instance=obj, parent=self)
 
-        self.update({name: obj})
-        self.__store__[name] = self.__keystore__[name]
+        self.__keystore__[name] = obj
+        if self.__indexes__:
+            self.__index_add__(name, obj)
+        self.__store__[name] = obj
         self.__children__.append(name)
         self.__flags__.set_flag(name, flags)
+        if WATCHERS:
+            self.__notify__(name, obj, "new")
 
     def detach(self, name: str) -> None:
         """ @abstract Override of DOMObject.deattach
@@ -668,12 +1113,19 @@ class DictGroup(MutableMapping, DOMObject):
             @returns [None]
         """
         assert not self.__flags__.protected
-        assert self.__contains__(name)
-        if name in self.__store__:
-            del self.__store__[name]
-        del self.__keystore__[name]
-        if name in self.__children__:
-            self.__children__.remove(name)
+        _keystore = self.__keystore__
+        assert name in _keystore
+        if self.__indexes__:
+            self.__index_remove__(name)
+        _member = _keystore.pop(name)
+        _store = self.__store__
+        if _store.get(name) is _member:
+            del _store[name]
+        _children = self.__children__
+        if name in _children:
+            _children.remove(name)
+        if WATCHERS:
+            self.__notify__(name, None, "delete")
 
     def update(self, *args, **kwargs) -> None:
         """ @abstract Override for dict.update, manages DOMObjects better
@@ -688,7 +1140,11 @@ class DictGroup(MutableMapping, DOMObject):
             @params [dict] Dict object to insert into keystore
         """
         if isinstance(args[0], dict):
-            self.__keystore__.update(args[0])
+            if self.__indexes__ or WATCHERS:
+                for _key, _value in args[0].items():
+                    self.__setitem__(key=_key, value=_value)
+            else:
+                self.__keystore__.update(args[0])
 
         elif (isinstance(args[0], str) and isinstance(args[1], DOMObject)):
             self.__setitem__(key=args[0], value=args[1])
@@ -698,4 +1154,140 @@ class DictGroup(MutableMapping, DOMObject):
                 self.__setitem__(key=_key, value=_value)
 
         else:
-            self.__keystore__.update(dict(*args, **kwargs))
+            self.update(dict(*args, **kwargs))
+
+    # Secondary indexes
+    def __index_add__(self, key: str, value: object) -> None:
+        """ @abstract Add a member to all indexes
+            @param key [str] Member key
+            @param value [object] Member object
+            @returns [None]
+        """
+        for _prop, _index in self.__indexes__.items():
+            _index.add(key, member_value(value, _prop))
+        if isinstance(value, DOMObject):
+            self.__memberkeys__[id(value)] = key
+            value.__add_hook__(_HOOK_INDEX)
+
+    def __index_remove__(self, key: str) -> None:
+        """ @abstract Remove a member from all indexes, called while the
+                member is still in the keystore
+            @param key [str] Member key
+            @returns [None]
+        """
+        for _index in self.__indexes__.values():
+            _index.remove(key)
+        _member = self.__keystore__.get(key)
+        if _member is not None:
+            self.__memberkeys__.pop(id(_member), None)
+
+    def __member_key__(self, member: object) -> str:
+        """ @abstract Resolve the keystore key of a member object, O(1)
+            @param member [DOMObject] Member object
+            @returns [str] Key, or None when not a member
+        """
+        _key = self.__memberkeys__.get(id(member))
+        if _key is not None and self.__keystore__.get(_key) is member:
+            return _key
+        return None
+
+    def __reindex_member__(self, member: object, propName: str) -> None:
+        """ @abstract Re-index a member after a property change
+            @param member [DOMObject] Member object
+            @param propName [str] Changed property name
+            @returns [None]
+        """
+        _key = self.__member_key__(member)
+        if _key is not None:
+            self.__indexes__[propName].update(_key,
+                                              member_value(member, propName))
+
+    @property
+    def indexes(self) -> list:
+        """ @abstract Names of the indexed member properties
+            @returns [list] Property names
+        """
+        return list(self.__indexes__)
+
+    def create_index(self, propName: str, sorted: bool = False) -> object:
+        """ @abstract Create an index over a property of the group members
+            @param propName [str] Member property name to index
+            @param sorted [bool] #optional Maintain a sorted index supporting
+                range lookups
+            @returns [HashIndex|SortedIndex] The index
+            @example Usage
+                ROOT.devices.create_index("site")
+                ROOT.devices.find("site", "lab")
+        """
+        if propName in self.__indexes__:
+            raise(AssertionError("index on '%s' exists" % propName))
+        _index = SortedIndex(propName) if sorted else HashIndex(propName)
+        _first = not self.__indexes__
+        for _key, _value in self.__keystore__.items():
+            _index.add(_key, member_value(_value, propName))
+            if _first and isinstance(_value, DOMObject):
+                self.__memberkeys__[id(_value)] = _key
+                _value.__add_hook__(_HOOK_INDEX)
+        self.__indexes__[propName] = _index
+        return _index
+
+    def drop_index(self, propName: str) -> None:
+        """ @abstract Remove the index over a member property
+            @param propName [str] Indexed property name
+            @returns [None]
+        """
+        if propName not in self.__indexes__:
+            raise(AssertionError("index on '%s' does not exist" % propName))
+        del self.__indexes__[propName]
+        if not self.__indexes__:
+            self.__memberkeys__.clear()
+
+    def find(self, propName: str, value: object) -> list:
+        """ @abstract Members whose property `propName` equals `value`
+            @param propName [str] Member property name
+            @param value [object] Value to match
+            @returns [list] Matching member objects
+        """
+        if propName in self.__indexes__:
+            _keys = self.__indexes__[propName].find(value)
+            return [self.__keystore__[_key] for _key in _keys]
+        return [_value for _value in self.__keystore__.values()
+                if member_value(_value, propName) == value]
+
+    def find_range(self, propName: str,
+                   lo: object = None,
+                   hi: object = None) -> list:
+        """ @abstract Members whose property `propName` lies between lo and hi
+            @param propName [str] Member property name with a sorted index
+            @param lo [object] #optional Inclusive lower bound
+            @param hi [object] #optional Inclusive upper bound
+            @returns [list] Matching member objects ordered by value
+        """
+        _index = self.__indexes__.get(propName)
+        if _index is None or not _index.sorted:
+            raise(AssertionError("no sorted index on '%s'" % propName))
+        return [self.__keystore__[_key] for _key in _index.range(lo, hi)]
+
+
+from .columnar import (
+    ColumnGroup,
+    ColumnProxy
+)
+
+from .groups import (
+    ExpiringGroup,
+    RingGroup,
+    SortedGroup
+)
+
+from .instrument import (
+    OperationStats
+)
+
+from .memory import (
+    memory_usage
+)
+
+from .locking import (
+    RWLock
+)
@@ -0,0 +1,332 @@
+__author__ = "Rob MacKinnon <rome@villagertech.com>"
+__package__ = "DOMObjects"
+__name__ = "DOMObjects.aio"
+__license__ = "MIT"
+
+__doc__ = """
+Asyncio support: awaitable method properties, concurrent `adict`/`ajson`
+and change watchers.
+
+Coroutine functions registered with `new_method`/`set_method` become async
+method properties. `await node.adict()` evaluates all of them in the subtree
+concurrently, while a plain `dict()` runs them to completion on a private
+event loop, and refuses to block when called inside a running loop.
+
+`node.watch(prefix)` is an async iterator of `Change` records for every
+mutation below the watched path. Watchers are bound to the node they were
+created on and match changes by walking the parents of the mutated node,
+so equally named trees never see each other's changes. Writes to node
+internals, e.g. `parent` or `__children__`, are not changes. Mutators only
+check whether any watcher is registered, so trees without watchers pay
+nothing, and changes made from other threads are handed to the watcher's
+loop thread safely.
+
+    @example Usage
+        async def fetch_temp():
+            ...
+        ROOT.sensor.new_method("temp", fetch_temp)
+        await ROOT.ajson()
+
+        async for change in ROOT.watch("settings"):
+            print(change.path, change.kind, change.value)
+"""
+
+# asyncio and inspect are imported on first use, keeping the package
+# import light for trees without async method properties
+from collections import namedtuple
+from json import dumps as JSON_DUMPS
+from weakref import ref
+
+# A tree mutation, kind is one of "new", "set" or "delete"
+Change = namedtuple("Change", ("path", "kind", "value"))
+
+# Weak references to the registered watchers, mutators only notify when
+# this list is not empty. A watcher abandoned by `break` is dropped from it
+# as soon as it is released.
+WATCHERS = []
+
+# Node attributes that are bookkeeping, never reported as changes
+_INTERNAL = frozenset(("name", "parent"))
+
+
+def async_method(method: object, margs: list, mkwargs: dict) -> object:
+    """ @abstract Bind the arguments of a coroutine function method prop
+        @param method [callable] Coroutine function
+        @param margs [list] Method arguments
+        @param mkwargs [dict] Method keyword arguments
+        @returns [coroutine function] Bound method prop
+    """
+    async def _method():
+        return await method(*margs, **mkwargs)
+    return _method
+
+
+def is_async(method: object) -> bool:
+    """ @abstract Whether a method prop should be registered as async
+        @param method [callable] Method
+        @returns [bool] True for coroutine functions
+    """
+    from inspect import iscoroutinefunction
+    return iscoroutinefunction(method)
+
+
+def _running_loop() -> object:
+    """ @abstract Event loop running in this thread
+        @returns [AbstractEventLoop] Loop, or None
+    """
+    import asyncio
+    try:
+        return asyncio.get_running_loop()
+    except AttributeError:  # Python < 3.7
+        return asyncio.events._get_running_loop()
+    except RuntimeError:
+        return None
+
+
+async def _await(awaitable: object) -> object:
+    return await awaitable
+
+
+def run_sync(awaitable: object) -> object:
+    """ @abstract Resolve an awaitable method prop from synchronous code
+        @param awaitable [awaitable] Result of an async method prop
+        @returns [object] Awaited value
+    """
+    import asyncio
+    if _running_loop() is not None:
+        if hasattr(awaitable, "close"):
+            awaitable.close()
+        raise RuntimeError("async method property evaluated by dict() inside "
+                           "a running event loop, use `await adict()`")
+    if hasattr(asyncio, "run"):
+        return asyncio.run(_await(awaitable))
+    _loop = asyncio.new_event_loop()
+    try:
+        return _loop.run_until_complete(_await(awaitable))
+    finally:
+        _loop.close()
+
+
+def _collect_node(node: object, props: list, propsOnly: bool,
+                  pending: list) -> tuple:
+    """ @abstract Build the `dict()` output of one node, leaving awaitable
+            values to be filled in by the caller
+        @param node [DOMObject] Node
+        @param props [list] #optional Properties to return
+        @param propsOnly [bool] #optional Skip the children
+        @param pending [list] Collects (dict, key, awaitable) entries
+        @returns [tuple] (output, [(child name, child), ...]) where children
+            still have to be collected into the output
+    """
+    from . import DOMObject
+
+    if type(node).dict is not DOMObject.dict:
+        # Columnar and other custom outputs have no async values
+        return node.dict(props=props, propsOnly=propsOnly), []
+    node.__before_output__()
+    _out = {}
+    if props is None:
+        _propNames = node.__properties__
+    else:
+        _propNames = props
+        for _prop in _propNames:
+            if not node.has_property(_prop):
+                raise KeyError("property `%s` is not defined." % _prop)
+    for _prop in _propNames:
+        # same evaluation as `DOMObject.dict`
+        if node.has_property(_prop):
+            _ret = getattr(node, _prop)
+            if callable(_ret):
+                _ret = _ret()
+            else:
+                _ret = node.get_property(_prop)
+        else:
+            _ret = getattr(node, _prop)
+        if callable(_ret):
+            _ret = _ret()
+        if hasattr(_ret, "__await__"):
+            pending.append((_out, _prop, _ret))
+            _ret = None
+        _out[_prop] = _ret
+    _children = []
+    if not propsOnly:
+        _members = node.__dict__.get("__keystore__", node.__store__)
+        for _child in node.__children__:
+            _out[_child] = None
+            _children.append((_child, _members[_child]))
+    return _out, _children
+
+
+def _collect(node: object, props: list, propsOnly: bool,
+             pending: list) -> dict:
+    """ @abstract Build the `dict()` output of a subtree, leaving awaitable
+            values to be filled in by the caller
+        @param node [DOMObject] Subtree root
+        @param props [list] #optional Properties of the root to return
+        @param propsOnly [bool] #optional Skip the children of the root
+        @param pending [list] Collects (dict, key, awaitable) entries
+        @returns [dict] Output, awaitable values still unset
+    """
+    _result, _children = _collect_node(node, props, propsOnly, pending)
+    _stack = [(_child, _result, _name) for _name, _child in _children]
+    while _stack:
+        _node, _target, _key = _stack.pop()
+        _out, _children = _collect_node(_node, None, False, pending)
+        _target[_key] = _out
+        _stack.extend((_child, _out, _name) for _name, _child in _children)
+    return _result
+
+
+async def adict(node: object, props: list = None,
+                propsOnly: bool = False) -> dict:
+    """ @abstract `dict()` output of a subtree, async method properties are
+            awaited concurrently
+        @param node [DOMObject] Subtree root
+        @param props [list] #optional List of specific properties to return
+        @param propsOnly [bool] #optional Should only properties be returned
+        @returns [dict] Static dictionary object
+    """
+    import asyncio
+    _pending = []
+    _result = _collect(node, props, propsOnly, _pending)
+    if _pending:
+        _values = await asyncio.gather(*[_aw for _d, _k, _aw in _pending])
+        for (_target, _key, _aw), _value in zip(_pending, _values):
+            _target[_key] = _value
+    return _result
+
+
+async def ajson(node: object, props: list = None,
+                propsOnly: bool = False) -> str:
+    """ @abstract `json()` output of a subtree, async method properties are
+            awaited concurrently
+        @param node [DOMObject] Subtree root
+        @param props [list] #optional List of specific properties to return
+        @param propsOnly [bool] #optional Should only properties be returned
+        @returns [str] JSON text object
+    """
+    return JSON_DUMPS(await adict(node, props=props, propsOnly=propsOnly))
+
+
+def is_internal(name: object) -> bool:
+    """ @abstract Whether an attribute write is node bookkeeping
+        @param name [str] Attribute name
+        @returns [bool] True for `name`, `parent` and dunder names
+    """
+    return name in _INTERNAL or (isinstance(name, str) and
+                                 name.startswith("__") and
+                                 name.endswith("__"))
+
+
+def _unregister(watchRef: ref) -> None:
+    """ @abstract Drop a watcher reference, also the weakref callback
+        @param watchRef [weakref] Watcher reference
+        @returns [None]
+    """
+    if watchRef in WATCHERS:
+        WATCHERS.remove(watchRef)
+
+
+class Watch(object):
+    """ @abstract Async iterator of the changes below a node. Registers on
+            iteration start, unregisters on `close`, on leaving an
+            `async with` block, when the iteration is cancelled or when the
+            watcher is released, e.g. after `break` in a plain `async for`.
+        @param node [DOMObject] Watched node
+        @param prefix [str] #optional Dotted path below `node`, changes to
+            it and below it match. Defaults to the whole subtree.
+        @param maxsize [int] #optional Queue bound, 0 for unbounded. When
+            full, further changes are dropped and `dropped` is counted.
+    """
+    def __init__(self, node: object, prefix: str = None, maxsize: int = 0):
+        self.node = node
+        self.prefix = prefix
+        self.path = node.path if prefix is None else \
+            "%s.%s" % (node.path, prefix)
+        self.maxsize = maxsize
+        self.dropped = 0
+        self.loop = None
+        self.queue = None
+        self.ref = None
+
+    async def __aenter__(self) -> object:
+        return self.__aiter__()
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
+
+    def __aiter__(self) -> object:
+        if self.loop is None:
+            import asyncio
+            self.loop = _running_loop() or asyncio.get_event_loop()
+            self.queue = asyncio.Queue(self.maxsize)
+            self.ref = ref(self, _unregister)
+            WATCHERS.append(self.ref)
+        return self
+
+    async def __anext__(self) -> Change:
+        if self.queue is None:
+            raise StopAsyncIteration
+        try:
+            return await self.queue.get()
+        except BaseException:
+            self.close()
+            raise
+
+    def __put__(self, change: Change) -> None:
+        """ @abstract Enqueue a change, runs on the watcher's loop
+            @param change [Change] Change record
+            @returns [None]
+        """
+        if self.queue.full():
+            self.dropped += 1
+        else:
+            self.queue.put_nowait(change)
+
+    def matches(self, relative: str) -> bool:
+        """ @abstract Whether a change below the watched node is watched
+            @param relative [str] Changed path relative to `node`
+            @returns [bool] True when at or below the watched prefix
+        """
+        _prefix = self.prefix
+        return (_prefix is None or relative == _prefix or
+                relative.startswith(_prefix + "."))
+
+    def close(self) -> None:
+        """ @abstract Stop watching
+            @returns [None]
+        """
+        _unregister(self.ref)
+
+
+def notify(node: object, name: object, value: object, kind: str) -> None:
+    """ @abstract Hand a mutation to the matching watchers
+        @param node [DOMObject] Mutated node
+        @param name [str] Changed property, child or member name
+        @param value [object] New value, None for deletions
+        @param kind [str] "new", "set" or "delete"
+        @returns [None]
+    """
+    # changed path relative to each ancestor, keyed by ancestor identity
+    _relative = {}
+    _names = [str(name)]
+    _node = node
+    while _node is not None:
+        _relative[id(_node)] = ".".join(reversed(_names))
+        _names.append(_node.name)
+        _node = _node.parent
+    _change = None
+    for _ref in list(WATCHERS):
+        _watcher = _ref()
+        if _watcher is None:
+            continue
+        _path = _relative.get(id(_watcher.node))
+        if _path is None or not _watcher.matches(_path):
+            continue
+        if _change is None:
+            _change = Change("%s.%s" % (node.path, name), kind, value)
+        try:
+            _watcher.loop.call_soon_threadsafe(_watcher.__put__, _change)
+        except RuntimeError:
+            # loop closed
+            _watcher.close()
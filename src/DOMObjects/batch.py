@@ -0,0 +1,178 @@
+__author__ = "Rob MacKinnon <rome@villagertech.com>"
+__package__ = "DOMObjects"
+__name__ = "DOMObjects.batch"
+__license__ = "MIT"
+
+__doc__ = """
+Bulk multi-path property access, see `DOMObject.get_many` and
+`DOMObject.set_many`.
+
+Paths are split once into a node path and a property name. Each distinct
+node path is resolved a single time, reusing the nodes of shared prefixes,
+and its store and flag table are fetched once, so further properties of
+the same node cost a dict lookup and a bit test each. Dunder names, e.g.
+`__flags__`, are node internals and never match a property.
+
+    @example Usage
+        ROOT.get_many(["settings.app.lang_locale", "settings.app.theme"])
+        >>> {"settings.app.lang_locale": "en_US", "settings.app.theme": "dark"}
+        ROOT.set_many({"settings.app.theme": "light"})
+"""
+
+from warnings import warn
+
+from .flags import FLAG_READ, FLAG_WRITE
+from .index import MISSING
+
+
+def _is_internal(name: str) -> bool:
+    """ @abstract Whether a name is a node internal, not a property
+        @param name [str] Name
+        @returns [bool] True for dunder names
+    """
+    return name.startswith("__") and name.endswith("__")
+
+
+def _group(paths: object) -> dict:
+    """ @abstract Group property paths by node path
+        @param paths [iterable] Dotted property paths
+        @returns [dict] {<node path>: [(<path>, <prop name>), ...]}
+    """
+    _groups = {}
+    for _path in paths:
+        _nodePath, _, _prop = _path.rpartition(".")
+        _entries = _groups.get(_nodePath)
+        if _entries is None:
+            _groups[_nodePath] = [(_path, _prop)]
+        else:
+            _entries.append((_path, _prop))
+    return _groups
+
+
+def _child(node: object, name: str) -> object:
+    """ @abstract Resolve a child node by name, including DictGroup members
+        @param node [DOMObject] Parent node
+        @param name [str] Child name
+        @returns [DOMObject] Child, or None when missing or not a node
+    """
+    _keystore = node.__dict__.get("__keystore__")
+    if _keystore is not None and name in _keystore:
+        _child = _keystore[name]
+    else:
+        _child = node.__store__.get(name)
+    return _child if hasattr(_child, "__flags__") else None
+
+
+def _resolve_nodes(node: object, nodePaths: object,
+                   nodes: dict = None) -> dict:
+    """ @abstract Resolve node paths, each shared prefix once
+        @param node [DOMObject] Start node
+        @param nodePaths [iterable] Dotted node paths, "" for `node`
+        @param nodes [dict] #optional Already resolved nodes, updated
+        @returns [dict] {<node path>: node, or None when missing}
+    """
+    _nodes = {"": node} if nodes is None else nodes
+    for _path in nodePaths:
+        # walk up to the longest resolved prefix, then back down
+        _steps = []
+        _prefix = _path
+        while _prefix not in _nodes:
+            _parent, _, _name = _prefix.rpartition(".")
+            _steps.append((_prefix, _name))
+            _prefix = _parent
+        _node = _nodes[_prefix]
+        while _steps:
+            _prefix, _name = _steps.pop()
+            if _node is not None:
+                _node = _child(_node, _name)
+            _nodes[_prefix] = _node
+    return _nodes
+
+
+def get_many(node: object, paths: list, default: object = MISSING) -> dict:
+    """ @abstract Read many properties by path
+        @param node [DOMObject] Node paths are relative to
+        @param paths [list] Dotted property paths
+        @param default [object] #optional Value of missing paths, without a
+            default a missing path raises KeyError
+        @returns [dict] {<path>: <value>, ...}
+    """
+    _nodes = {"": node}
+    # node path -> (store, flag table), None for missing nodes
+    _tables = {}
+    _ret = {}
+    for _path in paths:
+        _nodePath, _, _prop = _path.rpartition(".")
+        _table = _tables.get(_nodePath, MISSING)
+        if _table is MISSING:
+            _parentPath, _, _name = _nodePath.rpartition(".")
+            _node = _nodes.get(_parentPath, MISSING)
+            if _node is MISSING:
+                _node = _resolve_nodes(node, (_parentPath,),
+                                       _nodes)[_parentPath]
+            if _nodePath and _node is not None:
+                # `_child` inlined, this runs once per distinct node. The
+                # store of a node holds its attributes, keystore included
+                _store = _node.__store__
+                _keystore = _store.get("__keystore__")
+                if _keystore is not None and _name in _keystore:
+                    _node = _keystore[_name]
+                else:
+                    _node = _store.get(_name)
+            _flags = getattr(_node, "__flags__", None)
+            _table = None if _flags is None else \
+                (_node.__store__, _flags.__flags__)
+            _tables[_nodePath] = _table
+        if _table is not None:
+            _store, _flags = _table
+            if _prop in _store and (_prop[:1] != "_" or
+                                    not _is_internal(_prop)):
+                if not _flags.get(_prop, FLAG_READ) & FLAG_READ:
+                    raise(AssertionError("property `%s` is not readable" %
+                                         _path))
+                _ret[_path] = _store[_prop]
+                continue
+        if default is MISSING:
+            raise KeyError("path `%s` does not exist" % _path)
+        _ret[_path] = default
+    return _ret
+
+
+def set_many(node: object, values: dict) -> None:
+    """ @abstract Write many properties by path. All paths, flags and
+            validators are checked before any value is written.
+        @param node [DOMObject] Node paths are relative to
+        @param values [dict] {<path>: <value>, ...}
+        @returns [None]
+    """
+    _groups = _group(values)
+    _nodes = _resolve_nodes(node, _groups)
+    _writes = []
+    for _key, _entries in _groups.items():
+        _node = _nodes[_key]
+        if _node is None:
+            raise KeyError("path `%s` does not exist" % _entries[0][0])
+        _store = _node.__store__
+        _flags = _node.__flags__.__flags__
+        # column members have no instance dict, they validate on write
+        _attrs = getattr(_node, "__dict__", None)
+        _validators = _attrs.get("__validators__") if _attrs else None
+        for _path, _prop in _entries:
+            if _is_internal(_prop):
+                raise KeyError("path `%s` is not a property" % _path)
+            _value = values[_path]
+            if _prop in _store:
+                if not _flags.get(_prop, FLAG_WRITE) & FLAG_WRITE:
+                    raise(AssertionError("property `%s` is locked" % _path))
+                if _validators and _prop in _validators:
+                    _value = _validators[_prop].coerce(_value)
+            _writes.append((_node, _prop, _value))
+
+    for _node, _prop, _value in _writes:
+        if not hasattr(_node, "__assign__"):
+            _node.set_property(_prop, _value)
+        elif _prop in _node.__store__:
+            _node.__assign__(_prop, _value, validate=False)
+        else:
+            warn("Attempted to set non-existent property '%s', running `new_property` method." % _prop)
+            _node.new_property(_prop, _value)
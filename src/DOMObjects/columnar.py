@@ -0,0 +1,625 @@
+__author__ = "Rob MacKinnon <rome@villagertech.com>"
+__package__ = "DOMObjects"
+__name__ = "DOMObjects.columnar"
+__license__ = "MIT"
+
+__doc__ = """
+Columnar DictGroup for large sets of homogeneous members.
+
+Instead of one `DOMObject` per member, a `ColumnGroup` stores each member
+property as a column. Columns with a numeric `cast` (int, float, bool) are
+backed by `array.array`, all other columns by lists. Members are handed out
+as lightweight `ColumnProxy` nodes created on access, and column aggregates
+use NumPy, when installed, over zero-copy views of the arrays. Assigning None
+to a numeric column turns it into a list column, aggregates skip None.
+
+    @example Usage
+        ROOT.new_dictgroup("history", columns={
+            "ts": {"cast": float},
+            "value": {"cast": int, "default": 0},
+            "source": {"cast": str}
+        })
+        ROOT.history.new_record("evt_1", {"ts": 1.5, "value": 3})
+        ROOT.history["evt_1"].value
+        >>> 3
+        ROOT.history.sum("value")
+        >>> 3
+"""
+
+from array import array
+from collections.abc import Mapping
+import operator
+
+from . import DOMObject, DictGroup
+from .aio import WATCHERS
+from .flags import DOMFlags, FLAG_READ, FLAG_WRITE
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# array.array type codes of numeric casts
+_TYPECODES = {
+    int: "q",
+    float: "d",
+    bool: "b"
+}
+
+_OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<=": operator.le,
+    ">=": operator.ge,
+    "<": operator.lt,
+    ">": operator.gt
+}
+
+# Row key marker of deleted rows, until compaction
+_DELETED = object()
+
+
+class _RowMap(Mapping):
+    """ @abstract Keystore view of a ColumnGroup, maps member keys to proxies
+    """
+    __slots__ = ("group",)
+
+    def __init__(self, group: object):
+        self.group = group
+
+    def __getitem__(self, key: str) -> object:
+        if key not in self.group.__rows__:
+            raise KeyError(key)
+        return ColumnProxy(self.group, key)
+
+    def __iter__(self) -> object:
+        for _key in self.group.__rowkeys__:
+            if _key is not _DELETED:
+                yield _key
+
+    def __len__(self) -> int:
+        return len(self.group.__rows__)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.group.__rows__
+
+
+class _RowStore(Mapping):
+    """ @abstract `__store__` view of a single row, column name to value
+    """
+    __slots__ = ("group", "key")
+
+    def __init__(self, group: object, key: str):
+        self.group = group
+        self.key = key
+
+    def __getitem__(self, column: str) -> object:
+        return self.group.get_value(self.key, column)
+
+    def __iter__(self) -> object:
+        return iter(self.group.__columns__)
+
+    def __len__(self) -> int:
+        return len(self.group.__columns__)
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.group.__columns__
+
+
+class ColumnProxy(object):
+    """ @abstract Lightweight member node of a ColumnGroup, reads and writes
+            go straight to the group columns.
+    """
+    __slots__ = ("parent", "name")
+
+    __children__ = ()
+
+    def __init__(self, group: object, key: str):
+        object.__setattr__(self, "parent", group)
+        object.__setattr__(self, "name", key)
+
+    def __getattr__(self, name: str) -> object:
+        if name in self.parent.__columns__:
+            return self.get_property(name)
+        raise AttributeError(name)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        if name not in self.parent.__columns__:
+            raise KeyError("column `%s` is not defined" % name)
+        self.set_property(name, value)
+
+    def __eq__(self, other: object) -> bool:
+        return (isinstance(other, ColumnProxy) and
+                other.parent is self.parent and other.name == self.name)
+
+    def __hash__(self) -> int:
+        return hash((id(self.parent), self.name))
+
+    # DOMObject compatible internals
+    @property
+    def __store__(self) -> Mapping:
+        return _RowStore(self.parent, self.name)
+
+    @property
+    def __properties__(self) -> list:
+        return list(self.parent.__columns__)
+
+    @property
+    def __flags__(self) -> DOMFlags:
+        return self.parent.__colflags__
+
+    # Public Properties
+    @property
+    def children(self) -> list:
+        """ @abstract Column members have no children
+            @returns [list] Empty list
+        """
+        return []
+
+    @property
+    def props(self) -> list:
+        """ @abstract Property to return all member properties (columns)
+            @returns [list] List of column names
+        """
+        return list(self.parent.__columns__)
+
+    @property
+    def siblings(self) -> list:
+        """ @abstract Property to return all sibling names
+            @returns [list] List of sibling keys, in group order
+        """
+        return [_key for _key in self.parent.__keystore__
+                if _key != self.name]
+
+    @property
+    def path(self) -> str:
+        """ @abstract Returns a nodes full object path
+            @returns [str] Object named path
+        """
+        return self.parent.path + '.' + str(self.name)
+
+    # Public Methods
+    def has_property(self, prop: str) -> bool:
+        """ @abstract Check if property (column) exists
+            @param prop [str] Property name
+            @returns [bool] True if exists
+        """
+        return prop in self.parent.__columns__
+
+    def get_property(self, propName: str) -> object:
+        """ @abstract Retrieve a specific property by name.
+            @param propName [str] Property to retrieve.
+            @returns [object]
+        """
+        if propName not in self.parent.__columns__:
+            raise(AssertionError("property '%s' does not exist" % propName))
+        assert (self.parent.__colflags__.test_bit(propName, FLAG_READ) is True)
+        return self.parent.get_value(self.name, propName)
+
+    def set_property(self, propName: str, propValue: object) -> None:
+        """ @abstract Set the value of a property by name
+            @param propName [str] Property name to set
+            @param propValue [object] Value to set to property
+            @returns [None]
+        """
+        self.parent.set_value(self.name, propName, propValue)
+
+    def dict(self, props: list = None, propsOnly: bool = False) -> dict:
+        """ @abstract Static dictionary of the member row
+            @param props [list] #optional List of specific properties to return
+            @param propsOnly [bool] #optional Unused, members have no children
+            @returns [dict] Static dictionary object
+        """
+        _props = self.parent.__columns__ if props is None else props
+        return {_col: self.get_property(_col) for _col in _props}
+
+    def json(self, props: list = None, propsOnly: bool = False) -> str:
+        """ @abstract JSON output of the member row
+            @param props [list] #optional List of specific properties to return
+            @param propsOnly [bool] #optional Unused, members have no children
+            @returns [str] JSON text object
+        """
+        from json import dumps as JSON_DUMPS
+        return JSON_DUMPS(self.dict(props=props))
+
+
+class ColumnGroup(DictGroup):
+    """ @abstract DictGroup storing member properties as typed columns.
+        @param parent [DOMObject] Assign a parent object
+        @param name [str] Object unique name
+        @param columns [dict] #optional Column definitions, in the prop format
+            of `build_prop_map`, {"<name>": {"cast": <type>, "default": <v>}}
+    """
+    def __init__(self, parent: object = None, name: str = "",
+                 columns: dict = None):
+        super(ColumnGroup, self).__init__(parent=parent, name=name)
+        self.__columns__ = {}
+        self.__casts__ = {}
+        self.__defaults__ = {}
+        self.__colflags__ = DOMFlags()
+        self.__rowkeys__ = []
+        self.__rows__ = {}
+        self.__deleted__ = 0
+        self.__keystore__ = _RowMap(self)
+        self.__children__ = self.__keystore__.keys()
+        for _col, _spec in (columns or {}).items():
+            self.new_column(_col,
+                            cast=_spec.get("cast"),
+                            default=_spec.get("default"),
+                            flags=_spec.get("flags",
+                                            0 | FLAG_READ | FLAG_WRITE))
+
+    # Private methods
+    def __compact__(self) -> None:
+        """ @abstract Drop deleted rows from all columns
+            @returns [None]
+        """
+        if not self.__deleted__:
+            return
+        _live = [_row for _row, _key in enumerate(self.__rowkeys__)
+                 if _key is not _DELETED]
+        for _col, _values in self.__columns__.items():
+            _new = [_values[_row] for _row in _live]
+            if isinstance(_values, array):
+                _new = array(_values.typecode, _new)
+            self.__columns__[_col] = _new
+        self.__rowkeys__ = [self.__rowkeys__[_row] for _row in _live]
+        self.__rows__ = {_key: _row
+                         for _row, _key in enumerate(self.__rowkeys__)}
+        self.__deleted__ = 0
+
+    def __cast__(self, column: str, value: object) -> object:
+        """ @abstract Cast a value for storage in `column`
+            @param column [str] Column name
+            @param value [object] Value to store
+            @returns [object] Stored value
+        """
+        _cast = self.__casts__[column]
+        if _cast is None or value is None or isinstance(value, _cast):
+            return value
+        return _cast(value)
+
+    def __put__(self, column: str, row: int, value: object) -> None:
+        """ @abstract Store a value in a column row
+            @param column [str] Column name
+            @param row [int] Row position
+            @param value [object] Value to store, cast first
+            @returns [None]
+        """
+        _values = self.__columns__[column]
+        _value = self.__cast__(column, value)
+        if _value is None and isinstance(_values, array):
+            # typed arrays cannot hold nulls, keep the column as a list
+            _values = self.__columns__[column] = _values.tolist()
+        _values[row] = _value
+
+    def __view__(self, name: str) -> object:
+        """ @abstract Column storage for aggregates, a zero-copy NumPy view
+                of numeric columns when NumPy is installed. Views must not
+                outlive the call, the array cannot grow while one exists.
+            @param name [str] Column name
+            @returns [array|list|numpy.ndarray] Column values
+        """
+        self.__compact__()
+        _values = self.__columns__[name]
+        if numpy is not None and isinstance(_values, array):
+            return numpy.frombuffer(_values, dtype=_values.typecode) \
+                if len(_values) else numpy.array([], dtype=_values.typecode)
+        return _values
+
+    def __member_key__(self, member: object) -> str:
+        """ @abstract Override of DictGroup.__member_key__, O(1) for proxies
+            @param member [ColumnProxy] Member proxy
+            @returns [str] Key, or None when not a member
+        """
+        if member.name in self.__rows__:
+            return member.name
+        return None
+
+    def __row_values__(self, value: object) -> dict:
+        """ @abstract Extract column values from an assigned member value
+            @param value [dict|DOMObject|ColumnProxy] Member value
+            @returns [dict] Column name to value
+        """
+        if isinstance(value, dict):
+            _unknown = set(value) - set(self.__columns__)
+            if _unknown:
+                raise KeyError("columns `%s` are not defined" %
+                               "`, `".join(sorted(map(str, _unknown))))
+            return value
+        if isinstance(value, (DOMObject, ColumnProxy)):
+            return {_col: value.get_property(_col)
+                    for _col in self.__columns__
+                    if value.has_property(_col)}
+        raise TypeError("column members must be dict or DOMObject, not %s" %
+                        type(value).__name__)
+
+    # Public Properties
+    @property
+    def columns(self) -> list:
+        """ @abstract Column names
+            @returns [list] List of column names
+        """
+        return list(self.__columns__)
+
+    @property
+    def children(self) -> list:
+        """ @abstract Property to return all member keys
+            @returns [list] List of member keys
+        """
+        return list(self.__keystore__)
+
+    # Public Methods
+    def new_column(self, name: str,
+                   cast: type = None,
+                   default: object = None,
+                   flags: int = 0 | FLAG_READ | FLAG_WRITE) -> None:
+        """ @abstract Add a column, existing members get the default value
+            @param name [str] Column (member property) name
+            @param cast [type] #optional Value type, int, float and bool
+                columns are stored in typed arrays
+            @param default [object] #optional Default value, defaults to
+                `cast()` for numeric casts
+            @param flags [byte] byte mask of flags
+            @returns [None]
+        """
+        assert not self.__flags__.protected
+        if name in self.__columns__:
+            raise(AssertionError("column '%s' exists" % name))
+        _typecode = _TYPECODES.get(cast)
+        if _typecode is not None and default is None:
+            default = cast()
+        _rows = len(self.__rowkeys__)
+        if _typecode is not None:
+            _values = array(_typecode, [default]) * _rows
+        else:
+            _values = [default] * _rows
+        self.__columns__[name] = _values
+        self.__casts__[name] = cast
+        self.__defaults__[name] = default
+        self.__colflags__.set_flag(name, flags)
+
+    def new_record(self, key: str, values: dict = None, **kwargs) -> None:
+        """ @abstract Add or replace a member row
+            @param key [str] Member key
+            @param values [dict] #optional Column values, missing columns
+                take their default
+            @returns [None]
+        """
+        _values = dict(values or {})
+        _values.update(kwargs)
+        self.__setitem__(key, _values)
+
+    def get_value(self, key: str, column: str) -> object:
+        """ @abstract Value of a column for one member
+            @param key [str] Member key
+            @param column [str] Column name
+            @returns [object] Stored value
+        """
+        _value = self.__columns__[column][self.__rows__[key]]
+        if self.__casts__[column] is bool and _value is not None:
+            return bool(_value)
+        return _value
+
+    def set_value(self, key: str, column: str, value: object) -> None:
+        """ @abstract Set a column value of one member
+            @param key [str] Member key
+            @param column [str] Column name
+            @param value [object] Value to store
+            @returns [None]
+        """
+        if column not in self.__columns__:
+            raise(AssertionError("property '%s' does not exist" % column))
+        assert (self.__colflags__.test_bit(column, FLAG_WRITE) is True)
+        self.__put__(column, self.__rows__[key], value)
+        if column in self.__indexes__:
+            self.__indexes__[column].update(key, self.get_value(key, column))
+        if WATCHERS:
+            self.__notify__("%s.%s" % (key, column),
+                            self.get_value(key, column), "set")
+
+    def column(self, name: str) -> object:
+        """ @abstract Values of a column in member order
+            @param name [str] Column name
+            @returns [array|list|numpy.ndarray] Copy of the column values,
+                a NumPy array for numeric columns when NumPy is installed
+        """
+        _values = self.__view__(name)
+        if numpy is not None and isinstance(_values, numpy.ndarray):
+            return _values.copy()
+        return _values[:]
+
+    def sum(self, name: str) -> object:
+        """ @abstract Sum of a column
+            @param name [str] Column name
+            @returns [number] Sum of values, None values are skipped
+        """
+        _values = self.__view__(name)
+        if numpy is not None and isinstance(_values, numpy.ndarray):
+            return _values.sum().item()
+        return sum(_v for _v in _values if _v is not None)
+
+    def min(self, name: str) -> object:
+        """ @abstract Minimum of a column
+            @param name [str] Column name
+            @returns [object] Minimum value, None when empty
+        """
+        _values = self.__view__(name)
+        if numpy is not None and isinstance(_values, numpy.ndarray):
+            _min = _values.min().item() if len(_values) else None
+        else:
+            _min = min((_v for _v in _values if _v is not None), default=None)
+        if self.__casts__[name] is bool and _min is not None:
+            return bool(_min)
+        return _min
+
+    def max(self, name: str) -> object:
+        """ @abstract Maximum of a column
+            @param name [str] Column name
+            @returns [object] Maximum value, None when empty
+        """
+        _values = self.__view__(name)
+        if numpy is not None and isinstance(_values, numpy.ndarray):
+            _max = _values.max().item() if len(_values) else None
+        else:
+            _max = max((_v for _v in _values if _v is not None), default=None)
+        if self.__casts__[name] is bool and _max is not None:
+            return bool(_max)
+        return _max
+
+    def mean(self, name: str) -> float:
+        """ @abstract Arithmetic mean of a column
+            @param name [str] Column name
+            @returns [float] Mean of the values that are not None, None
+                when there are none
+        """
+        _values = self.__view__(name)
+        if numpy is not None and isinstance(_values, numpy.ndarray):
+            return _values.mean().item() if len(_values) else None
+        _present = [_v for _v in _values if _v is not None]
+        if not _present:
+            return None
+        return sum(_present) / len(_present)
+
+    def filter(self, name: str, op: str, value: object) -> list:
+        """ @abstract Keys of members whose column value matches
+            @param name [str] Column name
+            @param op [str] Comparison, one of == != < <= > >=
+            @param value [object] Value to compare against
+            @returns [list] Matching member keys in member order
+            @example Usage
+                ROOT.history.filter("value", ">", 10)
+        """
+        _op = _OPERATORS[op]
+        _values = self.__view__(name)
+        _keys = self.__rowkeys__
+        if numpy is not None and isinstance(_values, numpy.ndarray):
+            return [_keys[_row] for _row in
+                    numpy.flatnonzero(_op(_values, value)).tolist()]
+        return [_keys[_row] for _row, _v in enumerate(_values)
+                if _v is not None and _op(_v, value)]
+
+    # DictGroup overrides
+    def __setitem__(self, key: str, value: object) -> None:
+        """ @abstract Store a member row from a dict, DOMObject or proxy
+            @param key [str] Key name to add
+            @param value [dict|DOMObject] Member values
+            @returns None
+        """
+        # cast the whole row first, a bad value leaves the group unchanged
+        _values = {_col: self.__cast__(_col, _value)
+                   for _col, _value in self.__row_values__(value).items()}
+        _new = key not in self.__rows__
+        if _new:
+            _row = len(self.__rowkeys__)
+            self.__rowkeys__.append(key)
+            self.__rows__[key] = _row
+            for _col, _column in self.__columns__.items():
+                _column.append(self.__defaults__[_col])
+        else:
+            _row = self.__rows__[key]
+            _previous = {_col: self.__columns__[_col][_row]
+                         for _col in _values}
+        try:
+            for _col, _value in _values.items():
+                self.__put__(_col, _row, _value)
+        except (OverflowError, TypeError, ValueError):
+            # cast values the typed arrays cannot hold, e.g. out of range
+            if _new:
+                for _column in self.__columns__.values():
+                    del _column[_row]
+                self.__rowkeys__.pop()
+                del self.__rows__[key]
+            else:
+                for _col, _value in _previous.items():
+                    self.__put__(_col, _row, _value)
+            raise
+        if not _new and self.__indexes__:
+            self.__index_remove__(key)
+        if self.__indexes__:
+            self.__index_add__(key, ColumnProxy(self, key))
+        if WATCHERS:
+            self.__notify__(key, ColumnProxy(self, key), "set")
+
+    def __delitem__(self, key: str) -> None:
+        """ @abstract Remove a member row
+            @param key [str] Key name to remove
+            @returns None
+        """
+        _row = self.__rows__.pop(key)
+        self.__rowkeys__[_row] = _DELETED
+        self.__deleted__ += 1
+        for _col in self.__columns__:
+            if self.__casts__[_col] not in _TYPECODES:
+                # Release object references of the deleted row
+                self.__columns__[_col][_row] = None
+        if self.__indexes__:
+            self.__index_remove__(key)
+        if WATCHERS:
+            self.__notify__(key, None, "delete")
+        if self.__deleted__ > len(self.__rows__):
+            self.__compact__()
+
+    def attach(self, name: str = None,
+               obj: object = None,
+               flags: int = 0 | FLAG_READ | FLAG_WRITE) -> None:
+        """ @abstract Override of DictGroup.attach, stores obj as a row
+            @param name [str] dict key name
+            @param obj [dict|DOMObject] Member values
+            @param flags [byte] Unused, columns carry the member flags
+            @returns [None]
+        """
+        assert not self.__flags__.protected
+        assert name not in self.__rows__
+        self.__setitem__(name, obj)
+
+    def detach(self, name: str) -> None:
+        """ @abstract Override of DictGroup.detach
+            @param name [str] Member key
+            @returns [None]
+        """
+        assert not self.__flags__.protected
+        assert name in self.__rows__
+        self.__delitem__(name)
+
+    def dict(self, props: list = None, propsOnly: bool = False,
+             offset: int = 0, limit: int = None, cursor: object = None,
+             depth: int = None, fields: dict = None) -> dict:
+        """ @abstract Static dictionary of the group props and member rows
+            @param props [list] #optional List of specific properties to return
+            @param propsOnly [bool] #optional Should only properties be returned
+            @param offset [int] #optional Rows to skip
+            @param limit [int] #optional Number of rows to return
+            @param cursor [object] #optional Last row key of the previous page
+            @param depth [int] #optional Child levels to expand
+            @param fields [dict] #optional Prop projection per path pattern
+            @returns [dict] Static dictionary object
+        """
+        if offset or limit is not None or cursor is not None or \
+           depth is not None or fields:
+            from .paging import partial_dict as PARTIAL_DICT
+            return PARTIAL_DICT(self, props=props, propsOnly=propsOnly,
+                                offset=offset, limit=limit, cursor=cursor,
+                                depth=depth, fields=fields)
+        _dict = super(ColumnGroup, self).dict(props=props, propsOnly=True)
+        if not propsOnly:
+            _cols = list(self.__columns__.items())
+            _bools = [self.__casts__[_c] is bool for _c, _ in _cols]
+            for _key, _row in self.__rows__.items():
+                _dict[_key] = {
+                    _col: (bool(_values[_row])
+                           if _bool and _values[_row] is not None
+                           else _values[_row])
+                    for (_col, _values), _bool in zip(_cols, _bools)}
+        return _dict
+
+    def create_index(self, propName: str, sorted: bool = False) -> object:
+        """ @abstract Override of DictGroup.create_index for columns
+            @param propName [str] Column name to index
+            @param sorted [bool] #optional Maintain a sorted index
+            @returns [HashIndex|SortedIndex] The index
+        """
+        if propName not in self.__columns__:
+            raise(AssertionError("column '%s' does not exist" % propName))
+        return super(ColumnGroup, self).create_index(propName, sorted=sorted)
+
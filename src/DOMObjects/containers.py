@@ -0,0 +1,285 @@
+__author__ = "Rob MacKinnon <rome@villagertech.com>"
+__package__ = "DOMObjects"
+__name__ = "DOMObjects.containers"
+__license__ = "MIT"
+
+__doc__ = """
+Name containers used as `__children__` of the specialised DictGroups. Each
+supports the list operations used by `DOMObject`, `append`, `remove`,
+iteration, `len` and `in`, with cheaper costs for their access pattern.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+
+try:
+    from sortedcontainers import SortedList
+except ImportError:
+    SortedList = None
+
+
+class RingBuffer(object):
+    """ @abstract Preallocated ring of names, oldest first.
+        @param maxlen [int] Capacity
+    """
+    __slots__ = ("maxlen", "__ring__", "__head__", "__size__", "__names__")
+
+    def __init__(self, maxlen: int):
+        if maxlen < 1:
+            raise ValueError("maxlen must be at least 1")
+        self.maxlen = maxlen
+        self.__ring__ = [None] * maxlen
+        self.__head__ = 0
+        self.__size__ = 0
+        self.__names__ = {}
+
+    def __len__(self) -> int:
+        return self.__size__
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.__names__
+
+    def __iter__(self) -> object:
+        _slots = self.__ring__
+        _max = self.maxlen
+        _head = self.__head__
+        for _i in range(self.__size__):
+            yield _slots[(_head + _i) % _max]
+
+    def __reversed__(self) -> object:
+        _slots = self.__ring__
+        _max = self.maxlen
+        _head = self.__head__
+        for _i in range(self.__size__ - 1, -1, -1):
+            yield _slots[(_head + _i) % _max]
+
+    def __getitem__(self, index: object) -> object:
+        if isinstance(index, slice):
+            return [self[_i] for _i in range(*index.indices(self.__size__))]
+        if index < 0:
+            index += self.__size__
+        if not 0 <= index < self.__size__:
+            raise IndexError("ring index out of range")
+        return self.__ring__[(self.__head__ + index) % self.maxlen]
+
+    def __repr__(self) -> str:
+        return "RingBuffer(%r, maxlen=%d)" % (list(self), self.maxlen)
+
+    @property
+    def full(self) -> bool:
+        """ @abstract Whether the next append evicts the oldest name
+            @returns [bool] True when at capacity
+        """
+        return self.__size__ == self.maxlen
+
+    def append(self, name: object) -> object:
+        """ @abstract Append a name, evicting the oldest name when full
+            @param name [object] Name to append
+            @returns [object] Evicted name, or None
+        """
+        _evicted = None
+        if self.__size__ == self.maxlen:
+            _evicted = self.popleft()
+        self.__ring__[(self.__head__ + self.__size__) % self.maxlen] = name
+        self.__size__ += 1
+        self.__names__[name] = None
+        return _evicted
+
+    def popleft(self) -> object:
+        """ @abstract Remove and return the oldest name, O(1)
+            @returns [object] Oldest name
+        """
+        if not self.__size__:
+            raise IndexError("pop from an empty ring")
+        _name = self.__ring__[self.__head__]
+        self.__ring__[self.__head__] = None
+        self.__head__ = (self.__head__ + 1) % self.maxlen
+        self.__size__ -= 1
+        del self.__names__[_name]
+        return _name
+
+    def remove(self, name: object) -> None:
+        """ @abstract Remove a name, O(1) for the oldest name else O(n)
+            @param name [object] Name to remove
+            @returns [None]
+        """
+        if name not in self.__names__:
+            raise ValueError("%r not in ring" % (name,))
+        if self.__ring__[self.__head__] == name:
+            self.popleft()
+            return
+        _names = [_n for _n in self if _n != name]
+        self.clear()
+        for _n in _names:
+            self.append(_n)
+
+    def clear(self) -> None:
+        """ @abstract Remove all names
+            @returns [None]
+        """
+        self.__ring__ = [None] * self.maxlen
+        self.__head__ = 0
+        self.__size__ = 0
+        self.__names__ = {}
+
+    def tail(self, count: int) -> list:
+        """ @abstract The newest `count` names, oldest first
+            @param count [int] Number of names
+            @returns [list] Names
+        """
+        count = min(max(count, 0), self.__size__)
+        return self[self.__size__ - count:]
+
+
+class NameSet(object):
+    """ @abstract Insertion ordered set of names with O(1) append and remove.
+    """
+    __slots__ = ("__names__",)
+
+    def __init__(self, names: object = ()):
+        self.__names__ = dict.fromkeys(names)
+
+    def __len__(self) -> int:
+        return len(self.__names__)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.__names__
+
+    def __iter__(self) -> object:
+        return iter(self.__names__)
+
+    def __reversed__(self) -> object:
+        return reversed(list(self.__names__))
+
+    def __getitem__(self, index: object) -> object:
+        _names = list(self.__names__)
+        return _names[index]
+
+    def __repr__(self) -> str:
+        return "NameSet(%r)" % list(self.__names__)
+
+    def append(self, name: object) -> None:
+        """ @abstract Append a name, names already present keep their place
+            @param name [object] Name to append
+            @returns [None]
+        """
+        self.__names__[name] = None
+
+    def remove(self, name: object) -> None:
+        """ @abstract Remove a name, O(1)
+            @param name [object] Name to remove
+            @returns [None]
+        """
+        try:
+            del self.__names__[name]
+        except KeyError:
+            raise ValueError("%r not in set" % (name,))
+
+    def clear(self) -> None:
+        """ @abstract Remove all names
+            @returns [None]
+        """
+        self.__names__.clear()
+
+
+class SortedNames(object):
+    """ @abstract Sorted set of names. Backed by `sortedcontainers.SortedList`
+            when installed, else by a bisect maintained list.
+    """
+    __slots__ = ("__list__", "__names__")
+
+    def __init__(self, names: object = ()):
+        self.__names__ = set()
+        self.__list__ = SortedList() if SortedList is not None else []
+        for _name in names:
+            self.append(_name)
+
+    def __len__(self) -> int:
+        return len(self.__names__)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.__names__
+
+    def __iter__(self) -> object:
+        return iter(self.__list__)
+
+    def __reversed__(self) -> object:
+        return reversed(self.__list__)
+
+    def __getitem__(self, index: object) -> object:
+        return self.__list__[index]
+
+    def __repr__(self) -> str:
+        return "SortedNames(%r)" % list(self.__list__)
+
+    def append(self, name: object) -> None:
+        """ @abstract Insert a name at its sorted position
+            @param name [object] Name to insert
+            @returns [None]
+        """
+        if name in self.__names__:
+            return
+        if SortedList is not None:
+            self.__list__.add(name)
+        else:
+            insort(self.__list__, name)
+        self.__names__.add(name)
+
+    def remove(self, name: object) -> None:
+        """ @abstract Remove a name, O(log n) search
+            @param name [object] Name to remove
+            @returns [None]
+        """
+        if name not in self.__names__:
+            raise ValueError("%r not in set" % (name,))
+        self.__names__.remove(name)
+        if SortedList is not None:
+            self.__list__.remove(name)
+        else:
+            del self.__list__[bisect_left(self.__list__, name)]
+
+    def clear(self) -> None:
+        """ @abstract Remove all names
+            @returns [None]
+        """
+        self.__names__.clear()
+        self.__list__.clear()
+
+    def bisect_left(self, name: object) -> int:
+        """ @abstract Position of the first name not less than `name`
+            @param name [object] Name to search
+            @returns [int] Position
+        """
+        if SortedList is not None:
+            return self.__list__.bisect_left(name)
+        return bisect_left(self.__list__, name)
+
+    def bisect_right(self, name: object) -> int:
+        """ @abstract Position after the last name not greater than `name`
+            @param name [object] Name to search
+            @returns [int] Position
+        """
+        if SortedList is not None:
+            return self.__list__.bisect_right(name)
+        return bisect_right(self.__list__, name)
+
+    def irange(self, lo: object = None, hi: object = None,
+               inclusive: tuple = (True, True)) -> list:
+        """ @abstract Names between lo and hi, O(log n + k)
+            @param lo [object] #optional Lower bound, None for unbounded
+            @param hi [object] #optional Upper bound, None for unbounded
+            @param inclusive [tuple] #optional Inclusiveness of (lo, hi)
+            @returns [list] Names in sorted order
+        """
+        if lo is None:
+            _start = 0
+        elif inclusive[0]:
+            _start = self.bisect_left(lo)
+        else:
+            _start = self.bisect_right(lo)
+        if hi is None:
+            _end = len(self.__list__)
+        elif inclusive[1]:
+            _end = self.bisect_right(hi)
+        else:
+            _end = self.bisect_left(hi)
+        return list(self.__list__[_start:_end])
@@ -3,6 +3,7 @@ __package__ = "DOMObjects"
 __name__ = "DOMObjects.flags"
 __license__ = "MIT"
 
+# Deprecated, has no effect, see `DOMObjects.instrument`
 DEBUG = 0
 
 FLAG_READ = 2**0
@@ -31,9 +32,7 @@ class DOMFlags(object):
             @param bit [int] Bit position to check true
             @returns [bool] True if bit value is 1
         """
-        if DEBUG is 1:
-            print("1?"+str(self.__getbit__(byteVal, bit))+" "+str(self.__getbit__(byteVal, bit) is 1))
-        return self.__getbit__(byteVal, bit) is 1
+        return self.__getbit__(byteVal, bit) == 1
 
     def __getbit__(self, byteVal: int, bit: int = 0) -> int:
         """ @abstract Returns the value of selected bit via bitwise operation
@@ -43,24 +42,6 @@ class DOMFlags(object):
         """
         assert 0 <= bit < 8
         _mask = 254
-
-        # --- Expensive Debugging Code Begin ---
-        if DEBUG is 1:
-            _print = ""
-            _marker = ""
-            _value = ""
-            for x in range(0, 8):
-                _print += str(((byteVal >> x) | _mask) - _mask)
-                if bit-1 is x:
-                    _marker += "^"
-                    _value += str(bit)
-                else:
-                    _marker += " "
-                    _value += " "
-            print(_print)
-            print(_marker)
-            print(_value)
-        # --- Expensive Debugging Code End ---
         return ((byteVal >> bit-1) | _mask) - _mask
 
     def __setbit__(self, byteVal: int, bit: int = 0, value: int = 0) -> int:
@@ -115,9 +96,6 @@ class DOMFlags(object):
         """
         if not self.has_flag(name):
             raise Exception("invalid flag name `%s` referenced" % name)
-        if DEBUG is 1:
-            print("hasbit="+str(self.__hasbit__(self.__flags__[name],
-                                FLAG_WRITE)))
         return self.__hasbit__(self.__flags__[name], FLAG_WRITE)
 
     def lock(self, name: str = "self") -> None:
@@ -0,0 +1,89 @@
+__author__ = "Rob MacKinnon <rome@villagertech.com>"
+__package__ = "DOMObjects"
+__name__ = "DOMObjects.gcutil"
+__license__ = "MIT"
+
+__doc__ = """
+Garbage collector friendly trees.
+
+By default every node holds a strong `parent` reference and its own
+`__store__` (the instance `__dict__`), so a tree is one large reference
+cycle the cyclic collector has to rescan on every full collection.
+
+With `DOMRootObject(weak_parents=True)` nodes attached below the root hold
+a weak reference to their parent and resolve `__store__` through the class,
+so the tree is acyclic, is freed by reference counting alone, and holding
+only a child no longer keeps its ancestors alive (its `parent` becomes
+None once they are released).
+
+Once a long lived tree is built, `freeze_for_gc` moves every object tracked
+by the collector into the permanent generation, so later collections skip
+them entirely.
+
+    @example Usage
+        ROOT = DOMObjects.DOMRootObject(weak_parents=True)
+        ROOT.build_schema(schema)
+        DOMObjects.freeze_for_gc()
+"""
+
+import gc
+
+
+class WeakParent(object):
+    """ @abstract Class level fallback of `DOMObject.parent`, resolving the
+            weak parent reference of nodes in weak parent trees. Nodes with a
+            strong parent shadow it with their instance attribute.
+    """
+    def __get__(self, instance: object, owner: type = None) -> object:
+        if instance is None:
+            return self
+        _ref = instance.__dict__.get("__parentref__")
+        if _ref is None:
+            return None
+        return _ref()
+
+
+class InstanceStore(object):
+    """ @abstract Class level fallback of `DOMObject.__store__`, returning
+            the instance `__dict__` without the instance referencing itself.
+    """
+    def __get__(self, instance: object, owner: type = None) -> object:
+        if instance is None:
+            return self
+        return instance.__dict__
+
+
+# Collector state changed by `freeze_for_gc` on interpreters without
+# `gc.freeze`
+_FALLBACK = {"disabled": False}
+
+
+def freeze_for_gc(collect: bool = True) -> int:
+    """ @abstract Move all currently tracked objects out of the collector's
+            scans. Call after building a stable, long lived tree.
+            On Python < 3.7 the automatic collector is disabled instead.
+        @param collect [bool] #optional Run a full collection first, so
+            garbage is not frozen with the tree
+        @returns [int] Number of frozen objects
+    """
+    if collect:
+        gc.collect()
+    if hasattr(gc, "freeze"):
+        gc.freeze()
+        return gc.get_freeze_count()
+    if gc.isenabled():
+        gc.disable()
+        _FALLBACK["disabled"] = True
+    return len(gc.get_objects())
+
+
+def unfreeze_gc() -> None:
+    """ @abstract Return frozen objects to the collector, e.g. before
+            releasing a frozen tree
+        @returns [None]
+    """
+    if hasattr(gc, "unfreeze"):
+        gc.unfreeze()
+    elif _FALLBACK["disabled"]:
+        gc.enable()
+        _FALLBACK["disabled"] = False
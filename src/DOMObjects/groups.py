@@ -0,0 +1,538 @@
+__author__ = "Rob MacKinnon <rome@villagertech.com>"
+__package__ = "DOMObjects"
+__name__ = "DOMObjects.groups"
+__license__ = "MIT"
+
+__doc__ = """
+Specialised DictGroup variants, created through `DOMObject.new_dictgroup`.
+
+    RingGroup       Capacity bounded append-only log, `maxlen=N`
+    ExpiringGroup   Per-member TTL and optional LRU size cap,
+                    `ttl=seconds` and/or `maxsize=N`
+    SortedGroup     Members ordered by key with range scans, `sorted=True`
+"""
+
+from collections import OrderedDict
+from heapq import heappop, heappush
+from itertools import count
+from time import monotonic
+
+from . import DictGroup, DOMObject
+from .aio import WATCHERS
+from .containers import NameSet, RingBuffer, SortedNames
+from .flags import FLAG_READ, FLAG_WRITE
+
+
+def _check_member(key: str, value: object) -> None:
+    """ @abstract Members of the group variants are listed as children, so
+            they must be DOMObjects
+        @param key [str] Member key
+        @param value [object] Member object
+        @returns [None]
+    """
+    if not isinstance(value, DOMObject):
+        raise TypeError("member `%s` must be a DOMObject, not %s" %
+                        (key, type(value).__name__))
+
+
+def _drop_member(group: DictGroup, key: str) -> object:
+    """ @abstract Remove a member from the keystore, store, flags and indexes
+        @param group [DictGroup] Group holding the member
+        @param key [str] Member key
+        @returns [object] Removed member
+    """
+    if group.__indexes__:
+        group.__index_remove__(key)
+    _member = group.__keystore__.pop(key)
+    if group.__store__.get(key) is _member:
+        del group.__store__[key]
+    if group.__flags__.has_flag(key):
+        group.__flags__.del_flag(key)
+    if WATCHERS:
+        group.__notify__(key, None, "delete")
+    return _member
+
+
+class RingGroup(DictGroup):
+    """ @abstract DictGroup bounded to `maxlen` members, appending past the
+            capacity evicts the oldest member in O(1).
+        @param parent [DOMObject] Assign a parent object
+        @param name [str] Object unique name
+        @param maxlen [int] Maximum number of members
+    """
+    def __init__(self, parent: object = None, name: str = "",
+                 maxlen: int = 1024):
+        super(RingGroup, self).__init__(parent=parent, name=name)
+        self.__children__ = RingBuffer(maxlen)
+
+    # Private methods
+    def __evict__(self) -> object:
+        """ @abstract Evict the oldest member
+            @returns [object] Evicted member
+        """
+        return _drop_member(self, self.__children__.popleft())
+
+    # Public Properties
+    @property
+    def maxlen(self) -> int:
+        """ @abstract Member capacity
+            @returns [int] Maximum number of members
+        """
+        return self.__children__.maxlen
+
+    @property
+    def children(self) -> list:
+        """ @abstract Property to return all current member names
+            @returns [list] Member names, oldest first
+        """
+        return list(self.__children__)
+
+    # Public Methods
+    def tail(self, count: int) -> object:
+        """ @abstract Iterate the newest `count` members
+            @param count [int] Number of members
+            @returns [generator] (key, member) pairs, oldest first
+        """
+        _keystore = self.__keystore__
+        for _key in self.__children__.tail(count):
+            yield _key, _keystore[_key]
+
+    # DictGroup overrides
+    def __setitem__(self, key: str, value: object) -> None:
+        """ @abstract Append a member, or replace it in place when it exists.
+                Members are listed as children and held by the keystore only.
+            @param key [str] Key name to add
+            @param value [DOMObject] Member object to attach to key
+            @returns None
+        """
+        _check_member(key, value)
+        if key not in self.__keystore__:
+            if self.__children__.full:
+                self.__evict__()
+            self.__children__.append(key)
+        super(RingGroup, self).__setitem__(key, value)
+
+    def __delitem__(self, key: str) -> None:
+        """ @abstract Remove a member
+            @param key [str] Key name to remove
+            @returns None
+        """
+        self.detach(key)
+
+    def attach(self, name: str = None,
+               obj: object = None,
+               flags: int = 0 | FLAG_READ | FLAG_WRITE) -> None:
+        """ @abstract Override of DictGroup.attach, evicts the oldest member
+                when at capacity
+            @param name [str] dict key name
+            @param obj [object] callable/referable object
+            @param flags [byte] byte mask of flags
+            @returns [None]
+        """
+        assert not self.__flags__.protected
+        assert not (self.__name_exists__(name) or name in self.__keystore__)
+        if self.__children__.full:
+            self.__evict__()
+        super(RingGroup, self).attach(name=name, obj=obj, flags=flags)
+
+    def detach(self, name: str) -> None:
+        """ @abstract Override of DictGroup.detach
+            @param name [str] dict child object name
+            @returns [None]
+        """
+        assert not self.__flags__.protected
+        assert self.__contains__(name)
+        self.__children__.remove(name)
+        _drop_member(self, name)
+
+
+
+class ExpiringGroup(DictGroup):
+    """ @abstract DictGroup whose members expire after a time to live, with
+            an optional least recently used size cap. Expiry deadlines are
+            kept in a heap and processed lazily on access, or explicitly with
+            `expire`, so each expiry costs amortized O(log n) instead of a
+            scan of the keystore.
+        @param parent [DOMObject] Assign a parent object
+        @param name [str] Object unique name
+        @param ttl [float] #optional Default member time to live in seconds,
+            None for no expiry
+        @param maxsize [int] #optional Maximum number of members, the least
+            recently used member is evicted past it
+        @param on_evict [callable] #optional Hook called as
+            `on_evict(key, member, reason)`, reason is "expired" or "capacity"
+        @param clock [callable] #optional Time source, defaults to
+            `time.monotonic`
+    """
+    # Reads expire due members, see `DOMObjects.locking`
+    __mutating_reads__ = True
+
+    def __init__(self, parent: object = None, name: str = "",
+                 ttl: float = None,
+                 maxsize: int = None,
+                 on_evict: object = None,
+                 clock: object = monotonic):
+        super(ExpiringGroup, self).__init__(parent=parent, name=name)
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.__ttl__ = ttl
+        self.__maxsize__ = maxsize
+        self.__clock__ = clock
+        self.__children__ = NameSet()
+        self.__deadlines__ = {}
+        self.__heap__ = []
+        self.__sequence__ = count()
+        self.__lru__ = OrderedDict()
+        self.__evict_hooks__ = []
+        if on_evict is not None:
+            self.__evict_hooks__.append(on_evict)
+
+    # Private methods
+    def __schedule__(self, key: str, ttl: float) -> None:
+        """ @abstract Set or clear the expiry deadline of a member
+            @param key [str] Member key
+            @param ttl [float] Time to live in seconds, None for no expiry
+            @returns [None]
+        """
+        if ttl is None:
+            self.__deadlines__.pop(key, None)
+            return
+        _deadline = self.__clock__() + ttl
+        self.__deadlines__[key] = _deadline
+        heappush(self.__heap__, (_deadline, next(self.__sequence__), key))
+
+    def __remove__(self, key: str) -> object:
+        """ @abstract Remove a member and its bookkeeping
+            @param key [str] Member key
+            @returns [object] Removed member
+        """
+        self.__children__.remove(key)
+        self.__deadlines__.pop(key, None)
+        self.__lru__.pop(key, None)
+        return _drop_member(self, key)
+
+    def __evict__(self, key: str, reason: str) -> None:
+        """ @abstract Evict a member and call the eviction hooks
+            @param key [str] Member key
+            @param reason [str] "expired" or "capacity"
+            @returns [None]
+        """
+        _member = self.__remove__(key)
+        for _hook in self.__evict_hooks__:
+            _hook(key, _member, reason)
+
+    def __admit__(self, key: str, ttl: float) -> None:
+        """ @abstract Bookkeeping for a new or replaced member
+            @param key [str] Member key
+            @param ttl [float] Time to live, None to use the group default
+            @returns [None]
+        """
+        self.__children__.append(key)
+        self.__schedule__(key, self.ttl if ttl is None else ttl)
+        if self.maxsize is not None:
+            self.__lru__[key] = None
+            self.__lru__.move_to_end(key)
+            while len(self.__lru__) > self.maxsize:
+                self.__evict__(next(iter(self.__lru__)), "capacity")
+
+    # Public Properties
+    @property
+    def ttl(self) -> float:
+        """ @abstract Default member time to live
+            @returns [float] Seconds, None for no expiry
+        """
+        return self.__ttl__
+
+    @property
+    def maxsize(self) -> int:
+        """ @abstract Least recently used member cap
+            @returns [int] Maximum number of members, None for no cap
+        """
+        return self.__maxsize__
+
+    @property
+    def children(self) -> list:
+        """ @abstract Property to return all live member names
+            @returns [list] Member names, in insertion order
+        """
+        self.expire()
+        return list(self.__children__)
+
+    # Public Methods
+    def add_evict_hook(self, callback: object) -> None:
+        """ @abstract Register a hook called on member eviction
+            @param callback [callable] Called as `callback(key, member, reason)`
+            @returns [None]
+        """
+        self.__evict_hooks__.append(callback)
+
+    def expire(self, now: float = None) -> int:
+        """ @abstract Evict all members whose deadline has passed
+            @param now [float] #optional Current time, defaults to the clock
+            @returns [int] Number of evicted members
+        """
+        _heap = self.__heap__
+        if not _heap:
+            return 0
+        if now is None:
+            now = self.__clock__()
+        _count = 0
+        while _heap and _heap[0][0] <= now:
+            _deadline, _, _key = heappop(_heap)
+            # Skip stale heap entries of touched or removed members
+            if self.__deadlines__.get(_key) == _deadline:
+                self.__evict__(_key, "expired")
+                _count += 1
+        return _count
+
+    def set(self, key: str, value: object, ttl: float = None) -> None:
+        """ @abstract Add or replace a member with an explicit time to live
+            @param key [str] Member key
+            @param value [DOMObject] Member object
+            @param ttl [float] #optional Time to live, defaults to group ttl
+            @returns [None]
+        """
+        _check_member(key, value)
+        self.expire()
+        super(ExpiringGroup, self).__setitem__(key, value)
+        self.__admit__(key, ttl)
+
+    def touch(self, key: str, ttl: float = None) -> None:
+        """ @abstract Refresh the deadline and recency of a member
+            @param key [str] Member key
+            @param ttl [float] #optional Time to live, defaults to group ttl
+            @returns [None]
+        """
+        self.expire()
+        if key not in self.__keystore__:
+            raise KeyError(key)
+        self.__admit__(key, ttl)
+
+    def ttl_of(self, key: str) -> float:
+        """ @abstract Remaining time to live of a member
+            @param key [str] Member key
+            @returns [float] Seconds left, None when the member never expires
+        """
+        self.expire()
+        if key not in self.__keystore__:
+            raise KeyError(key)
+        if key not in self.__deadlines__:
+            return None
+        return max(self.__deadlines__[key] - self.__clock__(), 0.0)
+
+    # DictGroup overrides
+    def __before_output__(self) -> None:
+        """ @abstract Override of DOMObject.__before_output__, output lists
+                live members only
+            @returns [None]
+        """
+        self.expire()
+
+    def json(self, *args, **kwargs) -> str:
+        """ @abstract Override of DOMObject.json, expires members first
+            @returns [str] JSON text object
+        """
+        self.expire()
+        return super(ExpiringGroup, self).json(*args, **kwargs)
+
+    def keys(self) -> list:
+        """ @abstract Override of DictGroup.keys, live member keys only
+            @returns [list] of key names
+        """
+        self.expire()
+        return list(self.__keystore__)
+
+    def __getitem__(self, key: str) -> object:
+        """ @abstract Parallel of dict.__getitem___, marks the member as
+                recently used
+            @param key [str] Key name to retrieve
+            @returns object
+        """
+        self.expire()
+        _value = self.__keystore__[key]
+        if self.maxsize is not None:
+            self.__lru__.move_to_end(key)
+        return _value
+
+    def __setitem__(self, key: str, value: object) -> None:
+        """ @abstract Add or replace a member with the group time to live
+            @param key [str] Key name to add
+            @param value [object] Value object to attach to key
+            @returns None
+        """
+        self.set(key, value)
+
+    def __delitem__(self, key: str) -> None:
+        """ @abstract Remove a member
+            @param key [str] Key name to remove
+            @returns None
+        """
+        self.detach(key)
+
+    def __iter__(self) -> object:
+        self.expire()
+        return iter(list(self.__keystore__))
+
+    def __len__(self) -> int:
+        self.expire()
+        return len(self.__keystore__)
+
+    def __contains__(self, key: str) -> bool:
+        self.expire()
+        return key in self.__keystore__
+
+    def attach(self, name: str = None,
+               obj: object = None,
+               flags: int = 0 | FLAG_READ | FLAG_WRITE,
+               ttl: float = None) -> None:
+        """ @abstract Override of DictGroup.attach
+            @param name [str] dict key name
+            @param obj [object] callable/referable object
+            @param flags [byte] byte mask of flags
+            @param ttl [float] #optional Time to live, defaults to group ttl
+            @returns [None]
+        """
+        self.expire()
+        super(ExpiringGroup, self).attach(name=name, obj=obj, flags=flags)
+        self.__admit__(name, ttl)
+
+    def detach(self, name: str) -> None:
+        """ @abstract Override of DictGroup.detach, O(1)
+            @param name [str] dict child object name
+            @returns [None]
+        """
+        assert not self.__flags__.protected
+        assert name in self.__keystore__
+        self.__remove__(name)
+
+
+class SortedGroup(DictGroup):
+    """ @abstract DictGroup keeping its members ordered by key, with range
+            scans, bisection and first/last access in O(log n + k). Keys
+            must be mutually comparable, e.g. all timestamps.
+        @param parent [DOMObject] Assign a parent object
+        @param name [str] Object unique name
+    """
+    # Marks children as already ordered, see `DOMObject.siblings`
+    __sorted__ = True
+
+    def __init__(self, parent: object = None, name: str = ""):
+        super(SortedGroup, self).__init__(parent=parent, name=name)
+        self.__children__ = SortedNames()
+
+    def __ordered__(self, key: object, write: object, *args) -> None:
+        """ @abstract Insert a key in key order, then write the member. Keys
+                not comparable with the others raise TypeError before the
+                keystore is touched, and a failed write removes the key.
+            @param key [object] Member key
+            @param write [callable] Member write, called as `write(key, *args)`
+            @returns [None]
+        """
+        _children = self.__children__
+        _new = key not in _children
+        _children.append(key)
+        try:
+            write(key, *args)
+        except BaseException:
+            if _new:
+                _children.remove(key)
+            raise
+
+    def __pairs__(self, keys: list) -> list:
+        """ @abstract Resolve member keys into (key, member) pairs
+            @param keys [list] Member keys
+            @returns [list] (key, member) pairs
+        """
+        _keystore = self.__keystore__
+        return [(_key, _keystore[_key]) for _key in keys]
+
+    # Public Properties
+    @property
+    def children(self) -> list:
+        """ @abstract Property to return all member names
+            @returns [list] Member names in key order
+        """
+        return list(self.__children__)
+
+    # Public Methods
+    def range(self, lo: object = None, hi: object = None,
+              inclusive: tuple = (True, True)) -> list:
+        """ @abstract Members with keys between lo and hi
+            @param lo [object] #optional Lower bound, None for unbounded
+            @param hi [object] #optional Upper bound, None for unbounded
+            @param inclusive [tuple] #optional Inclusiveness of (lo, hi)
+            @returns [list] (key, member) pairs in key order
+            @example Usage
+                ROOT.history.range(t1, t2)
+        """
+        return self.__pairs__(self.__children__.irange(lo, hi, inclusive))
+
+    def bisect(self, key: object) -> int:
+        """ @abstract Position `key` has, or would have, in key order
+            @param key [object] Key to search
+            @returns [int] Position
+        """
+        return self.__children__.bisect_left(key)
+
+    def first(self, count: int = 1) -> list:
+        """ @abstract The members with the lowest keys
+            @param count [int] #optional Number of members
+            @returns [list] (key, member) pairs in key order
+        """
+        return self.__pairs__(self.__children__[:max(count, 0)])
+
+    def last(self, count: int = 1) -> list:
+        """ @abstract The members with the highest keys
+            @param count [int] #optional Number of members
+            @returns [list] (key, member) pairs in key order
+        """
+        if count <= 0:
+            return []
+        return self.__pairs__(self.__children__[-count:])
+
+    # DictGroup overrides
+    def __iter__(self) -> object:
+        return iter(self.__children__)
+
+    def keys(self) -> list:
+        """ @abstract Override to provide keys in key order
+            @returns [list] of key names
+        """
+        return list(self.__children__)
+
+    def __setitem__(self, key: object, value: object) -> None:
+        """ @abstract Add or replace a member, kept in key order
+            @param key [object] Key name to add
+            @param value [DOMObject] Member object to attach to key
+            @returns None
+        """
+        _check_member(key, value)
+        self.__ordered__(key, super(SortedGroup, self).__setitem__, value)
+
+    def __delitem__(self, key: object) -> None:
+        """ @abstract Remove a member
+            @param key [object] Key name to remove
+            @returns None
+        """
+        self.detach(key)
+
+    def attach(self, name: object = None,
+               obj: object = None,
+               flags: int = 0 | FLAG_READ | FLAG_WRITE) -> None:
+        """ @abstract Override of DictGroup.attach, kept in key order
+            @param name [object] dict key name
+            @param obj [object] callable/referable object
+            @param flags [byte] byte mask of flags
+            @returns [None]
+        """
+        self.__ordered__(name, super(SortedGroup, self).attach, obj, flags)
+
+    def detach(self, name: object) -> None:
+        """ @abstract Override of DictGroup.detach, O(log n)
+            @param name [object] dict child object name
+            @returns [None]
+        """
+        assert not self.__flags__.protected
+        assert name in self.__keystore__
+        self.__children__.remove(name)
+        _drop_member(self, name)
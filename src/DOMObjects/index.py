@@ -0,0 +1,209 @@
+__author__ = "Rob MacKinnon <rome@villagertech.com>"
+__package__ = "DOMObjects"
+__name__ = "DOMObjects.index"
+__license__ = "MIT"
+
+__doc__ = """
+Secondary indexes over a named property of DictGroup members.
+
+Indexes are created with `DictGroup.create_index` and kept current by the
+DictGroup mutators and by `set_property`, `new_property`, `del_property` and
+attribute assignment on members. Only static property values are indexed,
+method properties are not. Values that cannot be hashed (`HashIndex`) or
+ordered against the other values (`SortedIndex`) are left out of the index.
+Sorted indexes order members of equal value by key.
+"""
+
+from bisect import bisect_left, insort
+
+from .containers import SortedList
+
+# Sentinel for members without an indexable value
+MISSING = object()
+
+
+def member_value(member: object, prop: str) -> object:
+    """ @abstract Indexable value of `prop` on a DictGroup member
+        @param member [object] DictGroup member
+        @param prop [str] Property name
+        @returns [object] Static property value, or `MISSING`
+    """
+    _props = getattr(member, "__properties__", None)
+    if _props is None or prop not in _props:
+        return MISSING
+    _value = member.__store__[prop]
+    if callable(_value):
+        return MISSING
+    return _value
+
+
+class HashIndex(object):
+    """ @abstract Hash index of member keys by property value, O(1) lookups
+        @param prop [str] Indexed property name
+    """
+    sorted = False
+
+    def __init__(self, prop: str):
+        self.prop = prop
+        # value -> {key: None}, dicts keep member insertion order
+        self.__buckets__ = {}
+        # key -> indexed value
+        self.__values__ = {}
+        # key -> value the index cannot hold, e.g. unhashable, matched by scan
+        self.__unindexed__ = {}
+
+    def __len__(self) -> int:
+        return len(self.__values__)
+
+    def add(self, key: str, value: object) -> None:
+        """ @abstract Index `key` under `value`
+            @param key [str] Member key
+            @param value [object] Property value
+            @returns [None]
+        """
+        if value is MISSING:
+            return
+        try:
+            self.__buckets__.setdefault(value, {})[key] = None
+        except TypeError:
+            self.__unindexed__[key] = value
+            return
+        self.__values__[key] = value
+
+    def remove(self, key: str) -> None:
+        """ @abstract Remove `key` from the index
+            @param key [str] Member key
+            @returns [None]
+        """
+        if key not in self.__values__:
+            self.__unindexed__.pop(key, None)
+            return
+        _value = self.__values__.pop(key)
+        _bucket = self.__buckets__[_value]
+        del _bucket[key]
+        if not _bucket:
+            del self.__buckets__[_value]
+
+    def update(self, key: str, value: object) -> None:
+        """ @abstract Re-index `key` under a new value
+            @param key [str] Member key
+            @param value [object] Property value
+            @returns [None]
+        """
+        self.remove(key)
+        self.add(key, value)
+
+    def find(self, value: object) -> list:
+        """ @abstract Keys of members whose property equals `value`
+            @param value [object] Value to look up
+            @returns [list] Member keys
+        """
+        try:
+            _keys = list(self.__buckets__.get(value, ()))
+        except TypeError:
+            _keys = []
+        if self.__unindexed__:
+            _keys.extend(_key for _key, _value in self.__unindexed__.items()
+                         if _value == value)
+        return _keys
+
+    def values(self) -> list:
+        """ @abstract Distinct indexed values
+            @returns [list] Values
+        """
+        return list(self.__buckets__)
+
+
+class _Above(object):
+    """ @abstract Sorts after every member key, bounds the (value, key)
+            pairs of one value
+    """
+    __slots__ = ()
+
+    def __lt__(self, other: object) -> bool:
+        return False
+
+    def __gt__(self, other: object) -> bool:
+        return True
+
+
+_ABOVE = _Above()
+
+
+class SortedIndex(HashIndex):
+    """ @abstract Sorted index of member keys by property value, supports
+            O(log n) range lookups in addition to hash lookups.
+        @param prop [str] Indexed property name
+    """
+    sorted = True
+
+    def __init__(self, prop: str):
+        super(SortedIndex, self).__init__(prop)
+        # (value, key) pairs, ordered by value then key
+        self.__pairs__ = SortedList() if SortedList is not None else []
+
+    def __bisect__(self, probe: tuple) -> int:
+        """ @abstract Position of the first pair not less than `probe`
+            @param probe [tuple] (value,) or (value, key) probe
+            @returns [int] Position
+        """
+        if SortedList is not None:
+            return self.__pairs__.bisect_left(probe)
+        return bisect_left(self.__pairs__, probe)
+
+    def add(self, key: str, value: object) -> None:
+        """ @abstract Index `key` under `value`, O(log n)
+            @param key [str] Member key
+            @param value [object] Property value
+            @returns [None]
+        """
+        if value is MISSING:
+            return
+        try:
+            if value is None:
+                raise TypeError("None is not ordered")
+            hash(value)
+            if SortedList is not None:
+                self.__pairs__.add((value, key))
+            else:
+                insort(self.__pairs__, (value, key))
+        except TypeError:
+            # left out of ranges, still found by equality
+            self.__unindexed__[key] = value
+            return
+        super(SortedIndex, self).add(key, value)
+
+    def remove(self, key: str) -> None:
+        """ @abstract Remove `key` from the index, O(log n)
+            @param key [str] Member key
+            @returns [None]
+        """
+        if key in self.__values__:
+            _pair = (self.__values__[key], key)
+            if SortedList is not None:
+                self.__pairs__.remove(_pair)
+            else:
+                del self.__pairs__[self.__bisect__(_pair)]
+        super(SortedIndex, self).remove(key)
+
+    def range(self, lo: object = None, hi: object = None,
+              inclusive: tuple = (True, True)) -> list:
+        """ @abstract Keys of members whose property lies between lo and hi
+            @param lo [object] #optional Lower bound, None for unbounded
+            @param hi [object] #optional Upper bound, None for unbounded
+            @param inclusive [tuple] #optional Inclusiveness of (lo, hi)
+            @returns [list] Member keys ordered by value, then key
+        """
+        if lo is None:
+            _start = 0
+        elif inclusive[0]:
+            _start = self.__bisect__((lo,))
+        else:
+            _start = self.__bisect__((lo, _ABOVE))
+        if hi is None:
+            _end = len(self.__pairs__)
+        elif inclusive[1]:
+            _end = self.__bisect__((hi, _ABOVE))
+        else:
+            _end = self.__bisect__((hi,))
+        return [_key for _value, _key in self.__pairs__[_start:_end]]
@@ -0,0 +1,284 @@
+__author__ = "Rob MacKinnon <rome@villagertech.com>"
+__package__ = "DOMObjects"
+__name__ = "DOMObjects.instrument"
+__license__ = "MIT"
+
+__doc__ = """
+Pluggable instrumentation of DOMObject operations.
+
+`enable` swaps the instrumented methods of `DOMFlags`, `DOMObject` and every
+loaded subclass for timing wrappers, and `disable` restores the originals,
+so while disabled the hot paths run the plain methods with no overhead.
+Each operation keeps a call counter, total and max latency and a log2
+latency histogram in nanoseconds. Optionally a sample of calls is passed to
+a tracer together with the node `path`.
+
+    @example Usage
+        from DOMObjects import instrument
+        instrument.enable(sample_rate=0.01,
+                          tracer=lambda op, path, ns: log.debug(...))
+        ...
+        metrics.push(instrument.stats())
+        instrument.disable()
+
+Counters are updated without locking, under heavy multi-threaded use
+counts are approximate. A call nested in the same operation on the same
+node, e.g. an override calling its base method through `super`, is counted
+once.
+
+`DOMObjects.locking` patches methods the same way. When both are enabled,
+disable them in reverse order of enabling, `disable` raises RuntimeError
+and leaves the methods unchanged when another layer wrapped them since.
+"""
+
+from functools import wraps
+from random import random
+from threading import local
+import time
+
+from . import DOMObject
+from .flags import DOMFlags
+
+try:
+    _now_ns = time.perf_counter_ns
+except AttributeError:  # Python < 3.7
+    def _now_ns() -> int:
+        return int(time.perf_counter() * 1e9)
+
+# Instrumented methods by category, matched against DOMFlags, DOMObject
+# and every DOMObject subclass defining them.
+OPERATIONS = {
+    "flags": (
+        (DOMFlags, "test_bit"),
+        (DOMFlags, "is_writeable"),
+        (DOMFlags, "get_flag"),
+        (DOMFlags, "set_flag"),
+        (DOMFlags, "update_flag")
+    ),
+    "lookup": (
+        (DOMObject, "__name_exists__"),
+        (DOMObject, "get_context"),
+        (DOMObject, "get_property"),
+        (DOMObject, "siblings"),
+        (DOMObject, "__getitem__")
+    ),
+    "mutation": (
+        (DOMObject, "__setattr__"),
+        (DOMObject, "new_property"),
+        (DOMObject, "set_property"),
+        (DOMObject, "del_property"),
+        (DOMObject, "new_method"),
+        (DOMObject, "set_method"),
+        (DOMObject, "new_child"),
+        (DOMObject, "attach"),
+        (DOMObject, "detach"),
+        (DOMObject, "__setitem__"),
+        (DOMObject, "__delitem__")
+    ),
+    "serialization": (
+        (DOMObject, "dict"),
+        (DOMObject, "json")
+    )
+}
+
+
+class OperationStats(object):
+    """ @abstract Counter and latency histogram of one operation
+    """
+    __slots__ = ("count", "total_ns", "max_ns", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        # bucket k counts calls taking less than 2**k ns
+        self.buckets = [0] * 64
+
+    def record(self, elapsed: int) -> None:
+        """ @abstract Record one call
+            @param elapsed [int] Call latency in ns
+            @returns [None]
+        """
+        self.count += 1
+        self.total_ns += elapsed
+        if elapsed > self.max_ns:
+            self.max_ns = elapsed
+        self.buckets[min(elapsed.bit_length(), 63)] += 1
+
+    def dict(self) -> dict:
+        """ @abstract Export the stats
+            @returns [dict] count, total/mean/max ns and the histogram as
+                {"<upper bound ns>": count} for non-empty buckets
+        """
+        return {
+            "count": self.count,
+            "total_ns": self.total_ns,
+            "mean_ns": self.total_ns / self.count if self.count else 0,
+            "max_ns": self.max_ns,
+            "histogram": {str(2 ** _k): _c
+                          for _k, _c in enumerate(self.buckets) if _c}
+        }
+
+
+class _State(object):
+    """ @abstract Module instrumentation state
+    """
+    def __init__(self):
+        self.enabled = False
+        self.stats = {}
+        self.originals = []
+        self.sample_rate = 0.0
+        self.tracer = None
+        # (operation, node id) pairs being timed, per thread
+        self.active = local()
+
+
+_STATE = _State()
+
+
+def _classes(base: type) -> list:
+    """ @abstract `base` and all of its loaded subclasses
+        @param base [type] Base class
+        @returns [list] Classes
+    """
+    _found = [base]
+    _stack = [base]
+    while _stack:
+        for _sub in _stack.pop().__subclasses__():
+            if _sub not in _found:
+                _found.append(_sub)
+                _stack.append(_sub)
+    return _found
+
+
+def _node_path(instance: object) -> str:
+    """ @abstract Path of an instrumented instance, for tracing
+        @param instance [object] Instance the operation ran on
+        @returns [str] Node path, or None for non-node instances
+    """
+    if isinstance(instance, DOMObject):
+        try:
+            return instance.path
+        except Exception:
+            return instance.name
+    return None
+
+
+def _wrap(op: str, func: object) -> object:
+    """ @abstract Timing wrapper of an instrumented method
+        @param op [str] Operation name
+        @param func [callable] Original method
+        @returns [callable] Wrapper
+    """
+    _stats = _STATE.stats.setdefault(op, OperationStats())
+    _active = _STATE.active
+
+    @wraps(func)
+    def _wrapper(self, *args, **kwargs):
+        _running = _active.__dict__.setdefault("calls", set())
+        _call = (op, id(self))
+        if _call in _running:
+            # base method called by an instrumented override
+            return func(self, *args, **kwargs)
+        _running.add(_call)
+        _start = _now_ns()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            _elapsed = _now_ns() - _start
+            _running.discard(_call)
+            _stats.record(_elapsed)
+            if _STATE.tracer is not None and random() < _STATE.sample_rate:
+                _STATE.tracer(op, _node_path(self), _elapsed)
+    return _wrapper
+
+
+def _restore(originals: list) -> None:
+    """ @abstract Restore patched methods, unless another layer wrapped any
+            of them since
+        @param originals [list] (owner, name, original, wrapper) entries
+        @returns [None]
+        @raises RuntimeError when a wrapper is no longer installed
+    """
+    for _owner, _name, _orig, _new in originals:
+        if _owner.__dict__.get(_name) is not _new:
+            raise RuntimeError("`%s.%s` was patched again since, disable "
+                               "in reverse order of enabling" %
+                               (getattr(_owner, "__name__", _owner), _name))
+    for _owner, _name, _orig, _new in reversed(originals):
+        setattr(_owner, _name, _orig)
+
+
+def enable(categories: list = None,
+           sample_rate: float = 0.0,
+           tracer: object = None) -> None:
+    """ @abstract Start instrumenting operations
+        @param categories [list] #optional Categories of `OPERATIONS` to
+            instrument, defaults to all
+        @param sample_rate [float] #optional Fraction of calls passed to tracer
+        @param tracer [callable] #optional Called as
+            `tracer(operation, path, elapsed_ns)` for sampled calls
+        @returns [None]
+        @raises KeyError on unknown categories, before anything is patched
+    """
+    _categories = list(categories or OPERATIONS)
+    _unknown = [_c for _c in _categories if _c not in OPERATIONS]
+    if _unknown:
+        raise KeyError("categories `%s` are not defined" %
+                       "`, `".join(map(str, _unknown)))
+    if _STATE.enabled:
+        disable()
+    _STATE.sample_rate = sample_rate
+    _STATE.tracer = tracer
+    for _category in _categories:
+        for _base, _method in OPERATIONS[_category]:
+            _op = "%s.%s" % (_category, _method.strip("_"))
+            for _cls in _classes(_base):
+                if _method not in _cls.__dict__:
+                    continue
+                _orig = _cls.__dict__[_method]
+                if isinstance(_orig, property):
+                    _new = property(_wrap(_op, _orig.fget), _orig.fset,
+                                    _orig.fdel, _orig.__doc__)
+                else:
+                    _new = _wrap(_op, _orig)
+                _STATE.originals.append((_cls, _method, _orig, _new))
+                setattr(_cls, _method, _new)
+    _STATE.enabled = True
+
+
+def disable() -> None:
+    """ @abstract Stop instrumenting, restoring the original methods.
+            Collected stats are kept until `reset`.
+        @returns [None]
+        @raises RuntimeError when the methods were patched again since, e.g.
+            by `locking.enable`
+    """
+    _restore(_STATE.originals)
+    _STATE.originals = []
+    _STATE.tracer = None
+    _STATE.enabled = False
+
+
+def is_enabled() -> bool:
+    """ @abstract Whether instrumentation is active
+        @returns [bool] True when enabled
+    """
+    return _STATE.enabled
+
+
+def reset() -> None:
+    """ @abstract Clear collected stats
+        @returns [None]
+    """
+    for _op in _STATE.stats:
+        _STATE.stats[_op].__init__()
+
+
+def stats() -> dict:
+    """ @abstract Export collected stats for a metrics pipeline
+        @returns [dict] {"<category>.<operation>": OperationStats.dict()}
+            for every operation called at least once
+    """
+    return {_op: _stats.dict() for _op, _stats in sorted(_STATE.stats.items())
+            if _stats.count}
@@ -0,0 +1,102 @@
+__author__ = "Rob MacKinnon <rome@villagertech.com>"
+__package__ = "DOMObjects"
+__name__ = "DOMObjects.interning"
+__license__ = "MIT"
+
+__doc__ = """
+Interning of names and deduplication of immutable property values.
+
+Names are interned with `sys.intern` where equal names arrive as distinct
+string objects: property names set by `build_schema`/`build_prop_map`,
+names passed to the bulk builders with `dedupe`, and the names and keys
+decoded by shared memory views. The `__children__`, `__properties__`,
+`__store__` and `DOMFlags.__flags__` entries of such a name then share one
+string object. Other names are stored as passed, string literals are
+interned by Python already and interning a name used only once just adds
+an entry to the interpreter's intern table.
+
+Equal immutable property values are deduplicated through a `ValuePool` when
+a builder is called with `dedupe`, e.g. `build_schema(schema, dedupe=True)`.
+String values are pooled rather than interned, the default pool
+`VALUE_POOL` keeps its values alive until cleared.
+
+    @example Usage
+        ROOT.build_schema(schema, dedupe=True)
+        DOMObjects.interning.VALUE_POOL.clear()
+"""
+
+from sys import intern
+
+# Value types deduplicated by `ValuePool`, tuples of them are also pooled
+POOLED_TYPES = (str, bytes, int, float, complex)
+
+
+def intern_name(name: object) -> object:
+    """ @abstract Intern a node, property or flag name
+        @param name [str] Name, other types are returned unchanged
+        @returns [str] Interned name
+    """
+    if type(name) is str:
+        return intern(name)
+    return name
+
+
+def _pool_key(value: object) -> object:
+    """ @abstract Type strict key of a poolable value, so 1, 1.0 and True
+            are pooled apart
+        @param value [object] Value
+        @returns [tuple] Key, or None when the value is not poolable
+    """
+    _type = type(value)
+    if _type in POOLED_TYPES:
+        return (_type, value)
+    if _type is tuple:
+        _keys = tuple(_pool_key(_v) for _v in value)
+        if None in _keys:
+            return None
+        return (_type, _keys)
+    return None
+
+
+class ValuePool(object):
+    """ @abstract Pool of canonical instances of equal immutable values
+    """
+    __slots__ = ("__values__",)
+
+    def __init__(self):
+        self.__values__ = {}
+
+    def __len__(self) -> int:
+        return len(self.__values__)
+
+    def get(self, value: object) -> object:
+        """ @abstract Canonical instance of a value, the value itself the
+                first time it is seen
+            @param value [object] Value, mutable values are returned unchanged
+            @returns [object] Pooled value
+        """
+        _key = _pool_key(value)
+        if _key is None:
+            return value
+        return self.__values__.setdefault(_key, value)
+
+    def clear(self) -> None:
+        """ @abstract Release all pooled values
+            @returns [None]
+        """
+        self.__values__.clear()
+
+
+VALUE_POOL = ValuePool()
+
+
+def value_pool(dedupe: object) -> ValuePool:
+    """ @abstract Resolve the `dedupe` option of the builders
+        @param dedupe [bool|ValuePool] True for `VALUE_POOL`, or a pool
+        @returns [ValuePool] Pool, or None when not deduplicating
+    """
+    if isinstance(dedupe, ValuePool):
+        return dedupe
+    if dedupe:
+        return VALUE_POOL
+    return None
@@ -0,0 +1,385 @@
+__author__ = "Rob MacKinnon <rome@villagertech.com>"
+__package__ = "DOMObjects"
+__name__ = "DOMObjects.locking"
+__license__ = "MIT"
+
+__doc__ = """
+Opt-in thread safety with a reader/writer lock per locking domain.
+
+A domain is a namespace root (the tree root, or a node created with
+`new_namespace`) or a `DictGroup`. Every node belongs to its nearest domain
+above it. `enable` swaps the mutators of `DOMObject` and its subclasses for
+wrappers taking the write lock of the mutated node's domain, and `dict()`
+and the other readers for wrappers taking the read lock. Writers to
+different domains run in parallel, readers never block each other.
+Readers of groups that change on access, e.g. `ExpiringGroup` expiring
+due members, take the write lock instead. `__iter__` and `select` return
+an iterator over a snapshot taken under the lock, and `adict()`/`ajson()`
+collect each node under its domain lock, awaiting async values after
+releasing it.
+
+Locks are reentrant and writer preferring: a thread may nest reads and
+writes of a domain it holds for writing, waiting writers stop new readers,
+and upgrading a held read lock to a write lock raises RuntimeError.
+Domains are always entered top-down (a subtree read enters child domains
+while holding the parent's), which keeps nested locking deadlock free.
+Writes to a domain that is a member of an indexed DictGroup, e.g. a
+namespace member, update the group indexes and take the group write lock
+first. For compound updates of such a member, take the group write lock
+before the member's.
+
+    @example Usage
+        from DOMObjects import locking
+        locking.enable(ROOT)
+        ...
+        # compound updates of one domain
+        with locking.domain_lock(ROOT.settings).write:
+            ROOT.settings.a = 1
+            ROOT.settings.b = 2
+
+Nodes not attached to a tree yet have no domain and are not protected.
+When combined with `DOMObjects.instrument`, disable in reverse order of
+enabling, `disable` raises RuntimeError when the methods were wrapped
+again since.
+"""
+
+from functools import wraps
+from sys import modules
+from threading import Condition, Lock, get_ident
+
+from . import _HOOK_INDEX, DOMObject, DictGroup, DOMRootObject
+from .flags import FLAG_NAMESPACE
+from .instrument import _classes, _restore
+
+# Methods taking the domain write lock, where defined
+WRITE_METHODS = (
+    "__setattr__", "__assign__", "new_property", "del_property",
+    "set_property", "new_method", "set_method", "new_property_bulk",
+    "new_child", "new_child_bulk", "del_child", "replace_child",
+    "new_namespace", "new_dictgroup", "new_dictgroup_bulk", "build_prop_map",
+    "build_schema", "attach", "detach", "__setitem__", "__delitem__",
+    "update", "create_index", "drop_index", "new_column", "new_record",
+    "set_value", "set", "touch", "expire", "set_many"
+)
+
+# Methods and properties taking the domain read lock, where defined
+READ_METHODS = (
+    "dict", "json", "page", "get_property", "get_many", "__getitem__",
+    "__len__", "__contains__", "children", "keys", "find", "find_range",
+    "get_value", "column", "ttl_of"
+)
+
+# Methods returning iterators, snapshotted under the domain read lock
+ITER_METHODS = ("__iter__", "select")
+
+# Module functions reading the node passed first, under its domain read lock
+READ_FUNCTIONS = (
+    ("DOMObjects.aio", "_collect"), ("DOMObjects.aio", "_collect_node")
+)
+
+
+class _Guard(object):
+    """ @abstract Context manager of one side of a `RWLock`
+    """
+    __slots__ = ("acquire", "release")
+
+    def __init__(self, acquire: object, release: object):
+        self.acquire = acquire
+        self.release = release
+
+    def __enter__(self) -> None:
+        self.acquire()
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class RWLock(object):
+    """ @abstract Reentrant, writer preferring reader/writer lock
+        @example Usage
+            with lock.read:
+                ...
+            with lock.write:
+                ...
+    """
+    def __init__(self):
+        self.__cond__ = Condition(Lock())
+        self.__readers__ = {}
+        self.__writer__ = None
+        self.__depth__ = 0
+        self.__waiting__ = 0
+        self.read = _Guard(self.acquire_read, self.release_read)
+        self.write = _Guard(self.acquire_write, self.release_write)
+
+    def acquire_read(self) -> None:
+        """ @abstract Acquire the lock for reading, blocks while a writer
+                holds or waits for the lock
+            @returns [None]
+        """
+        _me = get_ident()
+        with self.__cond__:
+            _readers = self.__readers__
+            if _me in _readers or self.__writer__ == _me:
+                _readers[_me] = _readers.get(_me, 0) + 1
+                return
+            while self.__writer__ is not None or self.__waiting__:
+                self.__cond__.wait()
+            _readers[_me] = 1
+
+    def release_read(self) -> None:
+        """ @abstract Release one level of the read lock
+            @returns [None]
+        """
+        _me = get_ident()
+        with self.__cond__:
+            _depth = self.__readers__.get(_me, 0)
+            if not _depth:
+                raise RuntimeError("read lock not held")
+            if _depth > 1:
+                self.__readers__[_me] = _depth - 1
+                return
+            del self.__readers__[_me]
+            if not self.__readers__:
+                self.__cond__.notify_all()
+
+    def acquire_write(self) -> None:
+        """ @abstract Acquire the lock for writing, blocks while other
+                threads hold the lock
+            @returns [None]
+        """
+        _me = get_ident()
+        with self.__cond__:
+            if self.__writer__ == _me:
+                self.__depth__ += 1
+                return
+            if _me in self.__readers__:
+                raise RuntimeError("cannot upgrade a read lock to a write lock")
+            self.__waiting__ += 1
+            try:
+                while self.__writer__ is not None or self.__readers__:
+                    self.__cond__.wait()
+            finally:
+                self.__waiting__ -= 1
+            self.__writer__ = _me
+            self.__depth__ = 1
+
+    def release_write(self) -> None:
+        """ @abstract Release one level of the write lock
+            @returns [None]
+        """
+        with self.__cond__:
+            if self.__writer__ != get_ident():
+                raise RuntimeError("write lock not held")
+            self.__depth__ -= 1
+            if not self.__depth__:
+                self.__writer__ = None
+                self.__cond__.notify_all()
+
+
+class _State(object):
+    """ @abstract Module locking state
+    """
+    def __init__(self):
+        self.enabled = False
+        self.originals = []
+
+
+_STATE = _State()
+
+# Serializes lazy lock creation
+_ASSIGN = Lock()
+
+
+def is_domain(node: DOMObject) -> bool:
+    """ @abstract Whether a node roots its own locking domain
+        @param node [DOMObject] Node
+        @returns [bool] True for tree roots, namespaces and DictGroups
+    """
+    return (isinstance(node, (DictGroup, DOMRootObject)) or
+            bool(node.__flags__.__flags__["self"] & FLAG_NAMESPACE))
+
+
+def _assign(node: DOMObject) -> RWLock:
+    """ @abstract Lock of a domain node, created on first use
+        @param node [DOMObject] Domain node
+        @returns [RWLock] Domain lock
+    """
+    with _ASSIGN:
+        _lock = node.__dict__.get("__lock__")
+        if _lock is None:
+            _lock = RWLock()
+            object.__setattr__(node, "__lock__", _lock)
+        return _lock
+
+
+def domain_lock(node: DOMObject) -> RWLock:
+    """ @abstract Lock of the nearest domain at or above a node
+        @param node [DOMObject] Node
+        @returns [RWLock] Domain lock, a private lock for detached nodes
+    """
+    _node = node
+    while True:
+        _lock = _node.__dict__.get("__lock__")
+        if _lock is not None:
+            return _lock
+        if is_domain(_node):
+            return _assign(_node)
+        _parent = _node.parent
+        if _parent is None:
+            # detached node, nothing to share a lock with yet
+            return RWLock()
+        _node = _parent
+
+
+def _index_lock(node: DOMObject, lock: RWLock) -> RWLock:
+    """ @abstract Lock of the indexed DictGroup a domain node is a member
+            of, writes to the node re-index it in the group
+        @param node [DOMObject] Node
+        @param lock [RWLock] Domain lock of the node
+        @returns [RWLock] Group lock, None when the node is not an indexed
+            member rooting its own domain
+    """
+    if not node.__hooks__ & _HOOK_INDEX or \
+       node.__dict__.get("__lock__") is not lock:
+        return None
+    _parent = node.parent
+    if _parent is None or not _parent.__dict__.get("__indexes__"):
+        return None
+    return domain_lock(_parent)
+
+
+def _writer(func: object) -> object:
+    """ @abstract Wrap a mutator to hold the domain write lock, and the
+            write lock of the indexed group the domain is a member of
+        @param func [callable] Original method
+        @returns [callable] Wrapper
+    """
+    @wraps(func)
+    def _locked(self, *args, **kwargs):
+        _lock = domain_lock(self)
+        _group = _index_lock(self, _lock)
+        if _group is None:
+            _lock.acquire_write()
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                _lock.release_write()
+        # top-down, the group before its member domain
+        _group.acquire_write()
+        try:
+            _lock.acquire_write()
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                _lock.release_write()
+        finally:
+            _group.release_write()
+    return _locked
+
+
+def _reader(func: object) -> object:
+    """ @abstract Wrap a reader to hold the domain read lock, or the write
+            lock for nodes marked with `__mutating_reads__`
+        @param func [callable] Original method
+        @returns [callable] Wrapper
+    """
+    @wraps(func)
+    def _locked(self, *args, **kwargs):
+        _lock = domain_lock(self)
+        if getattr(type(self), "__mutating_reads__", False):
+            _acquire, _release = _lock.acquire_write, _lock.release_write
+        else:
+            _acquire, _release = _lock.acquire_read, _lock.release_read
+        _acquire()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            _release()
+    return _locked
+
+
+def _snapshot(func: object) -> object:
+    """ @abstract Wrap a method returning an iterator, the iterator is
+            consumed under the lock and an iterator of its items returned
+        @param func [callable] Original method
+        @returns [callable] Wrapper
+    """
+    _locked = _reader(lambda self, *args, **kwargs:
+                      list(func(self, *args, **kwargs)))
+
+    @wraps(func)
+    def _iter(self, *args, **kwargs):
+        return iter(_locked(self, *args, **kwargs))
+    return _iter
+
+
+def _patch(owner: object, name: str, wrap: object) -> None:
+    """ @abstract Replace a method, property or function by its wrapper,
+            recording the original for `disable`
+        @param owner [object] Class or module
+        @param name [str] Attribute name
+        @param wrap [callable] Wrapper factory
+        @returns [None]
+    """
+    _orig = owner.__dict__[name]
+    if isinstance(_orig, property):
+        _new = property(wrap(_orig.fget), _orig.fset, _orig.fdel,
+                        _orig.__doc__)
+    else:
+        _new = wrap(_orig)
+    _STATE.originals.append((owner, name, _orig, _new))
+    setattr(owner, name, _new)
+
+
+def enable(root: DOMObject = None) -> None:
+    """ @abstract Start locking tree operations
+        @param root [DOMObject] #optional Tree whose domains get their locks
+            assigned up front, other domains are assigned on first use
+        @returns [None]
+    """
+    if not _STATE.enabled:
+        for _cls in _classes(DOMObject):
+            for _methods, _wrap in ((WRITE_METHODS, _writer),
+                                    (READ_METHODS, _reader),
+                                    (ITER_METHODS, _snapshot)):
+                for _method in _methods:
+                    if _method in _cls.__dict__:
+                        _patch(_cls, _method, _wrap)
+        for _module, _function in READ_FUNCTIONS:
+            _patch(modules[_module], _function, _reader)
+        _STATE.enabled = True
+    if root is not None:
+        _stack = [root]
+        while _stack:
+            _node = _stack.pop()
+            if is_domain(_node):
+                _assign(_node)
+            # DictGroup children are all held by the keystore
+            _keystore = _node.__dict__.get("__keystore__")
+            if _keystore is not None:
+                _members = [_keystore[_key] for _key in _keystore]
+            else:
+                _store = _node.__store__
+                _members = [_store.get(_child)
+                            for _child in _node.__children__]
+            _stack.extend(_member for _member in _members
+                          if isinstance(_member, DOMObject))
+
+
+def disable() -> None:
+    """ @abstract Stop locking, restoring the original methods. Assigned
+            locks are kept and reused when enabled again.
+        @returns [None]
+        @raises RuntimeError when the methods were patched again since, e.g.
+            by `instrument.enable`
+    """
+    _restore(_STATE.originals)
+    _STATE.originals = []
+    _STATE.enabled = False
+
+
+def is_enabled() -> bool:
+    """ @abstract Whether locking is active
+        @returns [bool] True when enabled
+    """
+    return _STATE.enabled
@@ -0,0 +1,220 @@
+__author__ = "Rob MacKinnon <rome@villagertech.com>"
+__package__ = "DOMObjects"
+__name__ = "DOMObjects.memory"
+__license__ = "MIT"
+
+__doc__ = """
+Per-subtree memory accounting, see `DOMObject.memory_usage`.
+
+Sizes come from `sys.getsizeof` and are split into four categories:
+
+    node        Node objects, their attribute dicts, child/prop name lists,
+                DictGroup keystores, indexes and member containers
+    flags       DOMFlags objects and their flag tables
+    names       Node, child, property and flag name strings
+    values      Property values, walked through nested containers
+
+Every object is counted once, shared objects (e.g. interned names) count
+toward the first node that references them. The walk is iterative, so it is
+safe on trees of any depth.
+"""
+
+from heapq import nlargest
+from sys import getsizeof
+
+CATEGORIES = ("node", "flags", "names", "values")
+
+# Containers walked when sizing property values
+_CONTAINERS = (list, tuple, set, frozenset, dict)
+
+
+def _deep_size(obj: object, seen: set) -> int:
+    """ @abstract Size of an object and the containers nested in it
+        @param obj [object] Object to size
+        @param seen [set] Ids of objects already counted
+        @returns [int] Bytes
+    """
+    _size = 0
+    _stack = [obj]
+    while _stack:
+        _obj = _stack.pop()
+        if id(_obj) in seen:
+            continue
+        seen.add(id(_obj))
+        _size += getsizeof(_obj)
+        if isinstance(_obj, dict):
+            _stack.extend(_obj.keys())
+            _stack.extend(_obj.values())
+        elif isinstance(_obj, _CONTAINERS):
+            _stack.extend(_obj)
+    return _size
+
+
+def _size_once(obj: object, seen: set) -> int:
+    """ @abstract Shallow size of an object not counted yet
+        @param obj [object] Object to size
+        @param seen [set] Ids of objects already counted
+        @returns [int] Bytes, 0 when already counted
+    """
+    if obj is None or id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    return getsizeof(obj)
+
+
+def _container_size(obj: object, seen: set) -> int:
+    """ @abstract Size of a bookkeeping container and its internal storage
+        @param obj [object] Container (list, dict, RingBuffer, index, ...)
+        @param seen [set] Ids of objects already counted
+        @returns [int] Bytes, excluding names and members held
+    """
+    _size = _size_once(obj, seen)
+    if isinstance(obj, _CONTAINERS) or not _size:
+        return _size
+    _slots = getattr(type(obj), "__slots__", ())
+    _attrs = [getattr(obj, _slot, None) for _slot in _slots]
+    if hasattr(obj, "__dict__"):
+        _size += _size_once(obj.__dict__, seen)
+        _attrs.extend(obj.__dict__.values())
+    for _attr in _attrs:
+        if isinstance(_attr, _CONTAINERS):
+            _size += _size_once(_attr, seen)
+            if isinstance(_attr, dict):
+                # value -> bucket dicts of hash indexes
+                for _value in _attr.values():
+                    if isinstance(_value, dict):
+                        _size += _size_once(_value, seen)
+    return _size
+
+
+def _names_size(names: object, seen: set) -> int:
+    """ @abstract Size of name strings not counted yet
+        @param names [iterable] Names
+        @param seen [set] Ids of objects already counted
+        @returns [int] Bytes
+    """
+    _size = 0
+    for _name in names:
+        if isinstance(_name, str):
+            _size += _size_once(_name, seen)
+    return _size
+
+
+def _own_usage(node: object, seen: set) -> list:
+    """ @abstract Memory of a single node, excluding its children
+        @param node [DOMObject] Node
+        @param seen [set] Ids of objects already counted
+        @returns [list] Bytes per category, in `CATEGORIES` order
+    """
+    from .columnar import ColumnGroup
+
+    _store = node.__store__
+    _node = _size_once(node, seen) + _size_once(node.__dict__, seen)
+    for _attr in ("__children__", "__properties__", "__keystore__",
+                  "__indexes__", "__memberkeys__", "__deadlines__", "__heap__",
+                  "__lru__"):
+        _value = node.__dict__.get(_attr)
+        if _value is not None:
+            _node += _container_size(_value, seen)
+    for _index in (node.__dict__.get("__indexes__") or {}).values():
+        _node += _container_size(_index, seen)
+
+    _flags = node.__flags__
+    _flagBytes = (_size_once(_flags, seen) + _size_once(_flags.__dict__, seen) +
+                  _size_once(_flags.__flags__, seen))
+
+    _names = _size_once(node.name, seen) if isinstance(node.name, str) else 0
+    _names += _names_size(node.__dict__.keys(), seen)
+    _names += _names_size(node.__children__, seen)
+    _names += _names_size(_flags.__flags__.keys(), seen)
+
+    _values = 0
+    for _prop in node.__properties__:
+        _values += _deep_size(_store[_prop], seen)
+    if isinstance(node, ColumnGroup):
+        _names += _names_size(node.__rowkeys__, seen)
+        _node += (_size_once(node.__rowkeys__, seen) +
+                  _size_once(node.__rows__, seen))
+        _colflags = node.__colflags__
+        _flagBytes += (_size_once(_colflags, seen) +
+                       _size_once(_colflags.__dict__, seen) +
+                       _size_once(_colflags.__flags__, seen))
+        for _column in node.__columns__.values():
+            _values += _deep_size(_column, seen)
+    return [_node, _flagBytes, _names, _values]
+
+
+def _child_nodes(node: object) -> list:
+    """ @abstract Child DOMObjects of a node, including DictGroup members
+        @param node [DOMObject] Node
+        @returns [list] (name, child) pairs
+    """
+    _keystore = node.__dict__.get("__keystore__")
+    if _keystore is not None:
+        # DictGroup children and members set by key are all in the keystore
+        _pairs = [(_key, _keystore[_key]) for _key in _keystore]
+    else:
+        _store = node.__store__
+        _pairs = [(_name, _store.get(_name)) for _name in node.__children__]
+    return [(_name, _child) for _name, _child in _pairs
+            if hasattr(_child, "__flags__") and hasattr(_child, "__dict__")]
+
+
+def memory_usage(node: object, deep: bool = True, top: int = None) -> dict:
+    """ @abstract Report the memory held by a node or subtree
+        @param node [DOMObject] Subtree root
+        @param deep [bool] #optional Include all descendants
+        @param top [int] #optional Also return the `top` heaviest nodes,
+            ranked by their own bytes so ancestors do not outrank the nodes
+            holding the memory
+        @returns [dict] Report
+            {
+                "path": <str>, "nodes": <int>, "total": <bytes>,
+                "node": <bytes>, "flags": <bytes>, "names": <bytes>,
+                "values": <bytes>,
+                "children": {<child name>: <subtree bytes>, ...},
+                "groups": {<DictGroup path>: <subtree bytes>, ...},
+                "top": [(<path>, <own bytes>), ...]
+            }
+    """
+    from . import DictGroup
+
+    _seen = set()
+    _nodes = [node]
+    _parents = [-1]
+    _names = [None]
+    _own = [_own_usage(node, _seen)]
+    if deep:
+        _stack = [0]
+        while _stack:
+            _idx = _stack.pop()
+            for _name, _child in _child_nodes(_nodes[_idx]):
+                if id(_child) in _seen:
+                    continue
+                _nodes.append(_child)
+                _parents.append(_idx)
+                _names.append(_name)
+                _own.append(_own_usage(_child, _seen))
+                _stack.append(len(_nodes) - 1)
+
+    # Children always come after their parent, accumulate in reverse
+    _totals = [sum(_o) for _o in _own]
+    for _idx in range(len(_nodes) - 1, 0, -1):
+        _totals[_parents[_idx]] += _totals[_idx]
+    _categories = [sum(_o[_c] for _o in _own) for _c in range(len(CATEGORIES))]
+
+    _report = {"path": node.path, "nodes": len(_nodes), "total": _totals[0]}
+    _report.update(zip(CATEGORIES, _categories))
+    _report["children"] = {_names[_idx]: _totals[_idx]
+                           for _idx in range(1, len(_nodes))
+                           if _parents[_idx] == 0}
+    _report["groups"] = {_nodes[_idx].path: _totals[_idx]
+                         for _idx in range(len(_nodes))
+                         if isinstance(_nodes[_idx], DictGroup)}
+    if top is not None:
+        _ownTotals = [sum(_o) for _o in _own]
+        _heaviest = nlargest(top, range(len(_nodes)),
+                             key=_ownTotals.__getitem__)
+        _report["top"] = [(_nodes[_idx].path, _ownTotals[_idx])
+                          for _idx in _heaviest]
+    return _report
@@ -0,0 +1,214 @@
+__author__ = "Rob MacKinnon <rome@villagertech.com>"
+__package__ = "DOMObjects"
+__name__ = "DOMObjects.paging"
+__license__ = "MIT"
+
+__doc__ = """
+Paginated and partial `dict()` output, see `DOMObject.page` and the
+`offset`, `limit`, `cursor`, `depth` and `fields` options of `dict()`.
+
+    offset, limit   Window over the children (DictGroup members) of the
+                    serialized node
+    cursor          Key of the last member of the previous page, the window
+                    starts after it
+    depth           Child levels to expand, deeper nodes are replaced by
+                    {"__count__": <number of children>}
+    fields          {<path pattern>: [<prop>, ...]} prop projection per
+                    node, patterns are relative dotted paths matched per
+                    segment with `fnmatch`, the first matching pattern wins
+
+Only the nodes of the window are visited, so a page costs time proportional
+to its size. Sorted groups locate the cursor by bisection; for other groups
+pass the `offset` returned by `page` along with the cursor, it is used as a
+position hint and the cursor is searched when the members before it changed.
+
+    @example Usage
+        ROOT.devices.dict(limit=50, depth=0)
+        _page = ROOT.devices.page(50, fields={"*": ["name", "status"]})
+        ROOT.devices.page(50, cursor=_page["next"], offset=_page["offset"])
+"""
+
+from fnmatch import fnmatchcase
+from itertools import islice
+
+from .containers import NameSet, RingBuffer, SortedNames
+
+# Children containers with positional slicing proportional to the slice
+_INDEXABLE = (list, tuple, RingBuffer, SortedNames)
+# Children containers of the group variants, listing every member in order
+_MEMBER_ORDERS = (NameSet, RingBuffer, SortedNames)
+
+
+def _members(node: object) -> object:
+    """ @abstract Serialized children names of a node, the members of
+            DictGroups in keystore order
+        @param node [DOMObject] Node
+        @returns [iterable] Names, in output order
+    """
+    _rowkeys = getattr(node, "__rowkeys__", None)
+    if _rowkeys is not None and not node.__deleted__:
+        # columnar groups without pending deletions, row keys as stored
+        return _rowkeys
+    # columnar member proxies have slots and no children
+    _keystore = getattr(node, "__dict__", {}).get("__keystore__")
+    if _keystore is None or isinstance(node.__children__, _MEMBER_ORDERS):
+        return node.__children__
+    # plain DictGroups hold members set with `__setitem__` in the keystore only
+    return _keystore
+
+
+def _child(node: object, name: object) -> object:
+    """ @abstract Child node or group member by name
+        @param node [DOMObject] Parent node
+        @param name [object] Child name or member key
+        @returns [object] Child
+    """
+    _keystore = node.__dict__.get("__keystore__")
+    if _keystore is not None and name in _keystore:
+        return _keystore[name]
+    return node.__store__[name]
+
+
+def _start(names: object, offset: int, cursor: object) -> int:
+    """ @abstract Window start position
+        @param names [iterable] Children names
+        @param offset [int] Offset, the position hint when paging by cursor
+        @param cursor [object] Last key of the previous page, or None
+        @returns [int] Position
+    """
+    if cursor is None:
+        return max(offset, 0)
+    if isinstance(names, SortedNames):
+        return names.bisect_right(cursor)
+    if isinstance(names, _INDEXABLE) and 0 < offset <= len(names) and \
+       names[offset - 1] == cursor:
+        return offset
+    for _pos, _name in enumerate(names):
+        if _name == cursor:
+            return _pos + 1
+    raise KeyError("cursor `%s` not found" % (cursor,))
+
+
+def window(node: object, offset: int = 0, limit: int = None,
+           cursor: object = None) -> tuple:
+    """ @abstract Children names of one page
+        @param node [DOMObject] Node
+        @param offset [int] #optional Children to skip
+        @param limit [int] #optional Page size, None for all remaining
+        @param cursor [object] #optional Last key of the previous page
+        @returns [tuple] (<names>, <next offset>, <total>)
+    """
+    _names = _members(node)
+    _total = len(_names)
+    _start_at = _start(_names, offset, cursor)
+    _stop = _total if limit is None else min(_start_at + max(limit, 0), _total)
+    if isinstance(_names, _INDEXABLE):
+        _page = list(_names[_start_at:_stop])
+    else:
+        _page = list(islice(_names, _start_at, _stop))
+    return _page, _start_at + len(_page), _total
+
+
+def compile_fields(fields: dict) -> list:
+    """ @abstract Split field path patterns into segments
+        @param fields [dict] {<path pattern>: [<prop>, ...]}
+        @returns [list] (<segments>, <props>) pairs, in pattern order
+    """
+    if not fields:
+        return None
+    return [(tuple(_pattern.split(".")), list(_props))
+            for _pattern, _props in fields.items()]
+
+
+def _project(fields: list, path: tuple) -> list:
+    """ @abstract Projected props of a node
+        @param fields [list] Compiled field patterns
+        @param path [tuple] Node path relative to the serialized node
+        @returns [list] Props, None when no pattern matches
+    """
+    for _segments, _props in fields:
+        if len(_segments) == len(path) and \
+           all(fnmatchcase(str(_name), _pat)
+               for _name, _pat in zip(path, _segments)):
+            return _props
+    return None
+
+
+def partial_dict(node: object, props: list = None, propsOnly: bool = False,
+                 offset: int = 0, limit: int = None, cursor: object = None,
+                 depth: int = None, fields: dict = None,
+                 names: list = None) -> dict:
+    """ @abstract `dict()` output of a page or partial view of a subtree
+        @param node [DOMObject] Subtree root
+        @param props [list] #optional List of specific properties to return
+        @param propsOnly [bool] #optional Should only properties be returned
+        @param offset [int] #optional Children of the root to skip
+        @param limit [int] #optional Number of children of the root
+        @param cursor [object] #optional Last key of the previous page
+        @param depth [int] #optional Child levels to expand
+        @param fields [dict] #optional Prop projection per path pattern
+        @param names [list] #optional Children of the root to serialize,
+            replaces the window options
+        @returns [dict] Static dictionary object
+    """
+    _fields = compile_fields(fields)
+    if names is None and not propsOnly:
+        names = window(node, offset, limit, cursor)[0]
+    _result = None
+    _stack = [(node, props, depth, (), names, None, None)]
+    while _stack:
+        _node, _props, _depth, _path, _names, _target, _key = _stack.pop()
+        if not hasattr(_node, "__children__"):
+            # plain values set on a DictGroup with `__setitem__`
+            _out = _node
+        elif _depth is not None and _depth < 0:
+            _out = {"__count__": len(_members(_node))}
+        else:
+            if _props is None and _fields is not None and _path:
+                _props = _project(_fields, _path)
+                if _props is not None:
+                    _props = [_p for _p in _props if _node.has_property(_p)]
+            _out = _node.dict(props=_props, propsOnly=True)
+            if _path or not propsOnly:
+                if _names is None:
+                    _names = _members(_node)
+                _next = None if _depth is None else _depth - 1
+                _pending = []
+                for _name in _names:
+                    _out[_name] = None
+                    _pending.append((_child(_node, _name), None, _next,
+                                     _path + (_name,), None, _out, _name))
+                _stack.extend(reversed(_pending))
+        if _target is None:
+            _result = _out
+        else:
+            _target[_key] = _out
+    return _result
+
+
+def page(node: object, limit: int, cursor: object = None, offset: int = 0,
+         depth: int = None, fields: dict = None) -> dict:
+    """ @abstract One page of the children (DictGroup members) of a node
+        @param node [DOMObject] Node
+        @param limit [int] Page size
+        @param cursor [object] #optional `next` of the previous page
+        @param offset [int] #optional Children to skip, or with a cursor the
+            `offset` of the previous page as position hint
+        @param depth [int] #optional Child levels of the members to expand
+        @param fields [dict] #optional Prop projection per path pattern,
+            relative to the node, e.g. {"*": ["name"]} for the members
+        @returns [dict]
+            {
+                "items": {<key>: <member dict>, ...},
+                "next": <cursor of the next page, None on the last page>,
+                "offset": <offset of the next page>,
+                "total": <number of children, `len()` of DictGroups>
+            }
+    """
+    _names, _offset, _total = window(node, offset, limit, cursor)
+    _items = partial_dict(node, props=[], depth=depth if depth is None
+                          else depth + 1, fields=fields, names=_names)
+    return {"items": _items,
+            "next": _names[-1] if _names and _offset < _total else None,
+            "offset": _offset,
+            "total": _total}
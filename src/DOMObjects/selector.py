@@ -0,0 +1,410 @@
+__author__ = "Rob MacKinnon <rome@villagertech.com>"
+__package__ = "DOMObjects"
+__name__ = "DOMObjects.selector"
+__license__ = "MIT"
+
+__doc__ = """
+Selector query language over DOM trees.
+
+    Syntax:
+    selector    := segment ("." segment)*
+    segment     := step ("[" key "]")* ("{" predicate "}")?
+    step        := name | "*" | "**"
+    key         := "*" | name
+    predicate   := cond (("," | "&&") cond)*
+    cond        := prop [("==" | "!=" | "<" | "<=" | ">" | ">=") literal]
+
+    name        Child or property stored under `name`
+    *           All children of a node
+    **          The node itself and all of its descendants
+    [*]         All members of a DictGroup
+    [key]       DictGroup member stored under `key`
+    {pred}      Keep nodes whose properties satisfy all conditions, a bare
+                property name tests for existence. Directly after `[*]` the
+                first condition backed by a DictGroup index preselects the
+                members, see `DictGroup.create_index`
+
+Names and keys may be quoted with ' or " to include reserved characters.
+Literals are Python literals, e.g. 'up', 3, 1.5, True, None.
+
+    @example Usage
+        ROOT.select("controls.*.value")
+        ROOT.select("devices[*]{status=='up'}")
+        ROOT.select("**{kind=='sensor', value>10}")
+"""
+
+from ast import literal_eval
+from functools import lru_cache
+import operator
+
+from .flags import FLAG_READ
+
+_OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<=": operator.le,
+    ">=": operator.ge,
+    "<": operator.lt,
+    ">": operator.gt
+}
+
+_RESERVED = ".[]{}"
+
+# Sentinel for missing property values
+_MISSING = object()
+
+
+class Selector(object):
+    """ @abstract Compiled selector, see module documentation for syntax.
+        @param text [str] Selector text
+    """
+    def __init__(self, text: str):
+        self.text = text
+        self.steps = _parse(text)
+
+    def __repr__(self) -> str:
+        return "Selector(%r)" % self.text
+
+    def select(self, node: object) -> object:
+        """ @abstract Lazily evaluate the selector from `node`
+            @param node [DOMObject] Context node
+            @returns [generator] Matched children, members or property values
+        """
+        _results = iter((node,))
+        for _step in self.steps:
+            _results = _step(_results)
+        return _results
+
+    __call__ = select
+
+
+@lru_cache(maxsize=256)
+def compile_selector(text: str) -> Selector:
+    """ @abstract Compile selector text, compiled selectors are cached
+        @param text [str] Selector text
+        @returns [Selector] Compiled selector
+    """
+    return Selector(text)
+
+
+def select(node: object, selector: str) -> object:
+    """ @abstract Lazily select nodes or values from `node`
+        @param node [DOMObject] Context node
+        @param selector [str|Selector] Selector text or compiled selector
+        @returns [generator] Matched children, members or property values
+    """
+    if not isinstance(selector, Selector):
+        selector = compile_selector(selector)
+    return selector.select(node)
+
+
+# Tree access helpers
+def _is_node(obj: object) -> bool:
+    return hasattr(obj, "__children__") and hasattr(obj, "__store__")
+
+
+def _child_of(node: object, name: str) -> object:
+    """ @abstract Resolve a child by name, including DictGroup members
+        @param node [DOMObject] Parent node
+        @param name [str] Child name
+        @returns [object] Child object
+    """
+    _keystore = node.__dict__.get("__keystore__")
+    if _keystore is not None and name in _keystore:
+        return _keystore[name]
+    return node.__store__[name]
+
+
+def _prop_value(node: object, prop: str) -> object:
+    """ @abstract Readable value of property `prop`, evaluating methods
+        @param node [DOMObject] Node holding the property
+        @param prop [str] Property name
+        @returns [object] Value, or `_MISSING`
+    """
+    if not _is_node(node) or not node.has_property(prop):
+        return _MISSING
+    if not node.__flags__.test_bit(prop, FLAG_READ):
+        return _MISSING
+    _value = node.__store__[prop]
+    if callable(_value):
+        _value = _value()
+    return _value
+
+
+# Step builders
+def _step_name(name: str) -> object:
+    def _step(nodes: object) -> object:
+        for _node in nodes:
+            if not _is_node(_node):
+                continue
+            # DictGroup members resolve before children, as `get_context`
+            _keystore = _node.__dict__.get("__keystore__")
+            if _keystore is not None and name in _keystore:
+                yield _keystore[name]
+                continue
+            if name not in _node.__store__:
+                continue
+            if _node.has_property(name):
+                _value = _prop_value(_node, name)
+                if _value is not _MISSING:
+                    yield _value
+                continue
+            # children only, not the node's own bookkeeping attributes
+            _child = _node.__store__[name]
+            if (_is_node(_child) and name != "parent") or \
+               name in _node.__children__:
+                yield _child
+    return _step
+
+
+def _step_children(nodes: object) -> object:
+    for _node in nodes:
+        if _is_node(_node):
+            for _name in list(_node.__children__):
+                yield _child_of(_node, _name)
+
+
+def _step_descendants(nodes: object) -> object:
+    for _node in nodes:
+        _stack = [_node]
+        while _stack:
+            _cur = _stack.pop()
+            yield _cur
+            if _is_node(_cur):
+                _stack.extend(_child_of(_cur, _name)
+                              for _name in reversed(list(_cur.__children__)))
+
+
+def _step_members(nodes: object) -> object:
+    for _node in nodes:
+        if _is_node(_node) and hasattr(_node, "__keystore__"):
+            for _key in list(_node):
+                yield _node[_key]
+
+
+def _step_member(key: str) -> object:
+    def _step(nodes: object) -> object:
+        for _node in nodes:
+            if (_is_node(_node) and hasattr(_node, "__keystore__") and
+               key in _node):
+                yield _node[key]
+    return _step
+
+
+def _index_candidates(group: object, conditions: list) -> list:
+    """ @abstract Member keys of `group` preselected through an index
+        @param group [DictGroup] Group to query
+        @param conditions [list] Predicate conditions
+        @returns [list] Candidate keys, or None when no index applies
+    """
+    _indexes = group.__dict__.get("__indexes__")
+    if not _indexes:
+        return None
+    for _prop, _op, _literal in conditions:
+        _index = _indexes.get(_prop)
+        if _index is None or _op is None:
+            continue
+        if _op is operator.eq:
+            return _index.find(_literal)
+        if not _index.sorted:
+            continue
+        try:
+            if _op is operator.lt:
+                return _index.range(hi=_literal, inclusive=(True, False))
+            if _op is operator.le:
+                return _index.range(hi=_literal)
+            if _op is operator.gt:
+                return _index.range(lo=_literal, inclusive=(False, True))
+            if _op is operator.ge:
+                return _index.range(lo=_literal)
+        except TypeError:
+            # literal not comparable with the values, as in `_step_filter`
+            return []
+    return None
+
+
+def _step_filter(conditions: list) -> object:
+    def _match(node: object) -> bool:
+        for _prop, _op, _literal in conditions:
+            _value = _prop_value(node, _prop)
+            if _value is _MISSING:
+                return False
+            if _op is None:
+                continue
+            try:
+                if not _op(_value, _literal):
+                    return False
+            except TypeError:
+                return False
+        return True
+
+    def _step(nodes: object) -> object:
+        for _node in nodes:
+            if _match(_node):
+                yield _node
+    _step.conditions = conditions
+    return _step
+
+
+def _step_indexed_members(conditions: list) -> object:
+    """ @abstract Fused `[*]{pred}` step, uses member property indexes
+        @param conditions [list] Predicate conditions
+        @returns [callable] Step
+    """
+    _filter = _step_filter(conditions)
+
+    def _step(nodes: object) -> object:
+        for _node in nodes:
+            if not (_is_node(_node) and hasattr(_node, "__keystore__")):
+                continue
+            _keys = _index_candidates(_node, conditions)
+            if _keys is None:
+                _members = _step_members((_node,))
+            else:
+                _members = (_node[_key] for _key in _keys if _key in _node)
+            for _member in _filter(_members):
+                yield _member
+    return _step
+
+
+# Parser
+class _Reader(object):
+    """ @abstract Character reader for the selector parser
+    """
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+
+    def peek(self, count: int = 1) -> str:
+        return self.text[self.pos:self.pos + count]
+
+    def eof(self) -> bool:
+        return self.pos >= len(self.text)
+
+    def error(self, message: str) -> ValueError:
+        return ValueError("invalid selector `%s` at %d: %s" %
+                          (self.text, self.pos, message))
+
+    def skip_spaces(self) -> None:
+        while not self.eof() and self.text[self.pos].isspace():
+            self.pos += 1
+
+    def expect(self, char: str) -> None:
+        self.skip_spaces()
+        if self.peek() != char:
+            raise self.error("expected `%s`" % char)
+        self.pos += 1
+
+    def quoted(self) -> str:
+        _quote = self.text[self.pos]
+        _end = self.pos + 1
+        while _end < len(self.text) and self.text[_end] != _quote:
+            if self.text[_end] == "\\":
+                _end += 1
+            _end += 1
+        if _end >= len(self.text):
+            raise self.error("unterminated string")
+        _value = literal_eval(self.text[self.pos:_end + 1])
+        self.pos = _end + 1
+        return _value
+
+    def name(self, stop: str = _RESERVED) -> str:
+        self.skip_spaces()
+        if self.peek() in ("'", '"'):
+            return self.quoted()
+        _start = self.pos
+        while (not self.eof() and self.text[self.pos] not in stop and
+               not self.text[self.pos].isspace()):
+            self.pos += 1
+        if _start == self.pos:
+            raise self.error("expected a name")
+        return self.text[_start:self.pos]
+
+    def literal(self) -> object:
+        self.skip_spaces()
+        if self.peek() in ("'", '"'):
+            return self.quoted()
+        _start = self.pos
+        while (not self.eof() and self.text[self.pos] not in ",&}" and
+               not self.text[self.pos].isspace()):
+            self.pos += 1
+        try:
+            return literal_eval(self.text[_start:self.pos])
+        except (ValueError, SyntaxError):
+            raise self.error("invalid literal")
+
+
+def _parse_predicate(reader: _Reader) -> list:
+    """ @abstract Parse the body of a `{...}` predicate
+        @param reader [_Reader] Reader positioned after `{`
+        @returns [list] List of (prop, operator, literal) conditions
+    """
+    _conditions = []
+    while True:
+        _prop = reader.name(stop=_RESERVED + "=!<>,&")
+        reader.skip_spaces()
+        _op = None
+        _literal = None
+        for _token in ("==", "!=", "<=", ">=", "<", ">"):
+            if reader.peek(len(_token)) == _token:
+                reader.pos += len(_token)
+                _op = _OPERATORS[_token]
+                _literal = reader.literal()
+                break
+        _conditions.append((_prop, _op, _literal))
+        reader.skip_spaces()
+        if reader.peek() == ",":
+            reader.pos += 1
+        elif reader.peek(2) == "&&":
+            reader.pos += 2
+        else:
+            break
+    reader.expect("}")
+    return _conditions
+
+
+def _parse(text: str) -> list:
+    """ @abstract Parse selector text into a list of step callables
+        @param text [str] Selector text
+        @returns [list] Steps
+    """
+    _reader = _Reader(text)
+    _steps = []
+    while True:
+        _reader.skip_spaces()
+        if _reader.peek(2) == "**":
+            _reader.pos += 2
+            _steps.append(_step_descendants)
+        elif _reader.peek() == "*":
+            _reader.pos += 1
+            _steps.append(_step_children)
+        elif _reader.peek() not in ("[", "{"):
+            _steps.append(_step_name(_reader.name()))
+
+        _reader.skip_spaces()
+        while _reader.peek() == "[":
+            _reader.pos += 1
+            _reader.skip_spaces()
+            if _reader.peek() == "*":
+                _reader.pos += 1
+                _steps.append(_step_members)
+            else:
+                _steps.append(_step_member(_reader.name()))
+            _reader.expect("]")
+            _reader.skip_spaces()
+
+        if _reader.peek() == "{":
+            _reader.pos += 1
+            _conditions = _parse_predicate(_reader)
+            if _steps and _steps[-1] is _step_members:
+                _steps[-1] = _step_indexed_members(_conditions)
+            else:
+                _steps.append(_step_filter(_conditions))
+            _reader.skip_spaces()
+
+        if _reader.eof():
+            break
+        _reader.expect(".")
+    if not _steps:
+        raise _reader.error("empty selector")
+    return _steps
@@ -0,0 +1,190 @@
+__author__ = "Rob MacKinnon <rome@villagertech.com>"
+__package__ = "DOMObjects"
+__name__ = "DOMObjects.serialize"
+__license__ = "MIT"
+
+__doc__ = """
+Parallel JSON serialization of DOM trees.
+
+The tree is split at its top-level children, and large top-level DictGroups
+are further split into chunks of members. Fragments are serialized in a
+forked process pool, workers inherit the tree from the parent process so
+no node is ever pickled, and stitched into output identical to
+`DOMObject.json()`. Where `fork` is not available, or the tree is smaller
+than the threshold, serialization stays serial.
+"""
+
+from json import dumps as JSON_DUMPS
+
+# Trees with fewer nodes than this are serialized serially.
+PARALLEL_THRESHOLD = 10000
+
+# Tree inherited by forked workers, only set while a pool is running.
+_WORKER_ROOT = None
+
+
+def _key(key: object) -> str:
+    """ @abstract JSON encoding of a dict key, as `json.dumps` would emit it
+        @param key [object] Dict key
+        @returns [str] Encoded key
+    """
+    if isinstance(key, str):
+        return JSON_DUMPS(key)
+    return JSON_DUMPS({key: 0})[1:-4]
+
+
+def _child_of(node: object, name: str) -> object:
+    """ @abstract Resolve a child by name, including DictGroup members
+        @param node [DOMObject] Parent node
+        @param name [str] Child name
+        @returns [object] Child object
+    """
+    _keystore = node.__dict__.get("__keystore__")
+    if _keystore is not None and name in _keystore:
+        return _keystore[name]
+    return node.__store__[name]
+
+
+def _resolve(node: object, path: tuple) -> object:
+    """ @abstract Resolve a tuple path of child names from `node`
+        @param node [DOMObject] Start node
+        @param path [tuple] Child names
+        @returns [DOMObject] Resolved node
+    """
+    for _name in path:
+        node = _child_of(node, _name)
+    return node
+
+
+def _pairs(data: dict) -> list:
+    """ @abstract Encode each key/value pair of a dict
+        @param data [dict] Dict to encode
+        @returns [list] List of `"key": value` strings
+    """
+    return [_key(_k) + ": " + JSON_DUMPS(_v) for _k, _v in data.items()]
+
+
+def _serialize_unit(unit: tuple) -> str:
+    """ @abstract Worker entry point, serialize one fragment of the tree
+        @param unit [tuple] (path, names) where names is None for a whole
+            node, or the list of member names of a split DictGroup
+        @returns [str] JSON fragment
+    """
+    _path, _names = unit
+    _node = _resolve(_WORKER_ROOT, _path)
+    if _names is None:
+        return JSON_DUMPS(_node.dict())
+    return ", ".join(_key(_n) + ": " + JSON_DUMPS(_child_of(_node, _n).dict())
+                     for _n in _names)
+
+
+def count_nodes(node: object, limit: int = None) -> int:
+    """ @abstract Count the nodes of a subtree
+        @param node [DOMObject] Subtree root
+        @param limit [int] #optional Stop counting once reached
+        @returns [int] Number of nodes
+    """
+    _count = 0
+    _stack = [node]
+    while _stack:
+        _node = _stack.pop()
+        _count += 1
+        if limit is not None and _count >= limit:
+            break
+        for _name in _node.__children__:
+            _child = _child_of(_node, _name)
+            if hasattr(_child, "__children__"):
+                _stack.append(_child)
+    return _count
+
+
+def _plan(node: object, workers: int) -> list:
+    """ @abstract Split a tree into serialization units
+        @param node [DOMObject] Tree root
+        @param workers [int] Number of worker processes
+        @returns [list] List of (name, group props, units) per child, where
+            group props is None for unsplit children
+    """
+    from . import DictGroup
+
+    _chunks = workers * 4
+    _plan = []
+    for _name in node.__children__:
+        _child = _child_of(node, _name)
+        if isinstance(_child, DictGroup):
+            # the output hook may drop members, run it before splitting
+            _child.__before_output__()
+        _members = list(getattr(_child, "__children__", []))
+        if isinstance(_child, DictGroup) and len(_members) >= _chunks * 2:
+            _size = -(-len(_members) // _chunks)
+            _units = [((_name,), _members[_i:_i + _size])
+                      for _i in range(0, len(_members), _size)]
+            _props = _child.dict(propsOnly=True)
+            _plan.append((_name, _props, _units))
+        else:
+            _plan.append((_name, None, [((_name,), None)]))
+    return _plan
+
+
+def dumps_parallel(node: object,
+                   workers: int = None,
+                   props: list = None,
+                   threshold: int = PARALLEL_THRESHOLD) -> str:
+    """ @abstract Serialize a tree to JSON using a process pool
+        @param node [DOMObject] Tree to serialize
+        @param workers [int] #optional Pool size, defaults to CPU count
+        @param props [list] #optional List of specific properties to return
+        @param threshold [int] #optional Node count below which the tree is
+            serialized serially
+        @returns [str] JSON text, identical to `node.json(props=props)`
+    """
+    import multiprocessing
+    global _WORKER_ROOT
+
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    try:
+        _mpContext = multiprocessing.get_context("fork")
+    except ValueError:
+        _mpContext = None
+    if (workers < 2 or _mpContext is None or _WORKER_ROOT is not None or
+       count_nodes(node, limit=threshold) < threshold):
+        return JSON_DUMPS(node.dict(props=props))
+
+    _head = _pairs(node.dict(props=props, propsOnly=True))
+    _plan_ = _plan(node, workers)
+    _units = [_unit for _entry in _plan_ for _unit in _entry[2]]
+
+    _WORKER_ROOT = node
+    try:
+        with _mpContext.Pool(workers) as _pool:
+            _fragments = iter(_pool.imap(_serialize_unit, _units,
+                                         chunksize=1))
+            _body = []
+            for _name, _groupProps, _entryUnits in _plan_:
+                if _groupProps is None:
+                    _body.append(_key(_name) + ": " + next(_fragments))
+                    continue
+                _parts = _pairs(_groupProps)
+                _parts.extend(next(_fragments) for _u in _entryUnits)
+                _body.append(_key(_name) + ": {" + ", ".join(_parts) + "}")
+    finally:
+        _WORKER_ROOT = None
+    return "{" + ", ".join(_head + _body) + "}"
+
+
+def dump_json(node: object, fp: object,
+              workers: int = None,
+              props: list = None,
+              threshold: int = PARALLEL_THRESHOLD) -> None:
+    """ @abstract Serialize a tree as JSON to a file object
+        @param node [DOMObject] Tree to serialize
+        @param fp [object] Writable text file object
+        @param workers [int] #optional Pool size, 1 to stay serial
+        @param props [list] #optional List of specific properties to return
+        @param threshold [int] #optional Node count below which the tree is
+            serialized serially
+        @returns [None]
+    """
+    fp.write(dumps_parallel(node, workers=workers, props=props,
+                            threshold=threshold))
@@ -0,0 +1,551 @@
+__author__ = "Rob MacKinnon <rome@villagertech.com>"
+__package__ = "DOMObjects"
+__name__ = "DOMObjects.shared"
+__license__ = "MIT"
+
+__doc__ = """
+Shared memory export of DOM trees for multiprocess worker pools.
+
+A tree is flattened into a single offset-addressed buffer and published in
+`multiprocessing.shared_memory`. Worker processes attach to the buffer by
+name and receive a read-only `SharedDOMView`, nodes are decoded on access
+only, so N workers share one copy of the tree.
+
+    Buffer Layout:
+    [header][node section][string section]
+
+    header      <4sHHIII  magic, version, reserved, node base, string base,
+                          root node offset
+    node        <IBxxxII  name, kind, #children, #props
+                followed by #children (name, node) offset pairs in insertion
+                order, #children u32 indexes sorted by name, #props
+                (name, value, flags) offset triples in insertion order and
+                #props u32 indexes sorted by name
+    string      <I        byte length, followed by UTF-8 bytes
+
+Property values are stored JSON encoded, method properties are evaluated
+once at export time. Only JSON types round-trip (None, bool, int, float,
+str, lists and dicts with str keys); tuples, sets, non-str dict keys and
+other objects are rejected at export with a TypeError. Children that are
+not DOM nodes are skipped with a warning.
+
+Only the exporting process keeps the block registered with the
+multiprocessing resource tracker, so the block is released when the owner
+unlinks it or exits without doing so. Workers attach with `track=False` on
+Python 3.13+, older Pythons register on attach and workers unregister the
+block right after. Workers sharing the tracker of the owner, e.g. spawned
+by it, then drop its registration as well, so the owner should unlink the
+block itself, the export is a context manager for that.
+"""
+
+import os
+import struct
+import sys
+from json import dumps as JSON_DUMPS, loads as JSON_LOADS
+from warnings import warn
+
+from .flags import FLAG_READ
+from .interning import intern_name
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None
+
+MAGIC = b"DOMS"
+VERSION = 1
+
+KIND_NODE = 0
+KIND_DICTGROUP = 1
+
+_HEADER = struct.Struct("<4sHHIII")
+_NODE = struct.Struct("<IBxxxII")
+_U32 = struct.Struct("<I")
+_PAIR = struct.Struct("<II")
+_TRIPLE = struct.Struct("<III")
+
+# Types stored as is by JSON, containers are checked item by item
+_SCALARS = (str, int, float, bool, type(None))
+
+# Names of the blocks exported by this process, attaching to them from the
+# owner keeps its tracker registration
+_EXPORTED = set()
+
+
+def _require_shared_memory() -> None:
+    """ @abstract Raise when `multiprocessing.shared_memory` is unavailable
+        @returns [None]
+    """
+    if shared_memory is None:
+        raise RuntimeError("shared memory export requires Python 3.8+")
+
+
+def _check_json(value: object, node: object, prop: str) -> None:
+    """ @abstract Reject property values that do not round-trip through JSON
+        @param value [object] Property value
+        @param node [DOMObject] Node of the property, for the error message
+        @param prop [str] Property name
+        @returns [None]
+    """
+    _stack = [value]
+    while _stack:
+        _value = _stack.pop()
+        if isinstance(_value, _SCALARS):
+            continue
+        if type(_value) is list:
+            _stack.extend(_value)
+        elif type(_value) is dict:
+            for _key in _value:
+                if not isinstance(_key, str):
+                    raise TypeError("property `%s.%s` has non-str key %r, "
+                                    "which does not round-trip through "
+                                    "shared memory" % (node.path, prop, _key))
+            _stack.extend(_value.values())
+        else:
+            raise TypeError("property `%s.%s` value of type %s does not "
+                            "round-trip through shared memory, only JSON "
+                            "types can be exported" %
+                            (node.path, prop, type(_value).__name__))
+
+
+class _StringHeap(object):
+    """ @abstract Deduplicating string section builder
+    """
+    def __init__(self):
+        self.buffer = bytearray()
+        self.offsets = {}
+
+    def add(self, value: str) -> int:
+        """ @abstract Add a string to the heap, returning its offset
+            @param value [str] String to store
+            @returns [int] Offset relative to the string section
+        """
+        _off = self.offsets.get(value)
+        if _off is None:
+            _raw = value.encode("utf-8")
+            _off = len(self.buffer)
+            self.buffer += _U32.pack(len(_raw))
+            self.buffer += _raw
+            self.offsets[value] = _off
+        return _off
+
+
+def pack_tree(node: object) -> bytes:
+    """ @abstract Flatten a DOM tree into the shared buffer layout
+        @param node [DOMObject] Root node of the tree to pack
+        @returns [bytes] Packed buffer
+    """
+    from . import DictGroup
+
+    _strings = _StringHeap()
+    _nodes = bytearray()
+    _offsets = {}
+
+    # Iterative post-order walk, children must be packed before parents so
+    # that their offsets are known.
+    _stack = [(node, False)]
+    while _stack:
+        _node, _visited = _stack.pop()
+        _childNames = list(_node.__children__)
+        if not _visited:
+            _stack.append((_node, True))
+            for _name in reversed(_childNames):
+                _child = _child_of(_node, _name)
+                if hasattr(_child, "__children__"):
+                    _stack.append((_child, False))
+                else:
+                    warn("child `%s` of `%s` is not a DOM node, skipped in "
+                         "shared export" % (_name, _node.path))
+            continue
+
+        _children = []
+        for _name in _childNames:
+            _child = _child_of(_node, _name)
+            if id(_child) in _offsets:
+                _children.append((str(_name), _offsets[id(_child)]))
+        _props = []
+        for _prop in _node.__properties__:
+            _value = _node.__store__[_prop]
+            if callable(_value):
+                _value = _value()
+            _check_json(_value, _node, _prop)
+            _props.append((str(_prop),
+                           JSON_DUMPS(_value),
+                           _node.__flags__.get_flag(_prop)))
+
+        _kind = KIND_DICTGROUP if isinstance(_node, DictGroup) else KIND_NODE
+        _offsets[id(_node)] = len(_nodes)
+        _nodes += _NODE.pack(_strings.add(str(_node.name)), _kind,
+                             len(_children), len(_props))
+        for _name, _off in _children:
+            _nodes += _PAIR.pack(_strings.add(_name), _off)
+        for _idx in _sorted_index([_c[0] for _c in _children]):
+            _nodes += _U32.pack(_idx)
+        for _name, _value, _flags in _props:
+            _nodes += _TRIPLE.pack(_strings.add(_name),
+                                   _strings.add(_value), _flags)
+        for _idx in _sorted_index([_p[0] for _p in _props]):
+            _nodes += _U32.pack(_idx)
+
+    _nodeBase = _HEADER.size
+    _strBase = _nodeBase + len(_nodes)
+    _header = _HEADER.pack(MAGIC, VERSION, 0, _nodeBase, _strBase,
+                           _offsets[id(node)])
+    return bytes(_header) + bytes(_nodes) + bytes(_strings.buffer)
+
+
+def _child_of(node: object, name: str) -> object:
+    """ @abstract Resolve a child by name, including DictGroup members
+        @param node [DOMObject] Parent node
+        @param name [str] Child name
+        @returns [object] Child object
+    """
+    _keystore = node.__dict__.get("__keystore__")
+    if _keystore is not None and name in _keystore:
+        return _keystore[name]
+    return node.__store__[name]
+
+
+def _sorted_index(names: list) -> list:
+    """ @abstract Positions of `names` ordered by their UTF-8 encoding
+        @param names [list] Names in insertion order
+        @returns [list] Sorted positions
+    """
+    return sorted(range(len(names)), key=lambda _i: names[_i].encode("utf-8"))
+
+
+class SharedDOMExport(object):
+    """ @abstract Owner handle of a tree published into shared memory.
+        @param node [DOMObject] Tree to publish
+        @param name [str] #optional Shared memory block name
+    """
+    def __init__(self, node: object, name: str = None):
+        _require_shared_memory()
+        _data = pack_tree(node)
+        self.size = len(_data)
+        self.__shm__ = shared_memory.SharedMemory(name=name, create=True,
+                                                  size=max(self.size, 1))
+        self.__shm__.buf[:self.size] = _data
+        _EXPORTED.add(self.__shm__.name)
+
+    @property
+    def name(self) -> str:
+        """ @abstract Shared memory block name to pass to workers
+            @returns [str] Block name
+        """
+        return self.__shm__.name
+
+    def close(self) -> None:
+        """ @abstract Close the local mapping of the block
+            @returns [None]
+        """
+        self.__shm__.close()
+
+    def unlink(self) -> None:
+        """ @abstract Release the shared memory block, call once from owner
+            @returns [None]
+        """
+        self.__shm__.unlink()
+        _EXPORTED.discard(self.__shm__.name)
+
+    def __enter__(self) -> object:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+        self.unlink()
+
+
+def export_shared(node: object, name: str = None) -> SharedDOMExport:
+    """ @abstract Publish a tree into shared memory
+        @param node [DOMObject] Tree to publish
+        @param name [str] #optional Shared memory block name
+        @returns [SharedDOMExport] Owner handle, keep alive while in use
+    """
+    return SharedDOMExport(node, name=name)
+
+
+def attach_shared(name: str) -> object:
+    """ @abstract Attach to a published tree from a worker process
+        @param name [str] Shared memory block name
+        @returns [SharedDOMView] Read-only root view
+    """
+    _require_shared_memory()
+    if sys.version_info >= (3, 13):
+        _shm = shared_memory.SharedMemory(name=name, track=False)
+    else:
+        _shm = shared_memory.SharedMemory(name=name)
+        if os.name == "posix" and _shm.name not in _EXPORTED:
+            # a registration by a worker would unlink the block on its exit
+            from multiprocessing import resource_tracker as TRACKER
+            TRACKER.unregister(_shm._name, "shared_memory")
+    _magic, _version, _, _nodeBase, _strBase, _root = \
+        _HEADER.unpack_from(_shm.buf, 0)
+    if _magic != MAGIC or _version != VERSION:
+        _shm.close()
+        raise ValueError("shared block `%s` is not a DOM tree export" % name)
+    return SharedDOMView(_SharedBuffer(_shm, _nodeBase, _strBase),
+                         _nodeBase + _root)
+
+
+class _SharedBuffer(object):
+    """ @abstract Decoding helpers over an attached shared memory block
+    """
+    __slots__ = ("shm", "buf", "nodeBase", "strBase")
+
+    def __init__(self, shm: object, nodeBase: int, strBase: int):
+        self.shm = shm
+        self.buf = shm.buf
+        self.nodeBase = nodeBase
+        self.strBase = strBase
+
+    def raw(self, off: int) -> bytes:
+        """ @abstract Raw bytes of string at section offset `off`
+            @param off [int] Offset relative to the string section
+            @returns [bytes] Encoded string
+        """
+        _pos = self.strBase + off
+        _len = _U32.unpack_from(self.buf, _pos)[0]
+        return bytes(self.buf[_pos + 4:_pos + 4 + _len])
+
+    def string(self, off: int) -> str:
+        """ @abstract Decoded string at section offset `off`
+            @param off [int] Offset relative to the string section
+            @returns [str] Decoded string
+        """
+        return self.raw(off).decode("utf-8")
+
+    def name(self, off: int) -> str:
+        """ @abstract Decoded and interned node, child or property name at
+                section offset `off`, values are decoded with `string`
+            @param off [int] Offset relative to the string section
+            @returns [str] Interned name
+        """
+        return intern_name(self.raw(off).decode("utf-8"))
+
+    def close(self) -> None:
+        """ @abstract Close the mapping
+            @returns [None]
+        """
+        self.buf = None
+        self.shm.close()
+
+
+class SharedDOMView(object):
+    """ @abstract Read-only view of a node published in shared memory.
+            Mirrors the read API of `DOMObject`.
+    """
+    __slots__ = ("__buffer__", "__offset__", "parent", "name", "kind",
+                 "__nchildren__", "__nprops__")
+
+    def __init__(self, buffer: _SharedBuffer, offset: int,
+                 parent: object = None):
+        _set = object.__setattr__
+        _nameOff, _kind, _nChildren, _nProps = \
+            _NODE.unpack_from(buffer.buf, offset)
+        _set(self, "__buffer__", buffer)
+        _set(self, "__offset__", offset)
+        _set(self, "parent", parent)
+        _set(self, "name", buffer.name(_nameOff))
+        _set(self, "kind", _kind)
+        _set(self, "__nchildren__", _nChildren)
+        _set(self, "__nprops__", _nProps)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise KeyError("shared view is read-only, cannot set `%s`" % name)
+
+    def __getattr__(self, name: str) -> object:
+        _off = self.__find_child__(name)
+        if _off is not None:
+            return SharedDOMView(self.__buffer__, _off, self)
+        if self.__find_prop__(name) is not None:
+            return self.get_property(name)
+        raise AttributeError(name)
+
+    def __getitem__(self, key: str) -> object:
+        _off = self.__find_child__(key)
+        if _off is None:
+            raise KeyError(key)
+        return SharedDOMView(self.__buffer__, _off, self)
+
+    def __contains__(self, key: str) -> bool:
+        return self.__find_child__(key) is not None
+
+    def __len__(self) -> int:
+        return self.__nchildren__
+
+    def __iter__(self) -> object:
+        return iter(self.children)
+
+    # Private layout helpers
+    @property
+    def __children_base__(self) -> int:
+        return self.__offset__ + _NODE.size
+
+    @property
+    def __props_base__(self) -> int:
+        return self.__children_base__ + self.__nchildren__ * (_PAIR.size +
+                                                              _U32.size)
+
+    def __bisect__(self, name: str, count: int, entries: int, size: int,
+                   index: int) -> int:
+        """ @abstract Binary search the sorted index of a record table
+            @param name [str] Name to find
+            @param count [int] Number of records
+            @param entries [int] Absolute offset of the record table
+            @param size [int] Size of a single record
+            @param index [int] Absolute offset of the sorted index
+            @returns [int] Record position or -1 when not found
+        """
+        _buf = self.__buffer__
+        _key = str(name).encode("utf-8")
+        _lo, _hi = 0, count
+        while _lo < _hi:
+            _mid = (_lo + _hi) // 2
+            _pos = _U32.unpack_from(_buf.buf, index + _mid * 4)[0]
+            _cur = _buf.raw(_U32.unpack_from(_buf.buf,
+                                             entries + _pos * size)[0])
+            if _cur < _key:
+                _lo = _mid + 1
+            elif _cur > _key:
+                _hi = _mid
+            else:
+                return _pos
+        return -1
+
+    def __find_child__(self, name: str) -> int:
+        _base = self.__children_base__
+        _pos = self.__bisect__(name, self.__nchildren__, _base, _PAIR.size,
+                               _base + self.__nchildren__ * _PAIR.size)
+        if _pos < 0:
+            return None
+        return (self.__buffer__.nodeBase +
+                _PAIR.unpack_from(self.__buffer__.buf,
+                                  _base + _pos * _PAIR.size)[1])
+
+    def __find_prop__(self, name: str) -> tuple:
+        _base = self.__props_base__
+        _pos = self.__bisect__(name, self.__nprops__, _base, _TRIPLE.size,
+                               _base + self.__nprops__ * _TRIPLE.size)
+        if _pos < 0:
+            return None
+        return _TRIPLE.unpack_from(self.__buffer__.buf,
+                                   _base + _pos * _TRIPLE.size)
+
+    # Public Properties
+    @property
+    def children(self) -> list:
+        """ @abstract Property to return all children names
+            @returns [list] List of all children names
+        """
+        _buf = self.__buffer__
+        _base = self.__children_base__
+        return [_buf.name(_PAIR.unpack_from(_buf.buf,
+                                            _base + _i * _PAIR.size)[0])
+                for _i in range(self.__nchildren__)]
+
+    @property
+    def props(self) -> list:
+        """ @abstract Property to return all node property names
+            @returns [list] List of all property names
+        """
+        _buf = self.__buffer__
+        _base = self.__props_base__
+        return [_buf.name(_TRIPLE.unpack_from(_buf.buf,
+                                              _base + _i * _TRIPLE.size)[0])
+                for _i in range(self.__nprops__)]
+
+    @property
+    def siblings(self) -> list:
+        """ @abstract Property to return all sibling names
+            @returns [list] List of all sibling names
+        """
+        if self.parent is None:
+            return [self.name]
+        _siblings = self.parent.children
+        _siblings.remove(self.name)
+        _siblings.sort()
+        return _siblings
+
+    @property
+    def path(self) -> str:
+        """ @abstract Returns a nodes full object path
+            @returns [str] Object named path
+        """
+        if self.parent is None:
+            return self.name
+        return self.parent.path + '.' + self.name
+
+    # Public Methods
+    def has_child(self, name: str) -> bool:
+        """ @abstract Checks if name exists in children
+            @param name [str] DOM object name
+            @returns [bool] True if exists
+        """
+        return self.__find_child__(name) is not None
+
+    def has_property(self, prop: str) -> bool:
+        """ @abstract Check if property exists
+            @param prop [str] Property name
+            @returns [bool] True if exists
+        """
+        return self.__find_prop__(prop) is not None
+
+    def get_context(self, name: str = None) -> object:
+        """ @abstract Get the view of a child by dotted path
+            @param name [str] Named context path relative to this node
+            @returns [SharedDOMView] View of the child node
+        """
+        if name is None:
+            return self
+        _ctx = self
+        for _key in name.split('.'):
+            _off = _ctx.__find_child__(_key)
+            assert _off is not None, "context `%s` does not exist" % name
+            _ctx = SharedDOMView(self.__buffer__, _off, _ctx)
+        return _ctx
+
+    def get_property(self, propName: str) -> object:
+        """ @abstract Retrieve a specific property by name.
+            @param propName [str] Property to retrieve.
+            @returns [object]
+        """
+        _entry = self.__find_prop__(propName)
+        if _entry is None:
+            raise(AssertionError("property '%s' does not exist" % propName))
+        assert _entry[2] & FLAG_READ
+        return JSON_LOADS(self.__buffer__.string(_entry[1]))
+
+    def dict(self, props: list = None, propsOnly: bool = False) -> dict:
+        """ @abstract Static dictionary of this node, see `DOMObject.dict`
+            @param props [list] #optional List of specific properties to return
+            @param propsOnly [bool] #optional Should only properties be returned
+            @returns [dict] Static dictionary object
+        """
+        _propNames = self.props if props is None else props
+        _dict = {}
+        for _prop in _propNames:
+            _dict[_prop] = self.get_property(_prop)
+        if not propsOnly:
+            _buf = self.__buffer__
+            _base = self.__children_base__
+            for _i in range(self.__nchildren__):
+                _nameOff, _off = _PAIR.unpack_from(_buf.buf,
+                                                   _base + _i * _PAIR.size)
+                _child = SharedDOMView(_buf, _buf.nodeBase + _off, self)
+                _dict[_child.name] = _child.dict()
+        return _dict
+
+    def json(self, props: list = None, propsOnly: bool = False) -> str:
+        """ @abstract JSON output of this node, see `DOMObject.json`
+            @param props [list] #optional List of specific properties to return
+            @param propsOnly [bool] #optional Should only properties be returned
+            @returns [str] JSON text object
+        """
+        return JSON_DUMPS(self.dict(props=props, propsOnly=propsOnly))
+
+    def close(self) -> None:
+        """ @abstract Detach this worker from the shared block
+            @returns [None]
+        """
+        self.__buffer__.close()
@@ -0,0 +1,203 @@
+__author__ = "Rob MacKinnon <rome@villagertech.com>"
+__package__ = "DOMObjects"
+__name__ = "DOMObjects.validation"
+__license__ = "MIT"
+
+__doc__ = """
+Property validation compiled from schema prop specs.
+
+A prop spec, as used by `build_prop_map` and `DOMSchema.props`, may define
+
+    "cast": <type>                  values are coerced with cast(value)
+    "values": [<value>, ...]        allowed values, checked against a set
+    "validate_callback": <callable> called with the value, falsy rejects
+
+A spec with `values` or `validate_callback` compiles to a `PropValidator`,
+its `cast` then also coerces assigned values. A spec with only `cast` gets
+no validator, cast builds the default and assigned values are stored as
+given. Compiled validators and validator maps are cached by spec content,
+so every node built from equal specs shares one `__validators__` map.
+Validators run on `set_property`, attribute assignment and the bulk
+loaders, raising ValueError. `validate` checks a whole subtree in one pass
+and returns the errors instead of raising.
+
+    @example Usage
+        ROOT.build_prop_map([({"mode": {"cast": str, "default": "auto",
+                                        "values": ["auto", "manual"]}},
+                              "hvac")])
+        ROOT.hvac.mode = "off"
+        >>> ValueError: property `mode` value 'off' not in allowed values
+        ROOT.validate()
+        >>> []
+"""
+
+from functools import lru_cache
+
+
+class PropValidator(object):
+    """ @abstract Compiled validator of one property
+        @param name [str] Property name
+        @param cast [type] #optional Type values are coerced to
+        @param values [iterable] #optional Allowed values
+        @param callback [callable] #optional Called with the value,
+            falsy rejects
+    """
+    __slots__ = ("name", "cast", "values", "callback")
+
+    def __init__(self, name: str,
+                 cast: type = None,
+                 values: object = None,
+                 callback: object = None):
+        self.name = name
+        self.cast = cast
+        self.callback = callback
+        if values is not None:
+            try:
+                values = frozenset(values)
+            except TypeError:
+                # unhashable allowed values fall back to a scan
+                values = tuple(values)
+        self.values = values
+
+    def __repr__(self) -> str:
+        return "PropValidator(%r)" % self.name
+
+    def __check__(self, value: object) -> str:
+        """ @abstract Check allowed values and callback
+            @param value [object] Value to check
+            @returns [str] Error message, None when valid
+        """
+        if self.values is not None:
+            try:
+                _allowed = value in self.values
+            except TypeError:
+                _allowed = False
+            if not _allowed:
+                return ("property `%s` value %r not in allowed values" %
+                        (self.name, value))
+        if self.callback is not None and not self.callback(value):
+            return "property `%s` value %r failed validation" % (self.name,
+                                                                 value)
+        return None
+
+    def coerce(self, value: object) -> object:
+        """ @abstract Coerce and validate a value before it is stored
+            @param value [object] Value to store
+            @returns [object] Coerced value
+        """
+        _cast = self.cast
+        if _cast is not None and value is not None and \
+           not isinstance(value, _cast):
+            try:
+                value = _cast(value)
+            except (TypeError, ValueError):
+                raise ValueError("property `%s` expects %s, got %r" %
+                                 (self.name, _cast.__name__, value))
+        _error = self.__check__(value)
+        if _error is not None:
+            raise ValueError(_error)
+        return value
+
+    def error(self, value: object) -> str:
+        """ @abstract Check a stored value without coercion
+            @param value [object] Stored value
+            @returns [str] Error message, None when valid
+        """
+        _cast = self.cast
+        if _cast is not None and value is not None and \
+           not isinstance(value, _cast):
+            return "property `%s` expects %s, got %r" % (self.name,
+                                                         _cast.__name__, value)
+        return self.__check__(value)
+
+
+@lru_cache(maxsize=1024)
+def _compiled(name: str, cast: type, values: tuple,
+              callback: object) -> PropValidator:
+    """ @abstract Cached validator of a prop spec, see `compile_spec`
+    """
+    return PropValidator(name, cast=cast, values=values, callback=callback)
+
+
+@lru_cache(maxsize=256)
+def _shared_map(items: tuple) -> dict:
+    """ @abstract Cached validator map, shared by the nodes built from equal
+            specs and never modified
+    """
+    return dict(items)
+
+
+def compile_spec(name: str, spec: dict) -> PropValidator:
+    """ @abstract Compile one prop spec, equal specs share one validator
+        @param name [str] Property name
+        @param spec [dict] Prop spec
+        @returns [PropValidator] Validator, None when the spec defines no
+            values or validate_callback
+    """
+    _cast = spec.get("cast")
+    _values = spec.get("values")
+    _callback = spec.get("validate_callback")
+    if _values is None and _callback is None:
+        return None
+    try:
+        return _compiled(name, _cast,
+                         None if _values is None else tuple(_values),
+                         _callback)
+    except TypeError:
+        # unhashable allowed values or callback, not cached
+        return PropValidator(name, cast=_cast, values=_values,
+                             callback=_callback)
+
+
+def compile_props(specs: dict) -> dict:
+    """ @abstract Compile a map of prop specs
+        @param specs [dict] {<prop name>: <prop spec>, ...}
+        @returns [dict] {<prop name>: PropValidator, ...}, shared by equal
+            specs and not to be modified
+    """
+    _validators = {}
+    for _name, _spec in specs.items():
+        if isinstance(_spec, dict):
+            _validator = compile_spec(_name, _spec)
+            if _validator is not None:
+                _validators[_name] = _validator
+    if not _validators:
+        return _validators
+    try:
+        return _shared_map(tuple(_validators.items()))
+    except TypeError:
+        # unhashable names
+        return _validators
+
+
+def validate(node: object) -> list:
+    """ @abstract Check every validated property below a node
+        @param node [DOMObject] Subtree root
+        @returns [list] (<property path>, <message>) for each invalid value
+    """
+    _errors = []
+    _stack = [node]
+    while _stack:
+        _node = _stack.pop()
+        _store = _node.__store__
+        _validators = _node.__dict__.get("__validators__")
+        if _validators:
+            _path = None
+            for _name, _validator in _validators.items():
+                if _name not in _store:
+                    continue
+                _error = _validator.error(_store[_name])
+                if _error is not None:
+                    if _path is None:
+                        _path = _node.path
+                    _errors.append((_path + "." + _name, _error))
+        _keystore = _node.__dict__.get("__keystore__")
+        if _keystore is not None:
+            # DictGroup children and members set by key are all in the keystore
+            _objs = [_keystore[_key] for _key in _keystore]
+        else:
+            _objs = [_store.get(_child) for _child in _node.__children__]
+        for _obj in reversed(_objs):
+            if hasattr(_obj, "__children__") and hasattr(_obj, "__dict__"):
+                _stack.append(_obj)
+    return _errors
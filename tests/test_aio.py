@@ -0,0 +1,151 @@
+import asyncio
+import threading
+
+import pytest
+
+import DOMObjects
+
+
+# number of slow_value calls in flight, and the most seen at once
+IN_FLIGHT = {"now": 0, "max": 0}
+
+
+async def slow_value(value, delay=0.01):
+    IN_FLIGHT["now"] += 1
+    IN_FLIGHT["max"] = max(IN_FLIGHT["max"], IN_FLIGHT["now"])
+    await asyncio.sleep(delay)
+    IN_FLIGHT["now"] -= 1
+    return value
+
+
+def build_tree():
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_child("sensors")
+    for _i in range(4):
+        rootDom.sensors.new_child("s%d" % _i)
+        _sensor = rootDom.sensors.get_context("s%d" % _i)
+        _sensor.new_property("unit", "C")
+        _sensor.new_method("temp", slow_value, margs=[20 + _i])
+    rootDom.new_child("settings")
+    rootDom.settings.new_property("theme", "dark")
+    return rootDom
+
+
+def test_adict_gathers_async_methods():
+    rootDom = build_tree()
+    IN_FLIGHT["max"] = 0
+    _result = asyncio.run(rootDom.adict())
+    # all four sensors are awaited concurrently
+    assert IN_FLIGHT["max"] == 4
+    assert _result["sensors"]["s3"] == {"unit": "C", "temp": 23}
+    assert list(_result["sensors"]["s0"]) == ["unit", "temp"]
+    assert _result == rootDom.dict()
+    assert asyncio.run(rootDom.sensors.s1.ajson(props=["temp"])) == \
+        '{"temp": 21}'
+
+    async def _sync_in_loop():
+        return rootDom.dict()
+    with pytest.raises(RuntimeError):
+        asyncio.run(_sync_in_loop())
+
+
+def test_adict_runs_the_output_hook():
+    _clock = [0.0]
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_dictgroup("cache", ttl=5)
+    rootDom.cache.__clock__ = lambda: _clock[0]
+    rootDom.cache["a"] = DOMObjects.DOMObject("a")
+    _clock[0] = 3.0
+    rootDom.cache["b"] = DOMObjects.DOMObject("b")
+    _clock[0] = 6.0
+    # expired members are dropped before either output walks the group
+    assert asyncio.run(rootDom.adict()) == {"cache": {"b": {}}}
+    assert len(rootDom.cache) == 1
+    _clock[0] = 9.0
+    assert rootDom.dict() == {"cache": {}}
+    assert asyncio.run(rootDom.cache.adict()) == {}
+
+    class Counted(DOMObjects.DOMObject):
+        def __before_output__(self):
+            self.set_property("outputs", self.outputs + 1)
+    _node = Counted("counted")
+    _node.new_property("outputs", 0)
+    rootDom.attach("counted", _node)
+    assert asyncio.run(rootDom.counted.adict()) == {"outputs": 1}
+    assert rootDom.counted.dict() == {"outputs": 2}
+
+
+def test_watch_changes():
+    rootDom = build_tree()
+    rootDom.new_dictgroup("devices")
+
+    async def _main():
+        _changes = []
+        async with rootDom.watch("settings") as _watch:
+            assert len(DOMObjects.WATCHERS) == 1
+            rootDom.settings.theme = "light"
+            rootDom.sensors.s0.unit = "F"
+            rootDom.devices["d1"] = DOMObjects.DOMObject("d1")
+            rootDom.settings.new_property("lang", "en")
+            _thread = threading.Thread(
+                target=rootDom.settings.set_property, args=("theme", "dark"))
+            _thread.start()
+            _thread.join()
+            rootDom.settings.del_property("lang")
+            async for _change in _watch:
+                _changes.append(_change)
+                if len(_changes) == 4:
+                    break
+        return _changes
+
+    _changes = asyncio.run(asyncio.wait_for(_main(), 2))
+    assert _changes == [
+        DOMObjects.Change("root.settings.theme", "set", "light"),
+        DOMObjects.Change("root.settings.lang", "new", "en"),
+        DOMObjects.Change("root.settings.theme", "set", "dark"),
+        DOMObjects.Change("root.settings.lang", "delete", None)]
+    assert DOMObjects.WATCHERS == []
+
+
+def test_watch_is_bound_to_its_tree():
+    rootDom = build_tree()
+    otherDom = build_tree()
+
+    async def _main():
+        _changes = []
+        async with rootDom.watch("settings") as _watch:
+            otherDom.settings.theme = "light"
+            rootDom.settings.new_child("app")
+            rootDom.settings.app.new_property("lang", "en")
+            rootDom.settings.detach("app")
+            rootDom.settings.theme = "blue"
+            async for _change in _watch:
+                _changes.append(_change)
+                if _change.kind == "set":
+                    break
+        return _changes
+
+    _changes = asyncio.run(asyncio.wait_for(_main(), 2))
+    assert [(_c.path, _c.kind) for _c in _changes] == [
+        ("root.settings.app", "new"),
+        ("root.settings.app.lang", "new"),
+        ("root.settings.app", "delete"),
+        ("root.settings.theme", "set")]
+
+
+def test_abandoned_watch_unregisters():
+    rootDom = build_tree()
+
+    async def _main():
+        asyncio.get_running_loop().call_soon(
+            setattr, rootDom.settings, "theme", "light")
+        async for _change in rootDom.watch("settings"):
+            break
+        assert DOMObjects.WATCHERS == []
+        for _i in range(100):
+            rootDom.settings.theme = "t%d" % _i
+        return _change
+
+    assert asyncio.run(asyncio.wait_for(_main(), 2)) == DOMObjects.Change(
+        "root.settings.theme", "set", "light")
+    assert DOMObjects.WATCHERS == []
@@ -0,0 +1,111 @@
+import warnings
+
+import pytest
+
+import DOMObjects
+from DOMObjects import FLAG_READ
+
+
+def build_tree():
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_child("settings")
+    rootDom.settings.new_child("app")
+    rootDom.settings.app.new_property_bulk(
+        [("lang_locale", "en_US"), ("theme", "dark")])
+    rootDom.settings.app.new_property("build", 42, 0 | FLAG_READ)
+    rootDom.settings.new_child("net")
+    rootDom.settings.net.new_property("host", "localhost")
+    rootDom.new_dictgroup("devices")
+    rootDom.devices["dev1"] = DOMObjects.DOMObject("dev1")
+    rootDom.devices["dev1"].new_property("status", "up")
+    rootDom.new_dictgroup("samples", columns={"value": {"cast": int}})
+    rootDom.samples.new_record("s1", value=3)
+    return rootDom
+
+
+def test_get_many():
+    rootDom = build_tree()
+    _paths = ["settings.app.lang_locale", "settings.app.theme",
+              "settings.net.host", "devices.dev1.status", "samples.s1.value",
+              "settings.app.build"]
+    assert rootDom.get_many(_paths) == {
+        "settings.app.lang_locale": "en_US", "settings.app.theme": "dark",
+        "settings.net.host": "localhost", "devices.dev1.status": "up",
+        "samples.s1.value": 3, "settings.app.build": 42}
+    assert rootDom.settings.get_many(["app.theme"]) == {"app.theme": "dark"}
+
+    with pytest.raises(KeyError):
+        rootDom.get_many(["settings.app.missing"])
+    with pytest.raises(KeyError):
+        rootDom.get_many(["settings.nope.theme"])
+    assert rootDom.get_many(["settings.nope.theme", "settings.app.x"],
+                            default=None) == {"settings.nope.theme": None,
+                                              "settings.app.x": None}
+
+
+def test_set_many_is_checked_before_writing():
+    rootDom = build_tree()
+    rootDom.devices.create_index("status")
+    rootDom.set_many({"settings.app.theme": "light",
+                      "devices.dev1.status": "down",
+                      "samples.s1.value": 7})
+    assert rootDom.settings.app.theme == "light"
+    assert rootDom.devices.find("status", "down") == [rootDom.devices["dev1"]]
+    assert rootDom.samples["s1"].value == 7
+
+    with pytest.raises(AssertionError):
+        rootDom.set_many({"settings.app.theme": "blue",
+                          "settings.app.build": 43})
+    assert rootDom.settings.app.theme == "light"
+    with pytest.raises(KeyError):
+        rootDom.set_many({"settings.app.theme": "blue", "nope.x": 1})
+    assert rootDom.settings.app.theme == "light"
+
+    with warnings.catch_warnings(record=True):
+        warnings.simplefilter("always")
+        rootDom.set_many({"settings.net.port": 8080})
+    assert rootDom.settings.net.port == 8080
+
+
+def test_get_many_matches_loop():
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_child("settings")
+    _paths = []
+    for _g in range(10):
+        rootDom.settings.new_child("g%d" % _g)
+        _group = rootDom.settings.get_context("g%d" % _g)
+        _group.new_property_bulk([("p%d" % _p, _p) for _p in range(20)])
+        _paths.extend("settings.g%d.p%d" % (_g, _p) for _p in range(20))
+
+    # timing is compared by benchmarks/bench_core.py, get_property_loop
+    assert rootDom.get_many(_paths) == {
+        _path: rootDom.get_context(_path.rsplit(".", 1)[0])
+        .get_property(_path.rsplit(".", 1)[1]) for _path in _paths}
+
+
+def test_internal_names_are_not_properties():
+    rootDom = build_tree()
+    with pytest.raises(KeyError):
+        rootDom.get_many(["settings.app.__flags__"])
+    assert rootDom.get_many(["__store__", "settings.__children__"],
+                            default=None) == {"__store__": None,
+                                              "settings.__children__": None}
+    with pytest.raises(KeyError):
+        rootDom.set_many({"settings.app.theme": "blue",
+                          "settings.app.__flags__": None})
+    assert rootDom.settings.app.theme == "dark"
+
+
+def test_get_many_edge_paths():
+    rootDom = build_tree()
+    rootDom.new_property("version", 2)
+    # top level properties, and deeper paths below a missing node
+    assert rootDom.get_many(["version", "nope.x.y", "settings.app.theme"],
+                            default=0) == {"version": 2, "nope.x.y": 0,
+                                           "settings.app.theme": "dark"}
+    # a property is not a node
+    assert rootDom.get_many(["version.x"], default=None) == {
+        "version.x": None}
+    rootDom.settings.net.new_property("secret", "x", 0)
+    with pytest.raises(AssertionError):
+        rootDom.get_many(["settings.net.host", "settings.net.secret"])
@@ -0,0 +1,56 @@
+import importlib.util
+import json
+import os
+
+import pytest
+
+_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))), "benchmarks", "bench_core.py")
+
+
+@pytest.fixture(scope="module")
+def bench():
+    _spec = importlib.util.spec_from_file_location("bench_core", _PATH)
+    _module = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(_module)
+    return _module
+
+
+def _doc(**results):
+    return {"meta": {}, "results": results}
+
+
+def test_compare_edge_cases(bench):
+    _baseline = _doc(dict={"10": {"time": 1.0, "peak": 0}},
+                     json={"10": {"time": 0.0, "peak": 100}})
+    _results = _doc(dict={"10": {"time": 1.2, "peak": 500},
+                          "99": {"time": 9.0, "peak": 9}},
+                    json={"10": {"time": 5.0, "peak": None}},
+                    setattr={"10": {"time": 9.0, "peak": 9}})
+    # zero, missing and untraced measurements are not compared
+    assert bench.compare(_results, _baseline, 0.25) == []
+    assert bench.compare(_results, _baseline, 0.1) == [
+        "dict[10] time 1.20x baseline"]
+
+    _run = _doc(get_many={"10": {"time": 1.0, "peak": None}},
+                get_property_loop={"10": {"time": 1.0, "peak": None}})
+    assert bench.compare_relative(_run) == [
+        "get_many[10] time 1.00x get_property_loop"]
+    del _run["results"]["get_property_loop"]
+    assert bench.compare_relative(_run) == []
+
+
+def test_regressing_run_is_not_saved(bench, tmp_path, capsys):
+    _path = tmp_path / "baseline.json"
+    _stored = _doc(getattr={"10": {"time": 1e-12, "peak": None}})
+    _path.write_text(json.dumps(_stored))
+    _args = ["--only", "getattr", "--sizes", "10", "--repeat", "1",
+             "--no-memory", "--baseline", str(_path)]
+    assert bench.main(_args) == 1
+    assert bench.main(_args + ["--save-baseline"]) == 1
+    assert json.loads(_path.read_text()) == _stored
+    assert "not saving the baseline" in capsys.readouterr().out
+    assert bench.main(_args + ["--save-baseline", "--force"]) == 0
+    assert json.loads(_path.read_text()) != _stored
+    with pytest.raises(SystemExit):
+        bench.main(["--only", "missing"])
@@ -0,0 +1,135 @@
+import pytest
+
+import DOMObjects
+
+
+def build_history(count=6):
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_dictgroup("history", columns={
+        "ts": {"cast": float},
+        "value": {"cast": int, "default": 0},
+        "source": {"cast": str}
+    })
+    for _i in range(count):
+        rootDom.history.new_record("evt_%d" % _i, ts=_i * 0.5, value=_i,
+                                   source="src_%d" % (_i % 2))
+    return rootDom
+
+
+def test_proxy_access():
+    rootDom = build_history()
+    _evt = rootDom.history["evt_2"]
+    assert _evt.value == 2
+    assert _evt.get_property("source") == "src_0"
+    _evt.value = 20
+    assert rootDom.history["evt_2"].value == 20
+    assert _evt.path == "root.history.evt_2"
+    assert rootDom.history.children[:2] == ["evt_0", "evt_1"]
+
+
+def test_aggregates_and_filter():
+    rootDom = build_history()
+    assert rootDom.history.sum("value") == 15
+    assert rootDom.history.min("ts") == 0.0
+    assert rootDom.history.max("value") == 5
+    assert rootDom.history.filter("value", ">=", 4) == ["evt_4", "evt_5"]
+    assert rootDom.history.filter("source", "==", "src_1") == [
+        "evt_1", "evt_3", "evt_5"]
+
+
+def test_delete_and_dict():
+    rootDom = build_history(4)
+    del rootDom.history["evt_1"]
+    rootDom.history.detach("evt_2")
+    _node = DOMObjects.DOMObject("evt_9")
+    _node.new_property("value", 9)
+    rootDom.history["evt_9"] = _node
+    assert list(rootDom.history) == ["evt_0", "evt_3", "evt_9"]
+    assert rootDom.history.sum("value") == 12
+    assert rootDom.dict()["history"]["evt_9"] == {
+        "ts": 0.0, "value": 9, "source": None}
+
+
+def test_index_and_selector():
+    rootDom = build_history()
+    rootDom.history.create_index("source")
+    rootDom.history["evt_0"].source = "src_1"
+    _found = rootDom.select("history[*]{source=='src_1', value<3}")
+    assert [_m.name for _m in _found] == ["evt_1", "evt_0"]
+
+
+def test_nulls_and_mean():
+    rootDom = build_history(4)
+    rootDom.history["evt_1"].value = None
+    assert rootDom.history["evt_1"].value is None
+    assert rootDom.history.sum("value") == 5
+    assert rootDom.history.mean("value") == 5 / 3
+    assert rootDom.history.min("value") == 0
+    assert rootDom.history.filter("value", ">", 1) == ["evt_2", "evt_3"]
+    rootDom.history.new_record("evt_9", value=7)
+    assert rootDom.history.max("value") == 7
+    assert rootDom.dict()["history"]["evt_1"]["value"] is None
+
+
+def test_column_is_a_copy():
+    rootDom = build_history(3)
+    _values = rootDom.history.column("value")
+    rootDom.history.new_record("evt_9", value=9)
+    _values[0] = 100
+    assert rootDom.history["evt_0"].value == 0
+    assert list(rootDom.history.column("value")) == [0, 1, 2, 9]
+
+
+def test_aggregates_without_numpy(monkeypatch):
+    monkeypatch.setattr(DOMObjects.columnar, "numpy", None)
+    rootDom = build_history()
+    assert rootDom.history.sum("value") == 15
+    assert rootDom.history.mean("ts") == 1.25
+    assert rootDom.history.filter("value", "<", 2) == ["evt_0", "evt_1"]
+    assert rootDom.history.column("value").tolist() == [0, 1, 2, 3, 4, 5]
+
+
+def test_aggregates_with_numpy():
+    numpy = pytest.importorskip("numpy")
+    rootDom = build_history()
+    _values = rootDom.history.column("value")
+    assert isinstance(_values, numpy.ndarray)
+    # copies do not pin the column buffer
+    rootDom.history.new_record("evt_9", value=9)
+    assert _values.tolist() == [0, 1, 2, 3, 4, 5]
+    assert rootDom.history.sum("value") == 24
+    assert rootDom.history.mean("value") == 24 / 7
+    assert rootDom.history.filter("value", ">=", 5) == ["evt_5", "evt_9"]
+
+
+def test_bad_rows_leave_the_group_unchanged():
+    rootDom = build_history(2)
+    _before = rootDom.history.dict()
+    # the first column casts, the second does not
+    with pytest.raises(ValueError):
+        rootDom.history.new_record("bad", ts=1.0, value="many")
+    with pytest.raises(OverflowError):
+        rootDom.history.new_record("big", ts=1.0, value=2 ** 70)
+    with pytest.raises(ValueError):
+        rootDom.history.new_record("evt_1", ts=9.0, value="many")
+    with pytest.raises(OverflowError):
+        rootDom.history["evt_1"] = {"ts": 9.0, "value": 2 ** 70}
+    assert rootDom.history.dict() == _before
+    assert len(rootDom.history.column("ts")) == 2
+    rootDom.history.new_record("evt_2", value=2)
+    assert rootDom.history.children == ["evt_0", "evt_1", "evt_2"]
+
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+def test_bool_column_extremes(monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(DOMObjects.columnar, "numpy", None)
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_dictgroup("flags", columns={"on": {"cast": bool}})
+    assert rootDom.flags.min("on") is None
+    for _i in range(3):
+        rootDom.flags.new_record("f%d" % _i, on=bool(_i))
+    assert rootDom.flags.min("on") is False
+    assert rootDom.flags.max("on") is True
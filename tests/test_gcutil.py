@@ -0,0 +1,94 @@
+import gc
+import weakref
+
+import DOMObjects
+
+
+def build_tree(weak_parents: bool) -> object:
+    rootDom = DOMObjects.DOMRootObject(weak_parents=weak_parents)
+    rootDom.new_child("controls")
+    rootDom.controls.new_child("light")
+    rootDom.controls.light.new_property("value", 1)
+    rootDom.new_dictgroup("devices")
+    rootDom.devices["dev1"] = DOMObjects.DOMObject("dev1")
+    return rootDom
+
+
+def test_weak_parents_keep_the_api():
+    rootDom = build_tree(weak_parents=True)
+    _light = rootDom.controls.light
+    assert _light.parent is rootDom.controls
+    assert "parent" not in _light.__dict__
+    assert _light.path == "root.controls.light"
+    assert rootDom.devices["dev1"].parent is rootDom.devices
+    assert rootDom.get_context("controls.light").value == 1
+    assert rootDom.dict()["controls"] == {"light": {"value": 1}}
+
+    _strong = build_tree(weak_parents=False)
+    assert _strong.controls.light.__dict__["parent"] is _strong.controls
+
+
+def test_weak_tree_is_freed_without_collector():
+    gc.collect()
+    gc.disable()
+    try:
+        rootDom = build_tree(weak_parents=True)
+        _light = weakref.ref(rootDom.controls.light)
+        _device = weakref.ref(rootDom.devices["dev1"])
+        del rootDom
+        assert _light() is None
+        assert _device() is None
+
+        rootDom = build_tree(weak_parents=True)
+        _controls = rootDom.controls
+        del rootDom
+        assert _controls.parent is None
+        assert _controls.light.parent is _controls
+    finally:
+        gc.enable()
+
+
+def test_freeze_for_gc():
+    rootDom = build_tree(weak_parents=True)
+    try:
+        assert DOMObjects.freeze_for_gc() > 0
+    finally:
+        DOMObjects.unfreeze_gc()
+    assert rootDom.controls.light.value == 1
+
+
+def test_weak_tree_edge_cases(monkeypatch):
+    gc.collect()
+    gc.disable()
+    try:
+        rootDom = build_tree(weak_parents=True)
+        rootDom.new_namespace("ns")
+        rootDom.new_dictgroup("log", maxlen=2)
+        rootDom.new_dictgroup("history", sorted=True)
+        for _i in range(3):
+            rootDom.log.new_child("evt%d" % _i)
+            rootDom.history[_i] = DOMObjects.DOMObject("evt")
+        _refs = [weakref.ref(_node) for _node in
+                 (rootDom.ns, rootDom.log.evt2, rootDom.history[2])]
+        # a node moved into a strong tree holds its new parent strongly
+        _strong = DOMObjects.DOMRootObject()
+        _moved = rootDom.controls.light
+        _strong.attach("light", _moved)
+        assert _moved.__dict__["parent"] is _strong
+        assert "__parentref__" not in _moved.__dict__
+        del rootDom
+        assert [_ref() for _ref in _refs] == [None, None, None]
+        assert _moved.parent is _strong
+        assert _moved.value == 1
+    finally:
+        gc.enable()
+
+    # interpreters without gc.freeze disable the collector instead
+    monkeypatch.delattr(gc, "freeze")
+    monkeypatch.delattr(gc, "unfreeze")
+    try:
+        assert DOMObjects.freeze_for_gc(collect=False) > 0
+        assert not gc.isenabled()
+    finally:
+        DOMObjects.unfreeze_gc()
+    assert gc.isenabled()
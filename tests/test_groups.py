@@ -0,0 +1,204 @@
+import pytest
+
+import DOMObjects
+
+
+def test_ring_group_evicts_oldest():
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_dictgroup("event_log", maxlen=3)
+    _log = rootDom.event_log
+    for _i in range(5):
+        _log.new_child("evt_%d" % _i)
+    assert _log.children == ["evt_2", "evt_3", "evt_4"]
+    assert list(_log) == ["evt_2", "evt_3", "evt_4"]
+    assert "evt_0" not in _log
+    assert not _log.__flags__.has_flag("evt_0")
+    assert [_k for _k, _m in _log.tail(2)] == ["evt_3", "evt_4"]
+
+    _log.detach("evt_3")
+    _log["evt_5"] = DOMObjects.DOMObject("evt_5")
+    _log["evt_6"] = DOMObjects.DOMObject("evt_6")
+    assert _log.children == ["evt_4", "evt_5", "evt_6"]
+    assert len(_log) == 3
+    assert list(rootDom.dict()["event_log"]) == ["evt_4", "evt_5", "evt_6"]
+
+
+def test_ring_group_members_keep_group_attributes():
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_dictgroup("event_log", maxlen=3)
+    _log = rootDom.event_log
+    with pytest.raises(TypeError):
+        _log["a"] = 5
+    assert _log.children == []
+    assert rootDom.dict() == {"event_log": {}}
+
+    _log["name"] = DOMObjects.DOMObject("x")
+    assert _log.name == "event_log"
+    assert _log.path == "root.event_log"
+    assert _log["name"].name == "x"
+    assert rootDom.dict() == {"event_log": {"name": {}}}
+    assert rootDom.get_context("event_log.name") is _log["name"]
+    _log.detach("name")
+    assert _log.name == "event_log"
+    assert rootDom.dict() == {"event_log": {}}
+
+
+def test_keyed_members_block_duplicate_children():
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_dictgroup("event_log", maxlen=2)
+    rootDom.new_dictgroup("devices")
+    rootDom.new_dictgroup("by_ts", sorted=True)
+    for _group in (rootDom.event_log, rootDom.devices, rootDom.by_ts):
+        _group["a"] = DOMObjects.DOMObject("a")
+        with pytest.raises(AssertionError):
+            _group.new_child("a")
+        with pytest.raises(AssertionError):
+            _group.attach("a", DOMObjects.DOMObject("a"))
+        assert list(_group) == ["a"]
+    assert rootDom.event_log.children == ["a"]
+    # evicting past capacity still finds every listed member
+    rootDom.event_log.new_child("b")
+    rootDom.event_log.new_child("c")
+    assert rootDom.event_log.children == ["b", "c"]
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_expiring_group_ttl_and_lru():
+    rootDom = DOMObjects.DOMRootObject()
+    _clock = FakeClock()
+    _evicted = []
+    _sessions = DOMObjects.ExpiringGroup(
+        parent=rootDom, name="sessions", ttl=10, maxsize=3, clock=_clock,
+        on_evict=lambda key, member, reason: _evicted.append((key, reason)))
+    rootDom.attach("sessions", _sessions)
+
+    for _i in range(3):
+        _sessions.new_child("s%d" % _i)
+    _sessions.attach("s_long", DOMObjects.DOMObject("s_long"), ttl=100)
+    assert _evicted == [("s0", "capacity")]
+
+    _clock.now = 5
+    _sessions.touch("s1")
+    _sessions["s1"]
+    _clock.now = 12
+    assert _sessions.children == ["s1", "s_long"]
+    assert _evicted[1:] == [("s2", "expired")]
+    assert _sessions.ttl_of("s1") == 3
+
+    _sessions.detach("s_long")
+    assert "s_long" not in _sessions
+    _clock.now = 20
+    assert len(_sessions) == 0
+    assert _evicted[-1] == ("s1", "expired")
+
+
+def test_expiring_group_output_skips_expired_members():
+    rootDom = DOMObjects.DOMRootObject()
+    _clock = FakeClock()
+    _evicted = []
+    rootDom.new_dictgroup(
+        "sessions", ttl=10,
+        on_evict=lambda key, member, reason: _evicted.append((key, reason)))
+    _sessions = rootDom.sessions
+    _sessions.__clock__ = _clock
+    with pytest.raises(TypeError):
+        _sessions["a"] = 5
+    _sessions["name"] = DOMObjects.DOMObject("x")
+    _sessions.set("keep", DOMObjects.DOMObject("keep"), ttl=100)
+    assert _sessions.name == "sessions"
+    assert _sessions.path == "root.sessions"
+
+    _clock.now = 12
+    assert rootDom.dict() == {"sessions": {"keep": {}}}
+    assert _evicted == [("name", "expired")]
+    assert _sessions.name == "sessions"
+    _clock.now = 200
+    assert _sessions.json() == "{}"
+    assert _sessions.keys() == []
+
+
+def test_sorted_group_ranges():
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_dictgroup("history", sorted=True)
+    _history = rootDom.history
+    for _ts in (30, 10, 50, 20, 40):
+        _history[_ts] = DOMObjects.DOMObject("evt_%d" % _ts)
+    assert _history.children == [10, 20, 30, 40, 50]
+    assert [_k for _k, _m in _history.range(20, 40)] == [20, 30, 40]
+    assert [_k for _k, _m in _history.range(20, 40, (False, False))] == [30]
+    assert _history.bisect(35) == 3
+    assert [_k for _k, _m in _history.first(2)] == [10, 20]
+    assert [_k for _k, _m in _history.last(2)] == [40, 50]
+
+    del _history[30]
+    assert list(_history) == [10, 20, 40, 50]
+    assert list(rootDom.dict()["history"]) == [10, 20, 40, 50]
+
+    rootDom.new_dictgroup("named", sorted=True)
+    rootDom.named.new_child_bulk(["c", "a", "b"])
+    assert rootDom.named.b.siblings == ["a", "c"]
+
+
+def test_sorted_group_members_keep_group_attributes():
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_dictgroup("named", sorted=True)
+    with pytest.raises(TypeError):
+        rootDom.named["a"] = 5
+    rootDom.named["name"] = DOMObjects.DOMObject("x")
+    assert rootDom.named.path == "root.named"
+    assert rootDom.dict() == {"named": {"name": {}}}
+
+
+def test_new_dictgroup_rejects_conflicting_options():
+    rootDom = DOMObjects.DOMRootObject()
+    for _options in ({"maxlen": 3, "ttl": 10}, {"maxsize": 3, "sorted": True},
+                     {"columns": {"ts": {"cast": float}}, "maxlen": 3},
+                     {"sorted": True, "on_evict": print}):
+        with pytest.raises(ValueError):
+            rootDom.new_dictgroup("group", **_options)
+    assert rootDom.children == []
+
+
+def test_expiring_group_adict_awaits_member_methods():
+    import asyncio
+
+    async def _fetch():
+        return 3
+
+    rootDom = DOMObjects.DOMRootObject()
+    _clock = FakeClock()
+    rootDom.new_dictgroup("sessions", ttl=10)
+    rootDom.sessions.__clock__ = _clock
+    rootDom.sessions["s1"] = DOMObjects.DOMObject("s1")
+    rootDom.sessions["s1"].new_method("value", _fetch)
+    rootDom.sessions.set("s2", DOMObjects.DOMObject("s2"), ttl=1)
+    _clock.now = 5
+    assert asyncio.run(rootDom.adict()) == {"sessions": {"s1": {"value": 3}}}
+
+
+def test_sorted_group_rejects_incomparable_keys():
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_dictgroup("history", sorted=True)
+    _history = rootDom.history
+    _history[10] = DOMObjects.DOMObject("a")
+    _history[20] = DOMObjects.DOMObject("b")
+    with pytest.raises(TypeError):
+        _history["late"] = DOMObjects.DOMObject("c")
+    with pytest.raises(TypeError):
+        _history.attach("late", DOMObjects.DOMObject("c"))
+    # neither the keystore nor the children keep the rejected key
+    assert "late" not in _history
+    assert len(_history) == 2
+    assert list(_history) == [10, 20]
+    assert _history.dict() == {10: {}, 20: {}}
+    # a rejected duplicate keeps the existing member in order
+    with pytest.raises(AssertionError):
+        _history.attach(20, DOMObjects.DOMObject("d"))
+    assert _history.keys() == [10, 20]
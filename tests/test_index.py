@@ -0,0 +1,118 @@
+import pytest
+
+import DOMObjects
+
+
+def build_group(count=10):
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_dictgroup("devices")
+    for _i in range(count):
+        _name = "dev_%d" % _i
+        rootDom.devices.new_child(_name)
+        rootDom.devices[_name].new_property("site", "lab" if _i % 2 else "hq")
+        rootDom.devices[_name].new_property("load", _i)
+    return rootDom
+
+
+def names(members):
+    return [_m.name for _m in members]
+
+
+def test_hash_index_tracks_mutations():
+    rootDom = build_group(4)
+    _index = rootDom.devices.create_index("site")
+    assert _index.find("lab") == ["dev_1", "dev_3"]
+
+    rootDom.devices.dev_0.set_property("site", "lab")
+    rootDom.devices.dev_1.site = "hq"
+    assert names(rootDom.devices.find("site", "lab")) == ["dev_3", "dev_0"]
+
+    rootDom.devices.detach("dev_3")
+    _node = DOMObjects.DOMObject("dev_9")
+    _node.new_property("site", "lab")
+    rootDom.devices["dev_9"] = _node
+    assert _index.find("lab") == ["dev_0", "dev_9"]
+
+    del rootDom.devices["dev_9"]
+    rootDom.devices.dev_0.del_property("site")
+    assert _index.find("lab") == []
+    assert sorted(_index.find("hq")) == ["dev_1", "dev_2"]
+
+
+def test_sorted_index_ranges():
+    rootDom = build_group(10)
+    rootDom.devices.create_index("load", sorted=True)
+    assert names(rootDom.devices.find_range("load", 3, 5)) == [
+        "dev_3", "dev_4", "dev_5"]
+    rootDom.devices.dev_9.set_property("load", 4)
+    assert names(rootDom.devices.find_range("load", 4, 4)) == [
+        "dev_4", "dev_9"]
+
+
+def test_selector_uses_index():
+    rootDom = build_group(10)
+    rootDom.devices.create_index("load", sorted=True)
+    _found = rootDom.select("devices[*]{load>=7, site=='lab'}")
+    assert names(_found) == ["dev_7", "dev_9"]
+
+
+def test_renamed_members_reindex():
+    rootDom = build_group(3)
+    rootDom.devices.create_index("load", sorted=True)
+    _node = DOMObjects.DOMObject("other_name")
+    _node.new_property("load", 1)
+    rootDom.devices["alias"] = _node
+    assert rootDom.devices.__member_key__(_node) == "alias"
+    _node.set_property("load", 9)
+    assert rootDom.devices.__indexes__["load"].range(9, 9) == ["alias"]
+    del rootDom.devices["alias"]
+    assert rootDom.devices.__member_key__(_node) is None
+    rootDom.devices.drop_index("load")
+    assert rootDom.devices.__memberkeys__ == {}
+
+
+def test_sorted_index_orders_equal_values_by_key():
+    _index = DOMObjects.index.SortedIndex("load")
+    for _key, _value in (("c", 2), ("a", 2), ("b", 1), ("d", 3)):
+        _index.add(_key, _value)
+    assert _index.range() == ["b", "a", "c", "d"]
+    assert _index.range(2, 2) == ["a", "c"]
+    assert _index.range(1, 3, inclusive=(False, False)) == ["a", "c"]
+    _index.remove("a")
+    _index.add("e", "text")
+    assert _index.range() == ["b", "c", "d"]
+
+
+def test_selector_incomparable_literal_matches_nothing():
+    rootDom = build_group(4)
+    _query = "devices[*]{load > 'x'}"
+    assert list(rootDom.select(_query)) == []
+    rootDom.devices.create_index("load", sorted=True)
+    assert list(rootDom.select(_query)) == []
+
+
+def test_unindexable_values_are_still_found():
+    rootDom = build_group(4)
+    rootDom.devices.dev_0.set_property("load", None)
+    rootDom.devices.dev_3.set_property("load", "text")
+    rootDom.devices.dev_2.new_property("tags", ["a"])
+    rootDom.devices.dev_3.new_property("tags", ("a",))
+    _scans = [(_prop, _value, names(rootDom.devices.find(_prop, _value)))
+              for _prop, _value in (("load", None), ("load", "text"),
+                                    ("load", 1), ("tags", ["a"]),
+                                    ("tags", ("a",)))]
+    rootDom.devices.create_index("load", sorted=True)
+    rootDom.devices.create_index("tags")
+    # indexed lookups agree with the scans for values the index cannot hold
+    for _prop, _value, _found in _scans:
+        assert names(rootDom.devices.find(_prop, _value)) == _found
+    assert names(rootDom.devices.find_range("load")) == ["dev_1", "dev_2"]
+    rootDom.devices.dev_2.tags = ["b"]
+    assert names(rootDom.devices.find("tags", ["b"])) == ["dev_2"]
+    assert rootDom.devices.find("tags", ["a"]) == []
+    del rootDom.devices["dev_0"]
+    assert rootDom.devices.find("load", None) == []
+    with pytest.raises(AssertionError):
+        rootDom.devices.find_range("tags")
+    with pytest.raises(AssertionError):
+        rootDom.devices.create_index("tags")
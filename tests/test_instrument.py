@@ -0,0 +1,86 @@
+import pytest
+
+import DOMObjects
+from DOMObjects import instrument
+
+
+def test_instrumentation_enable_disable():
+    _original = DOMObjects.DOMObject.get_property
+    _traces = []
+    instrument.reset()
+    instrument.enable(sample_rate=1.0,
+                      tracer=lambda op, path, ns: _traces.append((op, path)))
+    try:
+        rootDom = DOMObjects.DOMRootObject()
+        rootDom.new_child("app")
+        rootDom.app.new_property("lang", "en_US")
+        rootDom.get_context("app").get_property("lang")
+        rootDom.json()
+    finally:
+        instrument.disable()
+
+    assert DOMObjects.DOMObject.get_property is _original
+    _stats = instrument.stats()
+    # Direct call, plus the one made by dict() inside json()
+    assert _stats["lookup.get_property"]["count"] == 2
+    assert _stats["serialization.json"]["count"] == 1
+    assert _stats["flags.test_bit"]["count"] >= 1
+    assert sum(_stats["mutation.new_property"]["histogram"].values()) == 1
+    assert ("lookup.get_property", "root.app") in _traces
+
+    rootDom.app.get_property("lang")
+    assert instrument.stats()["lookup.get_property"]["count"] == 2
+
+
+def test_instrumentation_counts_overrides_once():
+    instrument.reset()
+    instrument.enable(categories=["mutation", "serialization"])
+    try:
+        rootDom = DOMObjects.DOMRootObject()
+        rootDom.new_dictgroup("log", maxlen=4)
+        rootDom.log.new_child("evt")
+        rootDom.dict()
+    finally:
+        instrument.disable()
+    _stats = instrument.stats()
+    # RingGroup.attach calls DictGroup.attach, which calls DOMObject.attach
+    assert _stats["mutation.attach"]["count"] == 2
+    # nested dict() calls of the children are counted
+    assert _stats["serialization.dict"]["count"] == 3
+
+
+def test_instrumentation_and_locking_disable_order():
+    from DOMObjects import locking
+
+    _original = DOMObjects.DOMObject.__dict__["dict"]
+    instrument.enable()
+    locking.enable()
+    try:
+        with pytest.raises(RuntimeError):
+            instrument.disable()
+        assert instrument.is_enabled()
+    finally:
+        locking.disable()
+        instrument.disable()
+    assert DOMObjects.DOMObject.__dict__["dict"] is _original
+    assert DOMObjects.DEBUG == 0
+
+
+def test_unknown_category_patches_nothing():
+    _attach = DOMObjects.DOMObject.__dict__["attach"]
+    with pytest.raises(KeyError):
+        instrument.enable(categories=["mutation", "bogus"])
+    assert not instrument.is_enabled()
+    assert DOMObjects.DOMObject.__dict__["attach"] is _attach
+
+    instrument.enable(categories=["serialization"])
+    try:
+        _dict = DOMObjects.DOMObject.__dict__["dict"]
+        # a bad call keeps the running instrumentation as it is
+        with pytest.raises(KeyError):
+            instrument.enable(categories=["bogus"])
+        assert instrument.is_enabled()
+        assert DOMObjects.DOMObject.__dict__["dict"] is _dict
+        assert DOMObjects.DOMObject.__dict__["attach"] is _attach
+    finally:
+        instrument.disable()
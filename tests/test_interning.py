@@ -0,0 +1,66 @@
+import json
+import sys
+
+import DOMObjects
+from DOMObjects.interning import ValuePool
+
+
+def test_names_are_interned():
+    # names built at runtime or loaded from JSON are distinct objects
+    _schema = DOMObjects.DOMSchema()
+    _schema.children = json.loads(
+        '{"a": {"props": {"value": {"cast": "int"}}},'
+        ' "b": {"props": {"value": {"cast": "int"}}}}')
+    for _child in _schema.children.values():
+        _child["props"]["value"]["cast"] = int
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.build_schema(_schema)
+
+    _a = rootDom.a.__properties__[0]
+    _b = rootDom.b.__properties__[0]
+    assert _a == _b == "value"
+    assert _a is _b
+    assert [_k for _k in rootDom.b.__flags__.__flags__ if _k == "value"][0] is _b
+    assert rootDom.children[0] is rootDom.a.name
+
+    rootDom.new_child_bulk(["c", "d"])
+    for _child in ("c", "d"):
+        rootDom.get_context(_child).new_property_bulk(
+            [("".join(["lab", "el"]), 1)], dedupe=True)
+    assert rootDom.c.__properties__[0] is rootDom.d.__properties__[0]
+    assert rootDom.c.__properties__[0] is sys.intern("label")
+
+
+def test_value_pool_dedupes_immutable_values():
+    _pool = ValuePool()
+    _first = _pool.get((1, "x" * 2))
+    assert _pool.get((1, "".join(["x", "x"]))) is _first
+    assert _pool.get(1.0) is not _pool.get(1)
+    assert type(_pool.get(True)) is bool
+    _list = [1]
+    assert _pool.get(_list) is _list
+    assert len(_pool) == 3
+
+
+def test_bulk_builders_dedupe_values():
+    rootDom = DOMObjects.DOMRootObject()
+    _pool = ValuePool()
+    rootDom.new_child_bulk(["a", "b"])
+    for _name in ("a", "b"):
+        rootDom.get_context(_name).new_property_bulk(
+            [("big", 10 ** 20 + 1), ("label", "".join(["lab", "el"]))],
+            dedupe=_pool)
+    assert rootDom.a.big is rootDom.b.big
+    assert rootDom.a.label is rootDom.b.label
+
+
+def test_value_pool_releases_strings():
+    _pool = ValuePool()
+    _value = "".join(["st", "atus-", "ok"])
+    assert _pool.get("".join(["st", "atus-", "ok"])) is _pool.get(_value)
+    assert len(_pool) == 1
+    _pool.clear()
+    assert len(_pool) == 0
+    # pooled values are not interned, clearing the pool releases them
+    assert _pool.get(_value) is _value
+    assert sys.intern("".join(["st", "atus-", "ok"])) is not _value
@@ -0,0 +1,291 @@
+import threading
+import time
+
+import pytest
+
+import DOMObjects
+from DOMObjects import locking
+
+
+def _tree():
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_namespace("a")
+    rootDom.new_namespace("b")
+    rootDom.a.new_child("settings")
+    rootDom.new_dictgroup("devices")
+    return rootDom
+
+
+def test_new_namespace():
+    rootDom = _tree()
+    assert rootDom.a.path == "a"
+    rootDom.a.settings.new_property("lang", "en_US")
+    assert rootDom.a.settings.path == "a.settings"
+    assert rootDom.dict()["a"] == {"settings": {"lang": "en_US"}}
+
+
+def test_rwlock_reentrant_and_upgrade():
+    _lock = locking.RWLock()
+    with _lock.write:
+        with _lock.write:
+            with _lock.read:
+                pass
+    with _lock.read:
+        with _lock.read:
+            with pytest.raises(RuntimeError):
+                _lock.acquire_write()
+    with pytest.raises(RuntimeError):
+        _lock.release_read()
+
+
+def test_rwlock_readers_share_writer_excludes():
+    _lock = locking.RWLock()
+    _both = threading.Barrier(2, timeout=5)
+    _readers = [threading.Thread(target=lambda: (_lock.acquire_read(),
+                                                 _both.wait(),
+                                                 _lock.release_read()))
+                for _ in range(2)]
+    # both readers must be inside the lock together to pass the barrier
+    for _t in _readers:
+        _t.start()
+    for _t in _readers:
+        _t.join(5)
+    assert not _both.broken
+
+    _order = []
+    _lock.acquire_read()
+    _writer = threading.Thread(target=lambda: (_lock.acquire_write(),
+                                               _order.append("write"),
+                                               _lock.release_write()))
+    _writer.start()
+    while not _lock.__waiting__:
+        time.sleep(0.001)
+    # a waiting writer holds back new readers
+    _reader = threading.Thread(target=lambda: (_lock.acquire_read(),
+                                               _order.append("read"),
+                                               _lock.release_read()))
+    _reader.start()
+    _order.append("release")
+    _lock.release_read()
+    _writer.join(5)
+    _reader.join(5)
+    assert _order == ["release", "write", "read"]
+
+
+def test_domains():
+    rootDom = _tree()
+    rootDom.devices["d1"] = DOMObjects.DOMObject("d1")
+    _original = DOMObjects.DOMObject.__dict__["dict"]
+    locking.enable(rootDom)
+    try:
+        _locks = [rootDom.__lock__, rootDom.a.__lock__, rootDom.b.__lock__,
+                  rootDom.devices.__lock__]
+        assert len(set(map(id, _locks))) == 4
+        assert locking.domain_lock(rootDom.a.settings) is rootDom.a.__lock__
+        assert locking.domain_lock(rootDom.devices["d1"]) is \
+            rootDom.devices.__lock__
+        assert "__lock__" not in rootDom.a.settings.__dict__
+        rootDom.new_child("misc")
+        assert locking.domain_lock(rootDom.misc) is rootDom.__lock__
+    finally:
+        locking.disable()
+    assert not locking.is_enabled()
+    assert DOMObjects.DOMObject.__dict__["dict"] is _original
+
+
+def test_writers_per_namespace():
+    rootDom = _tree()
+    locking.enable(rootDom)
+    try:
+        _done = []
+        _a = locking.domain_lock(rootDom.a)
+        _a.acquire_write()
+        try:
+            # another namespace is not blocked by the held one
+            _other = threading.Thread(
+                target=lambda: (rootDom.b.new_property("x", 1),
+                                _done.append("b")))
+            _other.start()
+            _other.join(5)
+            assert _done == ["b"]
+
+            _same = threading.Thread(
+                target=lambda: (rootDom.a.settings.new_property("x", 1),
+                                _done.append("a")))
+            _same.start()
+            _same.join(0.1)
+            assert _done == ["b"]
+        finally:
+            _a.release_write()
+        _same.join(5)
+        assert _done == ["b", "a"]
+    finally:
+        locking.disable()
+
+
+def test_concurrent_writes_and_reads():
+    rootDom = _tree()
+    _errors = []
+    locking.enable(rootDom)
+
+    def _write(node, count):
+        try:
+            for _i in range(count):
+                node.new_property("p%d" % _i, _i)
+        except Exception as _err:
+            _errors.append(_err)
+
+    def _member(count):
+        try:
+            for _i in range(count):
+                rootDom.devices["d%d" % _i] = DOMObjects.DOMObject("d%d" % _i)
+        except Exception as _err:
+            _errors.append(_err)
+
+    def _read(count):
+        try:
+            for _ in range(count):
+                rootDom.dict()
+        except Exception as _err:
+            _errors.append(_err)
+
+    try:
+        _threads = [threading.Thread(target=_write, args=(rootDom.a, 300)),
+                    threading.Thread(target=_write, args=(rootDom.b, 300)),
+                    threading.Thread(target=_member, args=(300,)),
+                    threading.Thread(target=_read, args=(50,)),
+                    threading.Thread(target=_read, args=(50,))]
+        for _t in _threads:
+            _t.start()
+        for _t in _threads:
+            _t.join(30)
+    finally:
+        locking.disable()
+    assert _errors == []
+    assert len(rootDom.a.__properties__) == 300
+    assert len(rootDom.b.__properties__) == 300
+    assert len(rootDom.devices.keys()) == 300
+
+
+def test_expiring_group_reads_take_write_lock():
+    rootDom = _tree()
+    _now = [0.0]
+    rootDom.new_dictgroup("sessions", ttl=1)
+    rootDom.sessions.__clock__ = lambda: _now[0]
+    _errors = []
+    locking.enable(rootDom)
+
+    def _read(count):
+        try:
+            for _ in range(count):
+                rootDom.sessions["keep"]
+                len(rootDom.sessions)
+                "keep" in rootDom.sessions
+                list(rootDom.sessions)
+                rootDom.sessions.children
+        except Exception as _err:
+            _errors.append(_err)
+
+    try:
+        for _trial in range(10):
+            for _i in range(200):
+                rootDom.sessions["s%d" % _i] = DOMObjects.DOMObject("s")
+            rootDom.sessions.set("keep", DOMObjects.DOMObject("keep"),
+                                 ttl=1000)
+            _now[0] += 2
+            _threads = [threading.Thread(target=_read, args=(50,))
+                        for _ in range(4)]
+            for _t in _threads:
+                _t.start()
+            for _t in _threads:
+                _t.join(30)
+        _lock = locking.domain_lock(rootDom.sessions)
+        with _lock.read:
+            # expiring on access would need the write lock
+            with pytest.raises(RuntimeError):
+                rootDom.sessions.children
+    finally:
+        locking.disable()
+    assert _errors == []
+    assert rootDom.sessions.children == ["keep"]
+
+
+def test_iterators_and_async_output_are_locked():
+    import asyncio
+
+    rootDom = _tree()
+    rootDom.devices["d1"] = DOMObjects.DOMObject("d1")
+    rootDom.a.settings.new_property("lang", "en_US")
+    _collect = DOMObjects.aio._collect
+    locking.enable(rootDom)
+    try:
+        _members = iter(rootDom.devices)
+        rootDom.devices["d2"] = DOMObjects.DOMObject("d2")
+        assert list(_members) == ["d1"]
+        _found = rootDom.select("a.settings.lang")
+        rootDom.a.settings.lang = "de_DE"
+        assert list(_found) == ["en_US"]
+        assert asyncio.run(rootDom.adict())["a"] == {
+            "settings": {"lang": "de_DE"}}
+        assert rootDom.json() == DOMObjects.serialize.JSON_DUMPS(
+            rootDom.dict())
+    finally:
+        locking.disable()
+    assert DOMObjects.aio._collect is _collect
+    assert type(DOMObjects.DOMObject.__dict__["children"]) is property
+
+
+def test_indexed_domain_members_lock_their_group():
+    rootDom = _tree()
+    for _i in range(4):
+        rootDom.devices.new_dictgroup("g%d" % _i)
+        rootDom.devices["g%d" % _i].new_property("site", "lab")
+    rootDom.devices.create_index("site")
+    _member = rootDom.devices.g0
+    _errors = []
+    locking.enable(rootDom)
+    try:
+        assert locking.domain_lock(_member) is not \
+            locking.domain_lock(rootDom.devices)
+        _group = locking.domain_lock(rootDom.devices)
+        _writer = threading.Thread(
+            target=lambda: setattr(_member, "site", "office"))
+        with _group.read:
+            _writer.start()
+            _writer.join(0.2)
+            # re-indexing the member waits for the group readers
+            assert _writer.is_alive()
+            assert len(rootDom.devices.find("site", "lab")) == 4
+        _writer.join(5)
+        assert rootDom.devices.find("site", "office") == [_member]
+
+        def _write(member, count):
+            try:
+                for _i in range(count):
+                    member.site = "s%d" % (_i % 3)
+            except Exception as _err:
+                _errors.append(_err)
+
+        def _read(count):
+            try:
+                for _ in range(count):
+                    rootDom.devices.find("site", "s1")
+                    rootDom.dict()
+            except Exception as _err:
+                _errors.append(_err)
+
+        _threads = [threading.Thread(target=_write,
+                                     args=(rootDom.devices["g%d" % _i], 200))
+                    for _i in range(4)]
+        _threads += [threading.Thread(target=_read, args=(50,))
+                     for _ in range(2)]
+        for _t in _threads:
+            _t.start()
+        for _t in _threads:
+            _t.join(30)
+        assert not any(_t.is_alive() for _t in _threads)
+    finally:
+        locking.disable()
+    assert _errors == []
+    # every member ends on 199 % 3 and the index agrees
+    assert len(rootDom.devices.find("site", "s1")) == 4
@@ -0,0 +1,81 @@
+import DOMObjects
+
+
+def build_tree():
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_child("light")
+    rootDom.light.new_property("label", "x" * 1000)
+    rootDom.new_child("heavy")
+    rootDom.heavy.new_property("blob", ["%d" % _i * 250 for _i in range(50)])
+    rootDom.heavy.new_child("leaf")
+    rootDom.new_dictgroup("devices")
+    for _i in range(10):
+        rootDom.devices.new_child("dev%d" % _i)
+    return rootDom
+
+
+def test_memory_usage_subtree_totals():
+    rootDom = build_tree()
+    _report = rootDom.memory_usage()
+    assert _report["nodes"] == 15
+    assert _report["total"] == sum(_report[_c] for _c in
+                                   DOMObjects.memory.CATEGORIES)
+    assert sum(_report["children"].values()) < _report["total"]
+    assert _report["children"]["heavy"] > _report["children"]["light"]
+    assert _report["values"] > 50 * 250
+    assert list(_report["groups"]) == ["root.devices"]
+    assert _report["groups"]["root.devices"] == _report["children"]["devices"]
+
+
+def test_memory_usage_shallow_and_top():
+    rootDom = build_tree()
+    _shallow = rootDom.heavy.memory_usage(deep=False)
+    _deep = rootDom.heavy.memory_usage()
+    assert _shallow["nodes"] == 1
+    assert _deep["nodes"] == 2
+    assert _shallow["total"] < _deep["total"]
+
+    _top = rootDom.memory_usage(top=2)["top"]
+    assert _top[0][0] == "root.heavy"
+    assert _top[0][1] <= _shallow["total"] < _deep["total"]
+    assert _top[0][1] >= _top[1][1]
+
+
+def test_memory_usage_top_finds_deep_leaves():
+    rootDom = DOMObjects.DOMRootObject()
+    _node = rootDom
+    for _i in range(20):
+        _node.new_child("n%d" % _i)
+        _node = _node.get_context("n%d" % _i)
+    _node.new_property("blob", "x" * 100000)
+    rootDom.new_child("side")
+    rootDom.side.new_property("blob", "y" * 10000)
+    _top = rootDom.memory_usage(top=2)["top"]
+    # the ancestors of the heavy leaf hold little memory themselves
+    assert [_path for _path, _bytes in _top] == [_node.path, "root.side"]
+    assert _top[0][1] > 100000 > _top[1][1] > 10000
+    assert rootDom.memory_usage(top=0)["top"] == []
+
+
+def test_memory_usage_columnar_group():
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_dictgroup("samples", columns={"value": {"cast": float}})
+    _small = rootDom.samples.memory_usage()["values"]
+    for _i in range(1000):
+        rootDom.samples.new_record("s%d" % _i, value=_i)
+    _report = rootDom.samples.memory_usage()
+    assert _report["nodes"] == 1
+    assert _report["values"] >= _small + 1000 * 8
+
+
+def test_memory_usage_counts_keyed_members():
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_dictgroup("devices")
+    _empty = rootDom.devices.memory_usage()["total"]
+    for _key in ("dev_a", "name", "parent"):
+        rootDom.devices[_key] = DOMObjects.DOMObject(_key)
+        rootDom.devices[_key].new_property("blob", _key * 1000)
+    _report = rootDom.memory_usage()
+    assert _report["nodes"] == 5
+    assert _report["values"] >= 3 * 1000
+    assert _report["groups"]["root.devices"] > _empty + 3 * 1000
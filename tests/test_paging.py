@@ -0,0 +1,121 @@
+import json
+
+import pytest
+
+import DOMObjects
+
+
+def _group(count):
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_dictgroup("devices")
+    for _i in range(count):
+        _dev = DOMObjects.DOMObject("d%d" % _i)
+        rootDom.devices.attach("d%d" % _i, _dev)
+        _dev.new_property("label", "dev%d" % _i)
+        _dev.new_property("status", "ok")
+        _dev.new_child("cfg")
+        _dev.cfg.new_property("port", _i)
+    return rootDom
+
+
+def test_offset_limit():
+    rootDom = _group(10)
+    _full = rootDom.devices.dict()
+    _part = rootDom.devices.dict(offset=3, limit=4)
+    assert list(_part) == ["d3", "d4", "d5", "d6"]
+    assert _part["d3"] == _full["d3"]
+    assert rootDom.devices.dict(offset=8, limit=5) == \
+        {"d8": _full["d8"], "d9": _full["d9"]}
+    assert json.loads(rootDom.devices.json(limit=1)) == {"d0": _full["d0"]}
+    # without paging options the output is unchanged
+    assert rootDom.devices.dict(offset=0) == _full
+
+
+def test_page_cursor():
+    rootDom = _group(7)
+    _keys = []
+    _page = rootDom.devices.page(3)
+    assert _page["total"] == 7
+    while True:
+        _keys.extend(_page["items"])
+        if _page["next"] is None:
+            break
+        _page = rootDom.devices.page(3, cursor=_page["next"],
+                                     offset=_page["offset"])
+    assert _keys == ["d%d" % _i for _i in range(7)]
+
+    # a stale position hint falls back to the cursor key
+    rootDom.devices.detach("d0")
+    assert list(rootDom.devices.page(2, cursor="d2", offset=3)["items"]) == \
+        ["d3", "d4"]
+    with pytest.raises(KeyError):
+        rootDom.devices.page(2, cursor="missing")
+
+
+def test_sorted_group_cursor():
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_dictgroup("history", sorted=True)
+    for _ts in (30, 10, 50, 20, 40):
+        rootDom.history[_ts] = DOMObjects.DOMObject("entry")
+    _page = rootDom.history.page(2, cursor=15)
+    assert list(_page["items"]) == [20, 30]
+    assert _page["next"] == 30
+
+
+def test_depth_and_fields():
+    rootDom = _group(3)
+    assert rootDom.dict(depth=0) == {"devices": {"__count__": 3}}
+    assert rootDom.devices.dict(depth=0)["d1"] == {"__count__": 1}
+    assert rootDom.dict(depth=2)["devices"]["d0"] == \
+        {"label": "dev0", "status": "ok", "cfg": {"__count__": 0}}
+
+    _view = rootDom.dict(fields={"devices.*": ["label", "undefined"],
+                                 "devices.d0.cfg": []})
+    assert _view["devices"]["d0"] == {"label": "dev0", "cfg": {}}
+    assert _view["devices"]["d2"] == {"label": "dev2", "cfg": {"port": 2}}
+
+    _page = rootDom.devices.page(2, depth=0, fields={"*": ["status"]})
+    assert _page["items"] == {"d0": {"status": "ok", "cfg": {"__count__": 0}},
+                              "d1": {"status": "ok", "cfg": {"__count__": 0}}}
+
+
+def test_columnar_paging():
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_dictgroup("readings", columns={"value": {"cast": int,
+                                                         "default": 0},
+                                               "unit": {"cast": str,
+                                                        "default": "C"}})
+    for _i in range(5):
+        rootDom.readings["r%d" % _i] = {"value": _i}
+    assert rootDom.readings.dict(offset=1, limit=2) == \
+        {"r1": {"value": 1, "unit": "C"}, "r2": {"value": 2, "unit": "C"}}
+    del rootDom.readings["r0"]
+    _page = rootDom.readings.page(2, fields={"*": ["value"]})
+    assert _page["items"] == {"r1": {"value": 1}, "r2": {"value": 2}}
+    assert _page["total"] == 4
+
+
+def test_setitem_members_are_paged():
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_dictgroup("devices")
+    for _i in range(5):
+        _dev = DOMObjects.DOMObject("d%d" % _i)
+        _dev.new_property("label", "dev%d" % _i)
+        rootDom.devices["d%d" % _i] = _dev
+    rootDom.devices["count"] = 5
+    _page = rootDom.devices.page(2)
+    assert _page["items"] == {"d0": {"label": "dev0"},
+                              "d1": {"label": "dev1"}}
+    assert _page["total"] == len(rootDom.devices) == 6
+    _page = rootDom.devices.page(2, cursor=_page["next"],
+                                 offset=_page["offset"])
+    assert list(_page["items"]) == ["d2", "d3"]
+    _page = rootDom.devices.page(2, cursor=_page["next"])
+    assert _page["items"] == {"d4": {"label": "dev4"}, "count": 5}
+    assert _page["next"] is None
+    assert list(rootDom.devices.dict(limit=2)) == ["d0", "d1"]
+    assert rootDom.dict(depth=0) == {"devices": {"__count__": 6}}
+    # an empty group pages to nothing
+    rootDom.new_dictgroup("empty")
+    assert rootDom.empty.page(3) == {"items": {}, "next": None,
+                                     "offset": 0, "total": 0}
@@ -0,0 +1,74 @@
+import pytest
+
+import DOMObjects
+
+
+def build_tree():
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_dictgroup("controls")
+    rootDom.controls.new_child_bulk(["fan", "pump"])
+    rootDom.controls.fan.new_property("value", 3)
+    rootDom.controls.pump.new_property("value", 7)
+    rootDom.new_dictgroup("devices")
+    for _name, _status in (("a", "up"), ("b", "down"), ("c", "up")):
+        rootDom.devices.new_child(_name)
+        rootDom.devices[_name].new_property("status", _status)
+    rootDom.devices["c"].new_property("site", "lab.1")
+    return rootDom
+
+
+def test_wildcard_props():
+    rootDom = build_tree()
+    assert list(rootDom.select("controls.*.value")) == [3, 7]
+
+
+def test_members_and_predicates():
+    rootDom = build_tree()
+    _up = rootDom.select("devices[*]{status=='up'}")
+    assert [_n.name for _n in _up] == ["a", "c"]
+    _site = rootDom.select("devices[*]{status == 'up', site}")
+    assert [_n.name for _n in _site] == ["c"]
+    assert [_n.name for _n in rootDom.select("devices['b']")] == ["b"]
+
+
+def test_recursive_descent():
+    rootDom = build_tree()
+    _matched = rootDom.select("**{value>5}")
+    assert [_n.path for _n in _matched] == ["root.controls.pump"]
+
+
+def test_compiled_and_cached():
+    _selector = DOMObjects.compile_selector("controls.*")
+    assert DOMObjects.compile_selector("controls.*") is _selector
+    assert len(list(build_tree().select(_selector))) == 2
+
+
+def test_invalid_selector():
+    with pytest.raises(ValueError):
+        DOMObjects.compile_selector("devices[*")
+
+
+def test_names_read_through_property_access():
+    rootDom = build_tree()
+    rootDom.controls.fan.new_method("double", lambda x: x * 2, margs=[21])
+    rootDom.controls.fan.new_property("secret", 1, flags=0)
+    assert list(rootDom.select("controls.fan.double")) == [42]
+    assert list(rootDom.select("controls.fan.secret")) == []
+    assert list(rootDom.select("controls.fan.parent")) == []
+    assert list(rootDom.select("controls.fan.__flags__")) == []
+    assert list(rootDom.select("controls.fan.name")) == []
+
+
+def test_names_resolve_keyed_members():
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_dictgroup("devices")
+    for _key in ("dev_a", "name", "parent"):
+        rootDom.devices[_key] = DOMObjects.DOMObject(_key)
+        rootDom.devices[_key].new_property("value", _key)
+    # members set with `__setitem__` live in the keystore only
+    assert list(rootDom.select("devices.dev_a.value")) == ["dev_a"]
+    assert list(rootDom.select("devices[*].value")) == ["dev_a", "name",
+                                                        "parent"]
+    assert [_n.name for _n in rootDom.select("devices.name")] == ["name"]
+    assert list(rootDom.select("devices.parent.value")) == ["parent"]
+    assert list(rootDom.select("devices.missing")) == []
@@ -0,0 +1,62 @@
+import io
+
+import DOMObjects
+from DOMObjects import serialize
+
+
+def build_tree(members=200):
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_property("version", 1)
+    rootDom.new_child("settings")
+    rootDom.settings.new_property("lang", "en_US")
+    rootDom.new_dictgroup("devices")
+    rootDom.devices.new_property("kind", "group")
+    for _i in range(members):
+        rootDom.devices.new_child("dev_%d" % _i)
+        rootDom.devices.get_context("dev_%d" % _i).new_property("idx", _i)
+    rootDom.new_dictgroup("empty")
+    return rootDom
+
+
+def test_parallel_matches_serial():
+    rootDom = build_tree()
+    assert (serialize.dumps_parallel(rootDom, workers=2, threshold=1) ==
+            rootDom.json())
+    assert (serialize.dumps_parallel(rootDom, workers=2, threshold=1,
+                                     props=["version"]) ==
+            rootDom.json(props=["version"]))
+
+
+def test_small_tree_stays_serial():
+    rootDom = build_tree(members=3)
+    assert rootDom.json(parallel=4) == rootDom.json()
+
+
+def test_dump_json():
+    rootDom = build_tree()
+    _fp = io.StringIO()
+    DOMObjects.dump_json(rootDom, _fp, workers=2, threshold=1)
+    assert _fp.getvalue() == rootDom.json()
+
+
+def test_parallel_edge_groups():
+    import pytest
+
+    rootDom = build_tree(members=3)
+    rootDom.new_dictgroup("history", sorted=True)
+    for _ts in range(40, 0, -1):
+        rootDom.history[_ts] = DOMObjects.DOMObject("evt")
+    _now = [0.0]
+    rootDom.new_dictgroup("sessions", ttl=5)
+    rootDom.sessions.__clock__ = lambda: _now[0]
+    for _i in range(40):
+        _now[0] = _i * 0.25
+        rootDom.sessions["s%d" % _i] = DOMObjects.DOMObject("s")
+    _now[0] = 12.0
+    # int keys and members expiring before the split
+    _text = serialize.dumps_parallel(rootDom, workers=2, threshold=1)
+    assert _text == rootDom.json()
+    assert len(rootDom.sessions) == 11
+    with pytest.raises(KeyError):
+        serialize.dumps_parallel(rootDom, workers=2, threshold=1,
+                                 props=["missing"])
@@ -0,0 +1,128 @@
+import multiprocessing
+import sys
+
+import pytest
+
+import DOMObjects
+from DOMObjects import shared
+
+pytestmark = pytest.mark.skipif(shared.shared_memory is None,
+                                reason="requires multiprocessing.shared_memory")
+
+
+def build_tree():
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_child("settings")
+    rootDom.settings.new_child("app")
+    rootDom.settings.app.new_property("lang_locale", "en_US.UTF-8")
+    rootDom.settings.app.new_property("retries", 3)
+    rootDom.new_dictgroup("devices")
+    rootDom.devices.new_child_bulk(["dev_b", "dev_a"])
+    rootDom.devices.dev_a.new_property("status", "up")
+    rootDom.new_method("count", len, margs=[[1, 2]])
+    return rootDom
+
+
+def _worker(name, queue):
+    _view = DOMObjects.attach_shared(name)
+    queue.put((_view.get_context("settings.app").get_property("retries"),
+               _view.dict()))
+    _view.close()
+
+
+def test_shared_view_matches_tree():
+    rootDom = build_tree()
+    with DOMObjects.export_shared(rootDom) as export:
+        view = DOMObjects.attach_shared(export.name)
+        assert view.children == rootDom.children
+        assert view.devices.children == ["dev_b", "dev_a"]
+        assert view.devices["dev_a"].status == "up"
+        assert view.get_context("settings.app").props == ["lang_locale",
+                                                          "retries"]
+        assert view.settings.app.path == "root.settings.app"
+        # decoded names share the interned literals
+        assert view.settings.app.props[0] is sys.intern("lang_locale")
+        assert view.devices.children[1] is sys.intern("dev_a")
+        assert view.dict() == rootDom.dict()
+        assert view.json() == rootDom.json()
+        with pytest.raises(KeyError):
+            view.name = "other"
+        view.close()
+
+
+def test_shared_view_from_worker_process():
+    rootDom = build_tree()
+    with DOMObjects.export_shared(rootDom) as export:
+        queue = multiprocessing.Queue()
+        proc = multiprocessing.Process(target=_worker,
+                                       args=(export.name, queue))
+        proc.start()
+        retries, data = queue.get(timeout=30)
+        proc.join()
+        assert retries == 3
+        assert data == rootDom.dict()
+
+
+def test_attach_leaves_tracker_registration(monkeypatch):
+    from multiprocessing import resource_tracker
+    _calls = []
+    for _op in ("register", "unregister"):
+        _orig = getattr(resource_tracker, _op)
+        monkeypatch.setattr(resource_tracker, _op,
+                            lambda *args, _op=_op, _orig=_orig:
+                            (_calls.append(_op), _orig(*args)))
+    rootDom = build_tree()
+    with DOMObjects.export_shared(rootDom) as export:
+        assert _calls == ["register"]
+        view = DOMObjects.attach_shared(export.name)
+        view.close()
+        # attaching from the owner keeps its registration
+        assert "unregister" not in _calls
+    assert _calls[-1] == "unregister"
+    assert _calls.count("unregister") == 1
+
+
+def test_worker_attach_drops_its_registration(monkeypatch):
+    from multiprocessing import resource_tracker
+    _calls = []
+    for _op in ("register", "unregister"):
+        _orig = getattr(resource_tracker, _op)
+        monkeypatch.setattr(resource_tracker, _op,
+                            lambda *args, _op=_op, _orig=_orig:
+                            (_calls.append(_op), _orig(*args)))
+    with DOMObjects.export_shared(build_tree()) as export:
+        del _calls[:]
+        # a worker process did not export the block
+        monkeypatch.setattr(shared, "_EXPORTED", set())
+        view = DOMObjects.attach_shared(export.name)
+        assert view.settings.app.retries == 3
+        view.close()
+        if sys.version_info >= (3, 13):
+            assert _calls == []
+        else:
+            assert _calls == ["register", "unregister"]
+            # this worker shares the tracker of the owner, restore its entry
+            resource_tracker.register(export.__shm__._name, "shared_memory")
+    with pytest.raises(FileNotFoundError):
+        DOMObjects.attach_shared(export.name)
+
+
+def test_export_rejects_lossy_values():
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_property("pair", (1, 2))
+    with pytest.raises(TypeError):
+        shared.pack_tree(rootDom)
+    rootDom.set_property("pair", {1: "a"})
+    with pytest.raises(TypeError):
+        shared.pack_tree(rootDom)
+    rootDom.set_property("pair", {"a": [1, None, {"b": 2.5}]})
+    shared.pack_tree(rootDom)
+
+
+def test_export_warns_on_non_dom_children():
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.attach("raw", [1, 2])
+    rootDom.new_child("settings")
+    with pytest.warns(UserWarning):
+        _data = shared.pack_tree(rootDom)
+    assert _data.startswith(shared.MAGIC)
@@ -0,0 +1,122 @@
+import pytest
+
+import DOMObjects
+from DOMObjects import FLAG_READ
+
+
+def build_tree():
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.build_prop_map([({
+        "mode": {"cast": str, "default": "auto",
+                 "values": ["auto", "manual"]},
+        "setpoint": {"cast": float, "default": 20.0,
+                     "validate_callback": lambda v: 5 <= v <= 35},
+        "serial": {"cast": str, "default": "A1", "flags": 0 | FLAG_READ}
+    }, "hvac")])
+    return rootDom
+
+
+def test_build_prop_map_honors_flags_and_values():
+    rootDom = build_tree()
+    assert rootDom.hvac.mode == "auto"
+    assert not rootDom.hvac.__flags__.is_writeable("serial")
+    with pytest.raises(AssertionError):
+        rootDom.hvac.set_property("serial", "B2")
+
+    rootDom.hvac.set_property("mode", "manual")
+    with pytest.raises(ValueError):
+        rootDom.hvac.set_property("mode", "off")
+    with pytest.raises(ValueError):
+        rootDom.hvac.mode = "off"
+    assert rootDom.hvac.mode == "manual"
+
+    rootDom.hvac.setpoint = "21"
+    assert rootDom.hvac.setpoint == 21.0
+    with pytest.raises(ValueError):
+        rootDom.hvac.setpoint = 50
+    with pytest.raises(ValueError):
+        rootDom.hvac.setpoint = "warm"
+
+    with pytest.raises(ValueError):
+        DOMObjects.DOMRootObject().build_prop_map(
+            [({"mode": {"cast": str, "default": "off",
+                        "values": ["auto"]}}, None)])
+
+
+def test_bulk_loader_and_batch_validate():
+    rootDom = build_tree()
+    rootDom.new_dictgroup("zones")
+    _schema = {"level": {"cast": int, "values": range(10)}}
+    for _i in range(100):
+        _zone = DOMObjects.DOMObject("z%d" % _i)
+        _zone.new_property_bulk([("level", str(_i % 10))], schema=_schema)
+        rootDom.zones[_zone.name] = _zone
+    assert rootDom.zones["z13"].level == 3
+    with pytest.raises(ValueError):
+        DOMObjects.DOMObject("bad").new_property_bulk([("level", 11)],
+                                                      schema=_schema)
+    assert rootDom.validate() == []
+
+    # values written around the validators are reported, not raised
+    rootDom.zones["z7"].__store__["level"] = 42
+    rootDom.hvac.__store__["mode"] = "off"
+    assert sorted(_path for _path, _msg in rootDom.validate()) == [
+        "root.hvac.mode", "root.zones.z7.level"]
+
+
+def test_validators_shared_and_cast_only_specs():
+    _schema = DOMObjects.DOMSchema()
+    _schema.children = {
+        "n%d" % _i: {"props": {
+            "mode": {"cast": str, "default": "auto",
+                     "values": ["auto", "manual"]},
+            "count": {"cast": int, "default": _i}}}
+        for _i in range(3)}
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.build_schema(_schema)
+    assert rootDom.n0.__validators__ is rootDom.n2.__validators__
+    assert list(rootDom.n0.__validators__) == ["mode"]
+
+    # cast only specs build the default, assignments are stored as given
+    rootDom.n1.count = "7"
+    assert rootDom.n1.count == "7"
+    with pytest.raises(ValueError):
+        rootDom.n1.mode = "off"
+
+    # adding validators to one node leaves the shared map alone
+    rootDom.n1.new_property_bulk([("level", "3")],
+                                 schema={"level": {"cast": int,
+                                                   "values": range(5)}})
+    assert rootDom.n1.level == 3
+    assert "level" not in rootDom.n0.__validators__
+
+
+def test_validation_edge_cases():
+    _schema = {"cfg": {"values": [{"mode": "a"}, {"mode": "b"}]},
+               "level": {"cast": int, "values": [1, 2]}}
+    rootDom = DOMObjects.DOMRootObject()
+    rootDom.new_dictgroup("zones")
+    rootDom.zones["raw"] = 5
+    _zone = DOMObjects.DOMObject("z")
+    rootDom.zones["z"] = _zone
+    # unhashable allowed values are matched by a scan
+    _zone.new_property_bulk([("cfg", {"mode": "a"}), ("level", "2")],
+                            schema=_schema)
+    assert _zone.level == 2
+    _zone.cfg = {"mode": "b"}
+    with pytest.raises(ValueError):
+        _zone.cfg = {"mode": "c"}
+    with pytest.raises(ValueError):
+        _zone.cfg = ["mode"]
+    # None skips the cast but must still be an allowed value
+    with pytest.raises(ValueError):
+        _zone.level = None
+    assert _zone.level == 2
+
+    # plain values in groups are skipped, removed props are not reported
+    assert rootDom.validate() == []
+    _zone.__store__["level"] = "2"
+    assert rootDom.zones.validate() == [
+        ("root.zones.z.level", "property `level` expects int, got '2'")]
+    _zone.del_property("level")
+    assert rootDom.validate() == []